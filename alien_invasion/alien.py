@@ -5,6 +5,8 @@ import random
 import os
 import logging
 
+from alien_invasion import image_cache
+
 logger = logging.getLogger(__name__)
 
 # Constants for alien fallback visuals and tinting
@@ -16,6 +18,49 @@ _MIN_TINT_INTENSITY = 100
 _MAX_TINT_INTENSITY = 200
 _MIN_TINT_ALPHA = 50
 _MAX_TINT_ALPHA = 100
+# Палитра оттенков: число окрашенных вариантов на один спрайт пришельца и зерно,
+# из которого палитра генерируется (одинакова во всех запусках).
+_TINT_VARIANTS_PER_SPRITE = 8
+_TINT_PALETTE_SEED = 1
+
+
+def _random_tint(rng):
+    """Случайный оттенок (R, G, B, Alpha): один-три ярких канала и умеренная прозрачность."""
+    # 0 или 1, чтобы один из каналов был доминирующим или отсутствовал
+    r = rng.randint(0, 1)  # 0 or 1 for off/on
+    g = rng.randint(0, 1)  # 0 or 1 for off/on
+    b = rng.randint(0, 1)  # 0 or 1 for off/on
+    # Чтобы цвет был не слишком темным, убедимся, что хотя бы один канал не нулевой (если r,g,b все 0)
+    if r == 0 and g == 0 and b == 0:  # All channels are zero
+        choice = rng.randint(_MIN_CHANNEL_CHOICE, _MAX_CHANNEL_CHOICE)
+        if choice == _MIN_CHANNEL_CHOICE:  # 0
+            r = 1
+        elif choice == _MIN_CHANNEL_CHOICE + 1:  # 1
+            g = 1
+        else:
+            b = 1  # choice will be _MAX_CHANNEL_CHOICE (2)
+
+    # Интенсивность основного цвета
+    tint_r = r * rng.randint(_MIN_TINT_INTENSITY, _MAX_TINT_INTENSITY)
+    tint_g = g * rng.randint(_MIN_TINT_INTENSITY, _MAX_TINT_INTENSITY)
+    tint_b = b * rng.randint(_MIN_TINT_INTENSITY, _MAX_TINT_INTENSITY)
+    # Прозрачность оттенка (50-100 из 255)
+    tint_alpha = rng.randint(_MIN_TINT_ALPHA, _MAX_TINT_ALPHA)
+    return (tint_r, tint_g, tint_b, tint_alpha)
+
+
+def _build_tint_palette(count, seed):
+    """Генерирует count различных оттенков из генератора с зерном seed."""
+    rng = random.Random(seed)
+    palette = []
+    while len(palette) < count:
+        tint = _random_tint(rng)
+        if tint not in palette:
+            palette.append(tint)
+    return tuple(palette)
+
+
+_TINT_PALETTE = _build_tint_palette(_TINT_VARIANTS_PER_SPRITE, _TINT_PALETTE_SEED)
 
 
 def _apply_tint(surface, tint_color):
@@ -49,14 +94,39 @@ def _apply_tint(surface, tint_color):
     # Простое наложение .blit() с альфа-каналом (выбранный вариант) является более предсказуемым.
 
 
+def _load_tinted_image(image_path, display_size, tint_color):
+    """Общий окрашенный вариант спрайта: строится один раз на (путь, размер, оттенок)."""
+    return image_cache.load_variant(
+        image_path,
+        display_size,
+        tint_color,
+        lambda surface: _apply_tint(surface, tint_color),
+    )
+
+
+def preload_tinted_images(image_path, display_size):
+    """Заранее строит все варианты палитры для спрайта (фоновая загрузка ассетов)."""
+    for tint_color in _TINT_PALETTE:
+        _load_tinted_image(image_path, display_size, tint_color)
+
+
 class Alien(Sprite):
     """Класс, представляющий одного пришельца"""
 
+    # Строй, в котором стоит пришелец (alien_invasion/fleet.py): позицию пришельца в строю
+    # задают origin флота и смещение offset_x/offset_y. None - пришелец движется сам по
+    # себе через update().
+    fleet = None
+
     def __init__(self, ai_game, specific_image_path=None):
         # Русский комментарий: Инициализирует пришельца и задает его начальную позицию.
         super().__init__()
         self.screen = ai_game.screen
+        self.screen_rect = ai_game.screen.get_rect()
         self.settings = ai_game.settings
+        # Генератор случайных чисел экземпляра игры (для воспроизводимых прогонов).
+        # Если у ai_game его нет, используется глобальный модуль random.
+        self.rng = getattr(ai_game, "rng", random)
 
         # Загрузка изображения пришельца
         if specific_image_path and os.path.exists(specific_image_path):
@@ -64,7 +134,7 @@ class Alien(Sprite):
         elif (
             self.settings.alien_sprite_paths
         ):  # Если есть список путей и specific_image_path не задан
-            self.image_path = random.choice(self.settings.alien_sprite_paths)
+            self.image_path = self.rng.choice(self.settings.alien_sprite_paths)
         else:
             # Этот блок теперь должен быть недостижим, если self.settings.alien_sprite_paths
             # всегда содержит хотя бы один путь (например, fallback 'alien_ship_01.png'),
@@ -77,9 +147,17 @@ class Alien(Sprite):
             # и полагаемся на try-except блок ниже, который создаст цветную поверхность.
             self.image_path = None
 
+        # Размер спрайта пришельца на экране
+        display_size = (
+            self.settings.alien_display_width,
+            self.settings.alien_display_height,
+        )
+        # Русский комментарий: Случайный оттенок из ограниченной палитры. Окрашенные варианты
+        # спрайта строятся один раз (image_cache) и общие для всех пришельцев с этим оттенком.
+        self.tint_color = _TINT_PALETTE[self.rng.randrange(len(_TINT_PALETTE))]
         try:
             if self.image_path:  # Только если image_path не None
-                self.image = pygame.image.load(self.image_path).convert_alpha()
+                self.image = _load_tinted_image(self.image_path, display_size, self.tint_color)
             else:  # Если image_path is None (из-за критической ошибки выше)
                 raise pygame.error("No image path provided for alien sprite.")
         except pygame.error as e:
@@ -88,60 +166,10 @@ class Alien(Sprite):
                 self.image_path,
                 e,
             )
-            # Используем размеры из настроек для fallback
-            fallback_size = (
-                self.settings.alien_display_width,
-                self.settings.alien_display_height,
-            )
-            self.image = pygame.Surface(fallback_size)
+            # Fallback сразу создается нужного размера и окрашивается тем же оттенком
+            self.image = pygame.Surface(display_size)
             self.image.fill(_FALLBACK_ALIEN_COLOR)
-
-        # Масштабирование спрайта пришельца
-        self.image = pygame.transform.scale(
-            self.image,
-            (self.settings.alien_display_width, self.settings.alien_display_height),
-        )
-
-        # Русский комментарий: Применяем случайный оттенок, если изображение загружено успешно
-        # Проверка, что это не fallback Surface(1,1) или что-то подобное
-        if (
-            hasattr(self, "image")
-            and self.image.get_width() > 1
-            and self.image.get_height() > 1
-        ):
-            # Выбираем случайный цвет для оттенка (R, G, B) и альфа-канал для интенсивности
-            # Фракций пока нет, поэтому оттенок полностью случайный для каждого пришельца
-            # 0 или 1, чтобы один из каналов был доминирующим или отсутствовал
-            r = random.randint(0, 1)  # 0 or 1 for off/on
-            g = random.randint(0, 1)  # 0 or 1 for off/on
-            b = random.randint(0, 1)  # 0 or 1 for off/on
-            # Чтобы цвет был не слишком темным, убедимся, что хотя бы один канал не нулевой (если r,g,b все 0)
-            if r == 0 and g == 0 and b == 0:  # All channels are zero
-                choice = random.randint(_MIN_CHANNEL_CHOICE, _MAX_CHANNEL_CHOICE)
-                if choice == _MIN_CHANNEL_CHOICE:  # 0
-                    r = 1
-                elif choice == _MIN_CHANNEL_CHOICE + 1:  # 1
-                    g = 1
-                else:
-                    b = 1  # choice will be _MAX_CHANNEL_CHOICE (2)
-
-            # Интенсивность основного цвета
-            tint_r = r * random.randint(_MIN_TINT_INTENSITY, _MAX_TINT_INTENSITY)
-            tint_g = g * random.randint(_MIN_TINT_INTENSITY, _MAX_TINT_INTENSITY)
-            tint_b = b * random.randint(_MIN_TINT_INTENSITY, _MAX_TINT_INTENSITY)
-            # Прозрачность оттенка (50-100 из 255)
-            tint_alpha = random.randint(_MIN_TINT_ALPHA, _MAX_TINT_ALPHA)
-
-            chosen_tint_color = (tint_r, tint_g, tint_b, tint_alpha)
-            logger.debug(
-                "Применяем оттенок %s к %s",
-                chosen_tint_color,
-                self.image_path if self.image_path else "N/A",
-            )
-            self.image = _apply_tint(self.image, chosen_tint_color)
-
-        # Масштабирование спрайта пришельца было перенесено выше, перед применением оттенка,
-        # чтобы оттенок применялся к уже масштабированному изображению.
+            self.image = _apply_tint(self.image, self.tint_color)
 
         # Ensure self.rect is a real pygame.Rect for compatibility with pygame collision functions
         # even if self.image might be a MockSurface in tests (which returns a MockRect from get_rect())
@@ -164,12 +192,11 @@ class Alien(Sprite):
 
     def check_edges(self):
         """Возвращает True, если пришелец находится у края экрана"""
-        screen_rect = self.screen.get_rect()
-        if self.rect.right >= screen_rect.right or self.rect.left <= 0:
+        if self.rect.right >= self.screen_rect.right or self.rect.left <= 0:
             return True
 
-    def update(self):
-        """Перемещает пришельца вправо или влево в зависимости от fleet_direction"""  # Обновленный комментарий
-        # Используем alien_speed_current для определения скорости пришельца
-        self.x += self.settings.alien_speed_current * self.settings.fleet_direction
+    def update(self, dt):
+        """Перемещает пришельца вправо или влево в зависимости от fleet_direction (dt в секундах)"""
+        # Используем alien_speed_current (пикселей в секунду) для определения скорости пришельца
+        self.x += self.settings.alien_speed_current * self.settings.fleet_direction * dt
         self.rect.x = int(self.x) # Вернул int()
@@ -1,5 +1,7 @@
 import sys
-from time import sleep
+import argparse
+import functools
+import time
 
 import pygame
 import pygame.mixer  # Добавлен импорт для звука
@@ -9,14 +11,22 @@ import os
 
 from alien_invasion.settings import Settings
 from alien_invasion.game_stats import GameStats
-from alien_invasion.scoreboard import Scoreboard
+from alien_invasion.scoreboard import HUD_LEVEL, HUD_SCORE, HUD_SHIPS, Scoreboard
 from alien_invasion.button import Button
 from alien_invasion.ship import Ship
 from alien_invasion.bullet import Bullet
-from alien_invasion.alien import Alien
+from alien_invasion.alien import Alien, preload_tinted_images
+from alien_invasion.fleet import Fleet
 from alien_invasion.powerup import PowerUp
-from alien_invasion.starfield import Starfield  # Импорт класса Starfield
+from alien_invasion.starfield import create_starfield
 from alien_invasion.space_object import SpaceObject  # Added import
+from alien_invasion.replay import ReplayRecorder
+from alien_invasion import frame_timing
+from alien_invasion import audio_cache
+from alien_invasion import image_cache
+from alien_invasion.frame_timing import FrameTimer
+from alien_invasion.dirty_rects import DirtyRectRenderer
+from alien_invasion.preloader import AssetPreloader
 import random
 
 # Импортируем math для floor, ceil, или других функций, если понадобятся.
@@ -42,6 +52,13 @@ _DOUBLE_FIRE_POWERUP_MIN_LEVEL = 3
 _PAUSE_TEXT_SPACING_ABOVE_BUTTON = 20
 _PAUSE_ELEMENT_TOP_MARGIN = 20
 _PAUSE_ICON_TEXT_SPACING = 10
+# Период мигания корабля во время паузы после потери жизни (в шагах симуляции)
+_RESPAWN_BLINK_PERIOD_TICKS = 12
+# Имена задач фоновой загрузки (alien_invasion/preloader.py)
+_PRELOAD_IMAGE_TASK = "image:{}"
+_PRELOAD_SOUND_TASK = "sound:{}"
+_PRELOAD_MUSIC_TASK = "music:{}"
+_PRELOAD_TEXT_SPACING_Y = 5  # Между полосой загрузки и подписью
 
 
 class AlienInvasion:
@@ -53,8 +70,37 @@ class AlienInvasion:
     STATE_PAUSED = "paused"
     STATE_GAME_OVER = "game_over"
 
-    def __init__(self):
-        """Инициализирует игру и создает игровые ресурсы."""  # Форматирование PEP8
+    def __init__(
+        self, headless=False, seed=None, record_path=None, preload=False, persist_high_score=None
+    ):
+        """Инициализирует игру и создает игровые ресурсы.
+
+        headless=True запускает игру без окна и звука (драйверы SDL "dummy"),
+        чтобы управлять ею через reset()/step() в ботах и прогонах баланса.
+        seed - зерно генератора случайных чисел игры; одинаковое зерно и одинаковый
+        ввод дают одинаковый прогон. None - случайное зерно.
+        record_path - файл, в который записывается реплей каждой игры, начатой из меню.
+        preload=True показывает меню сразу, а звуки, музыку, спрайты и иконки загружает
+        в фоновом потоке (см. alien_invasion/preloader.py); Scoreboard и корабль
+        создаются, когда загрузка завершится или игрок нажмет "Новая игра".
+        persist_high_score - читать и записывать рекорд в settings.highscore_filepath.
+        None - только вне headless-режима: прогоны ботов не меняют рекорд игрока.
+        """  # Форматирование PEP8
+        # Замер времени запуска: создание игры, первый кадр меню, готовность ассетов (мс).
+        self._startup_started = time.perf_counter()
+        self.startup_timings = {}
+        self.headless = headless
+        # Собственный генератор случайных чисел экземпляра игры. Все игровые модули
+        # (пришельцы, флот, звезды, космические объекты) берут случайность из него,
+        # поэтому несколько игр в одном процессе не влияют друг на друга.
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # Запись ввода игрока для последующего воспроизведения (см. alien_invasion/replay.py).
+        self.recorder = ReplayRecorder(record_path) if record_path else None
+        if self.headless:
+            # "Пустые" драйверы SDL должны быть выбраны до pygame.init().
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
 
         # Проверка поддержки расширенных изображений (PNG)
@@ -67,27 +113,65 @@ class AlienInvasion:
             )
 
         self.settings = Settings()
+        if self.headless:
+            # В headless-режиме звук не нужен: звуки и музыка не загружаются.
+            self.settings.audio_enabled = False
+        if persist_high_score is None:
+            persist_high_score = not self.headless
+        self.settings.highscore_persist = persist_high_score
 
         self.screen = pygame.display.set_mode(
             (self.settings.screen_width, self.settings.screen_height)
         )
         pygame.display.set_caption("Alien Invasion")
 
-        # Создание экземпляра звездного поля
-        self.starfield = Starfield(
-            self.screen, self.settings.screen_width, self.settings.screen_height
+        # Игровой цикл с фиксированным шагом: симуляция идет с частотой settings.sim_tick_rate,
+        # отрисовка - не чаще settings.render_fps_limit кадров в секунду.
+        self.clock = pygame.time.Clock()
+        self.sim_dt = 1.0 / self.settings.sim_tick_rate  # Длительность шага в секундах
+        self.sim_accumulator = 0.0  # Накопленное, но еще не просимулированное время
+        # Время симуляции в миллисекундах. Все игровые таймеры (эффекты бонусов, спавн фоновых
+        # объектов) используют его вместо системного времени, поэтому ускоренная симуляция
+        # в headless-режиме ведет себя так же, как игра в реальном времени.
+        self.sim_time_ms = 0.0
+        # Замер времени фаз кадра; пока оверлей выключен, замер почти ничего не стоит.
+        self.frame_timer = FrameTimer(
+            self.settings.frame_timing_buffer_frames,
+            self.settings.frame_timing_overlay_refresh_ms,
         )
 
+        # Создание фона (звездное поле или слои с параллаксом, settings.background_mode)
+        self.starfield = create_starfield(self.settings, self.screen, self.rng)
+
+        # Кадр записывается в renderer и выводится на экран только изменившимися областями;
+        # None - кадр рисуется прямо на экран и выводится целиком. В headless-режиме кадр
+        # никуда не выводится, и учет изменений был бы лишней работой. Фон, который меняет
+        # весь экран в каждом кадре (слои с параллаксом), тоже рисуется без учета изменений:
+        # renderer все равно перерисовывал бы каждый кадр целиком.
+        self.renderer = None
+        if (
+            self.settings.dirty_rect_rendering
+            and not self.headless
+            and not self.starfield.redraws_every_frame
+        ):
+            self.renderer = DirtyRectRenderer(
+                self.screen,
+                self.settings.dirty_rect_full_redraw_threshold,
+                self.settings.dirty_rect_max_rects,
+            )
+
         # Создание экземпляра для хранения игровой статистики
         self.stats = GameStats(self)
-        self.sb = Scoreboard(self)
+        # Scoreboard и корабль (используется/рисуется только в STATE_PLAYING) создаются
+        # в _load_game_assets(): сразу или после фоновой загрузки ассетов.
+        self.sb = None
+        self.ship = None
 
         self.game_state = self.STATE_MENU  # Начальное состояние игры - Меню
 
-        # Корабль создается, но будет использоваться/рисоваться только в STATE_PLAYING
-        self.ship = Ship(self)
         self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        # Флот - группа пришельцев в строю: движение и опускание меняют только его origin.
+        self.aliens = Fleet(self.settings)
 
         # Кнопки меню
         self.new_game_button = Button(self, self.settings.text_new_game_button)
@@ -132,8 +216,11 @@ class AlienInvasion:
         self.powerups = pygame.sprite.Group()
         # self.last_double_fire_spawn_time = 0 # Удалено: Заменено системой "мешка с шариками" для бонусов.
         # self.last_shield_spawn_time = 0 # Удалено: Заменено системой "мешка с шариками" для бонусов.
-        # Время начала текущего уровня (в тиках pygame.time.get_ticks()).
+        # Время начала текущего уровня (в мс времени симуляции, см. get_sim_ticks()).
         self.level_start_time = 0
+        # Пауза после потери жизни: сколько шагов симуляции осталось до продолжения раунда.
+        # Пока она идет, игра остается в STATE_PLAYING, но флот, корабль и снаряды стоят.
+        self.respawn_ticks_left = 0
 
         # Счетчики волны (могут быть полезны для отладки или специфических механик).
         self.aliens_in_wave = 0  # Общее количество пришельцев в текущей волне.
@@ -181,18 +268,71 @@ class AlienInvasion:
             )
         # --- Конец новой последовательности инициализации аудио ---
 
-        # Загрузка звуковых эффектов (только если аудиосистема включена)
+        # Звуки, музыка и иконки UI загружаются в _load_game_assets()
         self.sound_laser = None
         self.sound_powerup = None
         self.sound_shield_recharge = None
         self.sounds_explosion = []
+        self.pause_icon = None
+        self.paused_text_surface = None
 
+        # Группа для процедурных космических объектов (планеты, галактики)
+        self.space_objects = pygame.sprite.Group()
+        self.last_space_object_spawn_time = self.get_sim_ticks()
+        # Интервал появления космических объектов (теперь читается из settings)
+        self.space_object_spawn_interval_min = (
+            self.settings.space_object_base_interval_s
+            - self.settings.space_object_interval_variance_s
+        ) * _MILLISECONDS_PER_SECOND
+        self.space_object_spawn_interval_max = (
+            self.settings.space_object_base_interval_s
+            + self.settings.space_object_interval_variance_s
+        ) * _MILLISECONDS_PER_SECOND
+        self.current_spawn_interval = self._roll_space_object_spawn_interval()
+        # Убедимся, что минимальный интервал не отрицательный
+        if self.space_object_spawn_interval_min < 0:
+            self.space_object_spawn_interval_min = 0
+            logger.warning(
+                "Минимальный интервал появления космических объектов был отрицательным, исправлено на 0."
+            )
+
+        # Фоновая загрузка ассетов (preload=True) или обычная загрузка до показа меню
+        self.preloader = None
+        self.assets_ready = False
+        self._preload_status = None  # (процент, Surface подписи) индикатора загрузки
+        self._preload_frame = None  # Рамка полосы прогресса (Surface с прозрачной серединой)
+        if preload:
+            self._preload_font = pygame.font.SysFont(
+                self.settings.button_font_name, self.settings.preload_text_font_size
+            )
+            self.preloader = AssetPreloader(self._build_preload_tasks())
+            self.preloader.start()
+        else:
+            self._load_game_assets()
+        self.startup_timings["init_ms"] = self._startup_elapsed_ms()
+        logger.info("Игра создана за %.1f мс.", self.startup_timings["init_ms"])
+
+    def _load_game_assets(self):
+        """Создает Scoreboard и корабль, загружает звуки, музыку и иконку паузы.
+
+        После фоновой загрузки (preload=True) изображения уже лежат в image_cache,
+        а звуки декодированы, поэтому здесь ассеты только собираются в объекты игры.
+        """
+        self.sb = Scoreboard(self)
+        self.ship = Ship(self)
+        self._load_audio()
+        self._load_pause_icon()
+        self._prep_paused_text()
+        self.assets_ready = True
+
+    def _load_audio(self):
+        """Загружает звуковые эффекты и запускает фоновую музыку (если аудиосистема включена)."""
         if self.sound_system_initialized and self.settings.audio_enabled:
             try:
                 # Русский комментарий: Путь к файлу звука лазера из настроек
                 sfx_laser_path = self.settings.sound_laser_path
                 if os.path.exists(sfx_laser_path):
-                    self.sound_laser = pygame.mixer.Sound(sfx_laser_path)
+                    self.sound_laser = self._make_sound(sfx_laser_path)
                 else:
                     logger.warning(
                         "Загрузка ассета не удалась: Звуковой файл не найден: %s",
@@ -202,7 +342,7 @@ class AlienInvasion:
                 # Путь к файлу звука подбора бонуса из настроек
                 sfx_powerup_path = self.settings.sound_powerup_path
                 if os.path.exists(sfx_powerup_path):
-                    self.sound_powerup = pygame.mixer.Sound(sfx_powerup_path)
+                    self.sound_powerup = self._make_sound(sfx_powerup_path)
                 else:
                     logger.warning(
                         "Загрузка ассета не удалась: Звуковой файл не найден: %s",
@@ -212,7 +352,7 @@ class AlienInvasion:
                 # Путь к файлу звука перезарядки щита из настроек
                 sfx_shield_path = self.settings.sound_shield_recharge_path
                 if os.path.exists(sfx_shield_path):
-                    self.sound_shield_recharge = pygame.mixer.Sound(sfx_shield_path)
+                    self.sound_shield_recharge = self._make_sound(sfx_shield_path)
                 else:
                     logger.warning(
                         "Загрузка ассета не удалась: Звуковой файл не найден: %s",
@@ -227,7 +367,7 @@ class AlienInvasion:
                     # Формируем путь к звуку взрыва, используя паттерн из настроек
                     sound_path = self.settings.sound_explosion_pattern.format(i)
                     if os.path.exists(sound_path):
-                        self.sounds_explosion.append(pygame.mixer.Sound(sound_path))
+                        self.sounds_explosion.append(self._make_sound(sound_path))
                     else:
                         logger.warning(
                             "Загрузка ассета не удалась: Звуковой файл не найден: %s",
@@ -249,7 +389,7 @@ class AlienInvasion:
             try:
                 music_path = self.settings.music_background_path # Используем путь из настроек
                 if os.path.exists(music_path):
-                    pygame.mixer.music.load(music_path)
+                    self._load_music(music_path)
                     pygame.mixer.music.set_volume(self.settings.music_volume) # Громкость музыки (0.0 до 1.0)
                     pygame.mixer.music.play(-1)  # -1 для бесконечного цикла
                 else:
@@ -259,20 +399,17 @@ class AlienInvasion:
         else:
             logger.info("Загрузка звуков пропущена, так как аудиосистема отключена.")
 
-        # Загрузка UI иконок (например, для кнопки паузы)
-        self.pause_icon = None
+    def _load_pause_icon(self):
+        """Загружает иконку паузы из настроек."""
         # icon_size_ui = (32, 32) # Replaced by _PAUSE_ICON_SIZE
-
         try:
             # Русский комментарий: Путь к иконке паузы из настроек.
             pause_icon_path = (
                 self.settings.ui_pause_icon_path
             )  # Используем путь из настроек
             if os.path.exists(pause_icon_path):
-                self.pause_icon = pygame.image.load(pause_icon_path).convert_alpha()
-                self.pause_icon = pygame.transform.scale(
-                    self.pause_icon, _PAUSE_ICON_SIZE
-                )
+                # Общая поверхность из image_cache (атлас или файл)
+                self.pause_icon = image_cache.load_image(pause_icon_path, _PAUSE_ICON_SIZE)
             else:
                 # Русский комментарий: Предупреждение о ненайденной иконке UI.
                 logger.warning(
@@ -288,34 +425,8 @@ class AlienInvasion:
                 exc_info=True,
             )
 
-        # Группа для процедурных космических объектов (планеты, галактики)
-        self.space_objects = pygame.sprite.Group()
-        self.last_space_object_spawn_time = pygame.time.get_ticks()
-        # Интервал появления космических объектов (теперь читается из settings)
-        self.space_object_spawn_interval_min = (
-            self.settings.space_object_base_interval_s
-            - self.settings.space_object_interval_variance_s
-        ) * _MILLISECONDS_PER_SECOND
-        self.space_object_spawn_interval_max = (
-            self.settings.space_object_base_interval_s
-            + self.settings.space_object_interval_variance_s
-        ) * _MILLISECONDS_PER_SECOND
-        self.current_spawn_interval = random.randint(
-            self.space_object_spawn_interval_min, self.space_object_spawn_interval_max
-        )
-        # Убедимся, что минимальный интервал не отрицательный
-        if self.space_object_spawn_interval_min < 0:
-            self.space_object_spawn_interval_min = 0
-            logger.warning(
-                "Минимальный интервал появления космических объектов был отрицательным, исправлено на 0."
-            )
-        if (
-            self.current_spawn_interval < 0
-        ):  # Если вдруг из-за отрицательного min выбран отрицательный current
-            self.current_spawn_interval = random.randint(
-                0, self.space_object_spawn_interval_max
-            )
-
+    def _prep_paused_text(self):
+        """Рендерит текст "Пауза" один раз (шрифт Scoreboard)."""
         # --- Кэширование Surface для текста "Пауза" ---
         # Создаем Surface для текста "Пауза" один раз при инициализации для оптимизации.
         # Используем шрифт и цвет из Scoreboard для консистентности, или можно определить отдельные настройки.
@@ -351,84 +462,346 @@ class AlienInvasion:
             )
         # --- Конец кэширования ---
 
+    def _build_preload_tasks(self):
+        """Задачи фоновой загрузки: спрайты и иконки в image_cache, звуки и музыка.
+
+        Изображения загружаются в исходном размере (масштабирование дешево и делается
+        при создании объектов), окрашенные варианты пришельцев строятся заранее.
+        """
+        image_paths = [
+            self.settings.ship_image_path,
+            self.settings.ui_heart_icon_path,
+            self.settings.ui_score_frame_bg_path,
+            self.settings.ui_pause_icon_path,
+            self.settings.powerup_shield_image_path,
+            self.settings.powerup_double_fire_image_path,
+        ]
+        tasks = [
+            (_PRELOAD_IMAGE_TASK.format(path), functools.partial(image_cache.load_image, path))
+            for path in image_paths
+        ]
+        alien_size = (self.settings.alien_display_width, self.settings.alien_display_height)
+        tasks.extend(
+            (
+                _PRELOAD_IMAGE_TASK.format(path),
+                functools.partial(preload_tinted_images, path, alien_size),
+            )
+            for path in self.settings.alien_sprite_paths
+        )
+        if self.sound_system_initialized and self.settings.audio_enabled:
+            sound_paths = [
+                self.settings.sound_laser_path,
+                self.settings.sound_powerup_path,
+                self.settings.sound_shield_recharge_path,
+            ] + [
+                self.settings.sound_explosion_pattern.format(i)
+                for i in range(_EXPLOSION_SOUND_INDEX_START, _EXPLOSION_SOUND_INDEX_END + 1)
+            ]
+            tasks.extend(
+                (
+                    _PRELOAD_SOUND_TASK.format(path),
+                    functools.partial(audio_cache.load_sound, path, self.settings.audio_cache_dir),
+                )
+                for path in sound_paths
+            )
+            music_path = self.settings.music_background_path
+            tasks.append(
+                (
+                    _PRELOAD_MUSIC_TASK.format(music_path),
+                    functools.partial(pygame.mixer.music.load, music_path),
+                )
+            )
+        return tasks
+
+    def _preloaded(self, name):
+        """True, если фоновая задача name выполнена; ее ошибка возбуждается повторно."""
+        if self.preloader is None or name not in self.preloader.results:
+            return False
+        if name in self.preloader.errors:
+            raise self.preloader.errors[name]
+        return True
+
+    def _make_sound(self, path):
+        """Звук, декодированный фоновой загрузкой, или загружает его сейчас (через кэш PCM)."""
+        name = _PRELOAD_SOUND_TASK.format(path)
+        if self._preloaded(name):
+            return self.preloader.results[name]
+        return audio_cache.load_sound(path, self.settings.audio_cache_dir)
+
+    def _load_music(self, path):
+        """Загружает фоновую музыку, если фоновая загрузка еще не сделала этого."""
+        if not self._preloaded(_PRELOAD_MUSIC_TASK.format(path)):
+            pygame.mixer.music.load(path)
+
+    def _startup_elapsed_ms(self):
+        return (time.perf_counter() - self._startup_started) * _MILLISECONDS_PER_SECOND
+
+    def _finish_preload(self, wait=False):
+        """Собирает ассеты фоновой загрузки, когда она завершена.
+
+        wait=True блокирует до ее завершения (нажата "Новая игра", reset()).
+        Возвращает True, если ассеты готовы.
+        """
+        if self.assets_ready:
+            return True
+        if wait:
+            wait_started = time.perf_counter()
+            self.preloader.wait()
+            logger.info(
+                "Ожидание фоновой загрузки ассетов: %.1f мс.",
+                (time.perf_counter() - wait_started) * _MILLISECONDS_PER_SECOND,
+            )
+        elif not self.preloader.is_done():
+            return False
+        self._load_game_assets()
+        self.startup_timings["assets_ready_ms"] = self._startup_elapsed_ms()
+        logger.info(
+            "Ассеты готовы через %.1f мс после запуска.", self.startup_timings["assets_ready_ms"]
+        )
+        return True
+
+    def _draw_preload_progress(self, surface):
+        """Рисует на surface под кнопками меню полосу прогресса фоновой загрузки и подпись с процентами."""
+        percent = int(self.preloader.progress * 100)
+        if self._preload_status is None or self._preload_status[0] != percent:
+            # Подпись перерисовывается только при изменении процента
+            label = self._preload_font.render(
+                self.settings.text_preload_message.format(percent),
+                True,
+                self.settings.preload_bar_border_color,
+            )
+            self._preload_status = (percent, label)
+        label = self._preload_status[1]
+
+        bar_rect = pygame.Rect(0, 0, self.settings.preload_bar_width, self.settings.preload_bar_height)
+        bar_rect.centerx = self.screen.get_rect().centerx
+        bar_rect.top = self.exit_button.rect.bottom + self.settings.preload_bar_spacing_y
+        fill_rect = bar_rect.copy()
+        fill_rect.width = int(bar_rect.width * self.preloader.progress)
+        surface.fill(self.settings.preload_bar_color, fill_rect)
+        surface.blit(self._preload_bar_frame(bar_rect.size), bar_rect)
+        surface.blit(
+            label,
+            label.get_rect(centerx=bar_rect.centerx, top=bar_rect.bottom + _PRELOAD_TEXT_SPACING_Y),
+        )
+
+    def _preload_bar_frame(self, size):
+        """Рамка полосы прогресса: поверхность с прозрачной серединой, создается один раз."""
+        if self._preload_frame is None or self._preload_frame.get_size() != tuple(size):
+            frame = pygame.Surface(size)
+            transparent = (0, 0, 0) if self.settings.preload_bar_border_color != (0, 0, 0) else (255, 0, 255)
+            frame.fill(transparent)
+            frame.set_colorkey(transparent)
+            pygame.draw.rect(frame, self.settings.preload_bar_border_color, frame.get_rect(), 1)
+            self._preload_frame = frame
+        return self._preload_frame
+
     def run_game(self):
-        """Запуск основного цикла игры."""  # Форматирование PEP8
-
-        # frame_counter = 0
-        # max_frames_for_profiling = 200 # Логика перенесена в main_profiled
-
-        while True:
-            # if IS_PROFILING_RUN_FLAG: # Логика перенесена в main_profiled
-            #     if frame_counter >= max_frames_for_profiling:
-            #         sys.exit("Profiling frame limit reached")
-            #     frame_counter += 1
-
-            # Если PROFILE_MODE глобальная или передана, можно использовать ее здесь
-            # Для простоты, предположим, что если main_profiled вызывается, то мы в режиме профилирования.
-            # Однако, PROFILE_MODE установлена в __main__, так что run_game не знает о ней напрямую.
-            # Лучше передать это как параметр или установить атрибут в self.settings или self.
-            # В данном случае, т.к. main_profiled вызывает run_game, можно положиться на то,
-            # что run_profiler_and_save_stats завершит процесс.
-            # Но для надежности, добавим проверку на PROFILE_MODE, если бы она была доступна здесь.
-            # Поскольку PROFILE_MODE не доступна здесь напрямую, а timeout уже был,
-            # попробуем более простой вариант - просто запустить и надеяться, что QUIT обработается.
-            # Предыдущий таймаут был на уровне выполнения команды.
-            # Попробуем еще раз, но если снова таймаут, то нужно будет передать PROFILE_MODE внутрь класса.
-
-            # --- Начало изменения для принудительного выхода при профилировании ---
-            # Этот код будет активен только если PROFILE_MODE в __main__ была True
-            # и мы запустили run_profiler_and_save_stats -> main_profiled -> ai.run_game()
-            # Чтобы этот код работал, нужно, чтобы AlienInvasion знал о PROFILE_MODE.
-            # Проще всего это сделать, если run_profiler_and_save_stats установит
-            # какой-то флаг в settings или передаст аргумент.
-            # Пока что, для простоты, я оставлю этот код здесь, но он не будет работать без
-            # передачи флага PROFILE_MODE в AlienInvasion.
-            # Вместо этого, я буду полагаться на то, что _check_events() обработает sys.exit()
-            # корректно, если Pygame сможет инициализировать display.
-
-            # --- Коррекция: Добавим frame_counter, если PROFILE_MODE была установлена в __main__ ---
-            # Старая логика с is_profiling_run удалена отсюда, так как заменена глобальным флагом и sys.exit() выше.
-            self._check_events()
-
-            # Обновление состояния звездного поля (прокрутка)
-            # Выполняется всегда, чтобы звезды двигались даже в меню или на паузе.
-            self.starfield.update()
-
-            if self.game_state == self.STATE_PLAYING:
-                self.ship.update()
-                self._update_bullets()
-
-                # Логика динамической сложности (DDA) внутри уровня: постепенное увеличение скорости пришельцев.
-                # Эта скорость (alien_speed_current) сбрасывается для каждого нового уровня в initialize_dynamic_settings.
-                if hasattr(self.settings, "alien_speed_increase_rate") and hasattr(
-                    self.settings, "alien_speed_max_level"
-                ):
-                    if (
-                        self.settings.alien_speed_current
-                        < self.settings.alien_speed_max_level
-                    ):
-                        self.settings.alien_speed_current += (
-                            self.settings.alien_speed_increase_rate
-                        )
-                        # Ограничение текущей скорости максимальной скоростью для данного уровня (из alien_speed_max_level).
-                        self.settings.alien_speed_current = min(
-                            self.settings.alien_speed_current,
-                            self.settings.alien_speed_max_level,
-                        )
+        """Запуск основного цикла игры с фиксированным шагом симуляции."""  # Форматирование PEP8
+        first_frame = True
+        try:
+            while True:
+                if not self.assets_ready:
+                    self._finish_preload()
+                # clock.tick ограничивает частоту отрисовки (и загрузку CPU) и возвращает
+                # время, прошедшее с предыдущего кадра, в миллисекундах.
+                frame_time_s = (
+                    self.clock.tick(self.settings.render_fps_limit)
+                    / _MILLISECONDS_PER_SECOND
+                )
+                self.frame_timer.begin_frame()
+                self._check_events()
+                self.frame_timer.lap(frame_timing.PHASE_EVENTS)
+                self._run_simulation_ticks(frame_time_s)
+                self._update_screen()
+                self.frame_timer.end_frame()
+                if first_frame:
+                    first_frame = False
+                    self.startup_timings["first_frame_ms"] = self._startup_elapsed_ms()
+                    logger.info(
+                        "Меню показано через %.1f мс после запуска.",
+                        self.startup_timings["first_frame_ms"],
+                    )
+        finally:
+            # Выход из игры (sys.exit) сохраняет незавершенную запись реплея и рекорд.
+            if self.recorder:
+                self.recorder.stop()
+            self.stats.flush_high_score(wait=True)
+
+    def _run_simulation_ticks(self, frame_time_s):
+        """Накапливает прошедшее время и выполняет нужное число шагов симуляции.
+
+        Возвращает количество выполненных шагов. Если за кадр накопилось больше,
+        чем settings.max_catchup_ticks шагов, остаток времени отбрасывается,
+        чтобы медленный кадр не порождал все более длинные кадры ("спираль смерти").
+        """
+        self.sim_accumulator += frame_time_s
+        ticks_run = 0
+        while self.sim_accumulator >= self.sim_dt:
+            if ticks_run >= self.settings.max_catchup_ticks:
+                logger.debug(
+                    "Превышен лимит шагов симуляции за кадр (%d), отброшено %.3f с.",
+                    self.settings.max_catchup_ticks,
+                    self.sim_accumulator,
+                )
+                self.sim_accumulator = 0.0
+                break
+            self._record_input_tick()
+            self._update_simulation(self.sim_dt)
+            self.sim_accumulator -= self.sim_dt
+            ticks_run += 1
+        return ticks_run
+
+    def _record_input_tick(self):
+        """Записывает в реплей ввод, действующий на очередном шаге симуляции."""
+        if self.recorder is None or not self.recorder.recording:
+            return
+        if self.game_state not in (self.STATE_PLAYING, self.STATE_PAUSED):
+            # Игра окончена или игрок вышел в меню - запись завершена.
+            self.recorder.stop()
+            return
+        self.recorder.record_tick(
+            self.ship.moving_left,
+            self.ship.moving_right,
+            self.game_state == self.STATE_PAUSED,
+        )
+
+    def _start_new_game_from_menu(self):
+        """Начинает новую игру по кнопке меню; при записи реплея - с известным зерном."""
+        # Ждем только ту часть фоновой загрузки, которая еще не завершилась.
+        self._finish_preload(wait=True)
+        if self.recorder is None:
+            self._start_new_game()
+            return
+        # Каждая записанная игра получает свое зерно: реплей начинается с reset(seed).
+        seed = self.rng.randrange(2**63)
+        self.reset(seed=seed)
+        self.recorder.start(seed, self.settings.sim_tick_rate)
+
+    def get_sim_ticks(self):
+        """Возвращает время симуляции в миллисекундах (аналог pygame.time.get_ticks())."""
+        return int(self.sim_time_ms)
 
-                self._update_aliens()
-                self.powerups.update()
-                self._check_ship_powerup_collisions()
-                self._try_spawn_space_object()
-                self.space_objects.update()
-            elif self.game_state == self.STATE_MENU:
-                # Placeholder for menu update logic (e.g., self._update_menu())
-                pass
-            elif self.game_state == self.STATE_PAUSED:
-                # Placeholder for pause screen update logic (e.g., self._update_pause_screen())
-                pass
+    def reset(self, seed=None):
+        """Начинает новую игру и возвращает начальное состояние (для ботов и прогонов баланса).
 
-            self._update_screen()
+        seed - необязательное зерно генератора случайных чисел для воспроизводимых прогонов.
+        """
+        self._finish_preload(wait=True)
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        # Сбрасываем все, что зависит от времени симуляции и генератора случайных чисел,
+        # чтобы reset() с тем же зерном давал тот же прогон.
+        self.sim_accumulator = 0.0
+        self.sim_time_ms = 0.0
+        self.starfield = create_starfield(self.settings, self.screen, self.rng)
+        self.space_objects.empty()
+        self.last_space_object_spawn_time = self.get_sim_ticks()
+        self.current_spawn_interval = self._roll_space_object_spawn_interval()
+        self.ship.shield_active = False
+        self.ship.double_fire_active = False
+        self.ship.moving_left = False
+        self.ship.moving_right = False
+        self.ship.update_visual_state()
+        self._start_new_game()
+        return self.get_state()
+
+    def step(self, actions=None):
+        """Выполняет один шаг симуляции без отрисовки.
+
+        actions - словарь действий игрока на этом шаге: "left", "right" (удерживать
+        движение) и "fire" (выстрел). Отсутствующие ключи считаются False.
+        Возвращает кортеж (state, reward, done): состояние после шага, очки,
+        набранные за шаг, и признак окончания игры.
+        """
+        actions = actions or {}
+        score_before = self.stats.score
+        if self.game_state == self.STATE_PLAYING:
+            self.ship.moving_left = bool(actions.get("left"))
+            self.ship.moving_right = bool(actions.get("right"))
+            if actions.get("fire") and self.stats.game_active:
+                self._fire_bullet()
+
+        self._update_simulation(self.sim_dt)
+
+        reward = self.stats.score - score_before
+        done = self.game_state == self.STATE_GAME_OVER
+        return self.get_state(), reward, done
+
+    def get_state(self):
+        """Возвращает словарь с ключевыми параметрами текущего состояния игры."""
+        fleet_bounds = self.aliens.bounding_rect()
+        fleet_bottom = fleet_bounds.bottom if fleet_bounds else 0
+        return {
+            "time_ms": self.get_sim_ticks(),
+            "game_state": self.game_state,
+            "score": self.stats.score,
+            "level": self.stats.level,
+            "ships_left": self.stats.ships_left,
+            "ship_x": self.ship.rect.centerx,
+            "aliens_left": len(self.aliens),
+            "fleet_bottom": fleet_bottom,
+            "fleet_direction": self.settings.fleet_direction,
+            "bullets": len(self.bullets),
+            "powerups": len(self.powerups),
+            "shield_active": self.ship.shield_active,
+            "double_fire_active": self.ship.double_fire_active,
+            "respawning": self.respawn_ticks_left > 0,
+        }
+
+    def _update_simulation(self, dt):
+        """Выполняет один шаг симуляции длительностью dt секунд."""
+        self.sim_time_ms += dt * _MILLISECONDS_PER_SECOND
+
+        # Обновление состояния звездного поля (прокрутка)
+        # Выполняется всегда, чтобы звезды двигались даже в меню или на паузе.
+        self.starfield.update(dt)
+        self.frame_timer.lap(frame_timing.PHASE_STARFIELD)
+
+        if self.game_state == self.STATE_PLAYING and self.respawn_ticks_left > 0:
+            # Пауза после потери жизни идет по времени симуляции: фон и космические объекты
+            # движутся, окно отвечает, а на паузе (STATE_PAUSED) отсчет останавливается.
+            self.respawn_ticks_left -= 1
+            self._try_spawn_space_object()
+            self.space_objects.update(dt)
+            self.frame_timer.lap(frame_timing.PHASE_SPACE_OBJECTS)
+        elif self.game_state == self.STATE_PLAYING:
+            self.ship.update(dt)
+            self._update_bullets(dt)
+
+            # Логика динамической сложности (DDA) внутри уровня: постепенное увеличение скорости пришельцев.
+            # Эта скорость (alien_speed_current) сбрасывается для каждого нового уровня в initialize_dynamic_settings.
+            if hasattr(self.settings, "alien_speed_increase_rate") and hasattr(
+                self.settings, "alien_speed_max_level"
+            ):
+                if (
+                    self.settings.alien_speed_current
+                    < self.settings.alien_speed_max_level
+                ):
+                    self.settings.alien_speed_current += (
+                        self.settings.alien_speed_increase_rate * dt
+                    )
+                    # Ограничение текущей скорости максимальной скоростью для данного уровня (из alien_speed_max_level).
+                    self.settings.alien_speed_current = min(
+                        self.settings.alien_speed_current,
+                        self.settings.alien_speed_max_level,
+                    )
+
+            self._update_aliens(dt)
+            self.frame_timer.lap(frame_timing.PHASE_ALIENS)
+            self.powerups.update(dt)
+            self._check_ship_powerup_collisions()
+            self.frame_timer.lap(frame_timing.PHASE_POWERUPS)
+            self._try_spawn_space_object()
+            self.space_objects.update(dt)
+            self.frame_timer.lap(frame_timing.PHASE_SPACE_OBJECTS)
+        elif self.game_state == self.STATE_MENU:
+            # Placeholder for menu update logic (e.g., self._update_menu())
+            pass
+        elif self.game_state == self.STATE_PAUSED:
+            # Placeholder for pause screen update logic (e.g., self._update_pause_screen())
+            pass
 
     def _check_events(self):
         """Обрабатывает нажатия клавиш и события мыши"""
@@ -463,6 +836,10 @@ class AlienInvasion:
                     self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                # Содержимое окна могло быть потеряно - следующий кадр выводится целиком
+                if self.renderer:
+                    self.renderer.invalidate()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
                 if (
@@ -473,7 +850,7 @@ class AlienInvasion:
                     clicked_exit = self.exit_button.is_clicked(mouse_pos)
 
                     if clicked_new_game:
-                        self._start_new_game()
+                        self._start_new_game_from_menu()
                     elif clicked_exit:
                         sys.exit()
                 elif self.game_state == self.STATE_PAUSED:
@@ -487,7 +864,8 @@ class AlienInvasion:
                         self.game_state = self.STATE_PLAYING
                         pygame.mouse.set_visible(False)
                     elif clicked_restart_paused:
-                        self._start_new_game()  # Этот метод уже устанавливает PLAYING и скрывает мышь
+                        # Этот метод уже устанавливает PLAYING и скрывает мышь
+                        self._start_new_game_from_menu()
                     elif clicked_main_menu:
                         self.game_state = self.STATE_MENU
                         # Убедимся, что мышь видна в меню
@@ -518,17 +896,16 @@ class AlienInvasion:
         # self.last_double_fire_spawn_time = 0 # Удалено (система бонусов изменена)
         # self.last_shield_spawn_time = 0 # Удалено (система бонусов изменена)
         self.level_start_time = (
-            pygame.time.get_ticks()
+            self.get_sim_ticks()
         )  # Установка времени начала уровня
 
         # Сброс счетчиков волны
         self.aliens_in_wave = 0
         self.aliens_destroyed_current_wave = 0
         # self.guaranteed_powerup_spawned_this_wave = False # Удалено (система бонусов изменена)
+        self.respawn_ticks_left = 0
 
-        self.sb.prep_score()
-        self.sb.prep_level()
-        self.sb.prep_ships()
+        self.sb.mark_changed(HUD_SCORE, HUD_LEVEL, HUD_SHIPS)
         # Сброс элементов раунда
         self._reset_round_elements()
         # Указатель мыши скрывается
@@ -554,9 +931,17 @@ class AlienInvasion:
             sys.exit()
         elif event.key == pygame.K_SPACE and self.stats.game_active:
             self._fire_bullet()
+            if self.recorder:
+                self.recorder.record_fire()
+        elif event.key == pygame.K_F3:
+            self.frame_timer.toggle_overlay()
+        elif event.key == pygame.K_F4:
+            self.frame_timer.dump_csv(self.settings.frame_timing_csv_path)
 
     def _check_keyup_events(self, event):
         """Реагирует на отпускание клавиш"""
+        if self.ship is None:  # Корабль еще не создан: ассеты загружаются в фоне
+            return
         if event.key == pygame.K_RIGHT:
             self.ship.moving_right = False
         elif event.key == pygame.K_LEFT:
@@ -564,6 +949,8 @@ class AlienInvasion:
 
     def _fire_bullet(self):
         """Создание нового снаряда (или двух) и включение его в группу bullets"""
+        if self.respawn_ticks_left > 0:
+            return  # Корабль еще не вернулся в игру после потери жизни
         if self.ship.double_fire_active:
             # Режим "Двойной выстрел" активен
             # Убедимся, что есть место для двух снарядов
@@ -599,17 +986,19 @@ class AlienInvasion:
                 ):
                     self.sound_laser.play()
 
-    def _update_bullets(self):
+    def _update_bullets(self, dt):
         """Обновляет позиции снарядов и удаляет старые пули."""  # Форматирование PEP8
         # Обновление позиций снарядов
-        self.bullets.update()
+        self.bullets.update(dt)
 
         # Уничтожение снарядов, вышедших за пределы экрана
         for bullet in self.bullets.copy():
             if bullet.rect.bottom <= 0:
                 self.bullets.remove(bullet)
+        self.frame_timer.lap(frame_timing.PHASE_SHIP_BULLETS)
 
         self._check_bullet_alien_collisions()
+        self.frame_timer.lap(frame_timing.PHASE_COLLISIONS)
 
     def _check_bullet_alien_collisions(self):
         """Обработка коллизий снарядов с пришельцами"""
@@ -617,7 +1006,9 @@ class AlienInvasion:
         # Проверка попаданий в пришельцев
         # При обнаружении попадания удалить снаряд и пришельца.
         # True, True означает, что и пуля, и пришелец будут удалены.
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+        # Флот ищет пересечения по сетке ячеек, а не перебором всех пар пуля-пришелец;
+        # результат тот же, что у pygame.sprite.groupcollide(self.bullets, self.aliens, True, True).
+        collisions = self.aliens.groupcollide(self.bullets, True, True)
 
         if collisions:
             # collisions - это словарь, где ключ - пуля, значение - список столкнувшихся с ней пришельцев.
@@ -635,6 +1026,9 @@ class AlienInvasion:
                         and self.settings.audio_enabled
                         and self.sounds_explosion
                     ):
+                        # Выбор звука не влияет на игру и зависит от наличия звука,
+                        # поэтому он не расходует self.rng (иначе прогоны со звуком
+                        # и без него разошлись бы).
                         random.choice(self.sounds_explosion).play()
 
                     # Новая логика выпадения бонусов.
@@ -648,7 +1042,8 @@ class AlienInvasion:
                         # основанная на времени, кулдаунах и шансах, была удалена.
                         # Теперь бонусы выпадают только если они были предварительно назначены пришельцу.
 
-            self.sb.prep_score()  # Обновление отображения счета.
+            # Счет перерисуется один раз перед отрисовкой кадра, сколько бы попаданий ни было.
+            self.sb.mark_changed(HUD_SCORE)
             self.sb.check_high_score()  # Проверка и обновление рекорда.
 
         if not self.aliens:
@@ -659,22 +1054,28 @@ class AlienInvasion:
 
             # Увеличение уровня.
             self.stats.level += 1
-            self.sb.prep_level()
+            self.sb.mark_changed(HUD_LEVEL)
             # Загрузка настроек для нового уровня.
             self.settings.load_level_settings(self.stats.level)
             # Сброс времени начала нового уровня.
-            self.level_start_time = pygame.time.get_ticks()
+            self.level_start_time = self.get_sim_ticks()
 
-    def _update_aliens(self):
+    def _update_aliens(self, dt):
         """
         Проверяет, достиг ли флот края экрана,
         с последующим обновлением позиций всех пришельцев во флоте
         """
         self._check_fleet_edges()
-        self.aliens.update()
+        self.aliens.update(dt)  # Сдвиг origin флота, а не каждого пришельца
 
-        # Проверка коллизий пришелец - корабль
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        # Проверка коллизий пришелец - корабль. Пока корабль не касается габаритов флота,
+        # ни один пришелец его не касается, и флот не перебирается.
+        fleet_bounds = self.aliens.bounding_rect()
+        if (
+            fleet_bounds
+            and self.ship.rect.colliderect(fleet_bounds)
+            and self.aliens.collide_rect(self.ship.rect)
+        ):
             self._ship_hit()
 
         # Проверить, добрались ли пришельцы до нижнего края экрана
@@ -682,12 +1083,10 @@ class AlienInvasion:
 
     def _check_aliens_bottom(self):
         """Проверяет, добрались ли пришельцы до нижнего края экрана"""
-        screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= screen_rect.bottom:
-                # Происходит то же, что при столкновении с кораблем
-                self._ship_hit()
-                break
+        fleet_bounds = self.aliens.bounding_rect()
+        if fleet_bounds and fleet_bounds.bottom >= self.settings.screen_height:
+            # Происходит то же, что при столкновении с кораблем
+            self._ship_hit()
 
     def _ship_hit(self):
         """Обрабатывает столкновение корабля с пришельцами"""
@@ -701,27 +1100,38 @@ class AlienInvasion:
             return
 
         self.stats.ships_left -= 1
-        self.sb.prep_ships()
+        self.sb.mark_changed(HUD_SHIPS)
 
         if self.stats.ships_left > 0:
             # Сброс элементов раунда (очистка пришельцев, пуль, бонусов; создание нового флота; центрирование корабля).
             self._reset_round_elements()
-            # Пауза для возможности игроку сориентироваться.
-            sleep(self.settings.ship_hit_pause_duration)
+            # Пауза для возможности игроку сориентироваться. Она отсчитывается шагами
+            # симуляции в _update_simulation(), а не останавливает процесс.
+            self.respawn_ticks_left = self._respawn_pause_ticks()
         else:
             # Синхронизация флага активности игры (хотя game_state важнее).
             self.stats.game_active = False
+            # Рекорд этой игры записывается сразу (в фоне), не дожидаясь отсрочки.
+            self.stats.flush_high_score()
             # Установка состояния "Игра окончена".
             self.game_state = self.STATE_GAME_OVER
             # Показ курсора мыши для взаимодействия с меню.
             pygame.mouse.set_visible(True)
 
+    def _respawn_pause_ticks(self):
+        """Возвращает длительность паузы после потери жизни в шагах симуляции."""
+        if self.headless and self.settings.headless_skip_respawn_pause:
+            return 0
+        return round(self.settings.ship_hit_pause_duration / self.sim_dt)
+
     def _create_fleet(self):
         """Создание флота вторжения и сброс счетчиков для гарантированного бонуса."""
         # Создание пришельца и вычисление количества пришельцев в ряду
         # Интервал между соседними пришельцами равен ширине пришельца
-        alien = Alien(self)  # Dummy alien for dimensions
-        alien_width, alien_height = alien.rect.size
+        # Размер пришельца задан в настройках (Alien масштабирует спрайт до него),
+        # поэтому пробный пришелец для замера не создается.
+        alien_width = self.settings.alien_display_width
+        alien_height = self.settings.alien_display_height
 
         # Расчет количества пришельцев в ряду (по горизонтали)
         # Учитываем отступы по краям экрана и между пришельцами.
@@ -786,6 +1196,7 @@ class AlienInvasion:
 
         # Создание флота вторжения.
         # Используем final_number_rows вместо старого number_rows.
+        self.aliens.reset()
         for row_number in range(final_number_rows):
             for alien_number in range(number_aliens_x):
                 self._create_alien(alien_number, row_number, alien_width, alien_height)
@@ -817,11 +1228,11 @@ class AlienInvasion:
             drops_to_assign = min(drops_per_level, enemy_count)
 
             # Выбираем случайных пришельцев, из которых выпадут бонусы.
-            # random.sample гарантирует, что каждый выбранный пришелец уникален.
-            # Преобразуем self.aliens в список, так как random.sample требует последовательность.
+            # rng.sample гарантирует, что каждый выбранный пришелец уникален.
+            # Преобразуем self.aliens в список, так как sample требует последовательность.
             try:
                 # Убедимся, что drops_to_assign не отрицательное и является int
-                aliens_for_powerups = random.sample(
+                aliens_for_powerups = self.rng.sample(
                     list(self.aliens), int(max(0, drops_to_assign))
                 )
             except ValueError:
@@ -835,7 +1246,7 @@ class AlienInvasion:
                 if (
                     available_powerup_types
                 ):  # Дополнительная проверка на случай, если список пуст.
-                    chosen_powerup_type = random.choice(available_powerup_types)
+                    chosen_powerup_type = self.rng.choice(available_powerup_types)
                     alien_obj.assigned_powerup_type = chosen_powerup_type
                     logger.debug(
                         "Assigned %s to alien at %s",
@@ -869,43 +1280,46 @@ class AlienInvasion:
             alien_height
             + self.settings.alien_vertical_spacing_factor * alien_height * row_number
         )
-        self.aliens.add(alien)
+        self.aliens.add_to_formation(alien, alien_number, row_number)
 
     def _check_fleet_edges(self):
         """Реагирует на достижение пришельцем края экрана."""  # Форматирование PEP8
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        # Край флота - край его габаритов: крайние пришельцы не ищутся перебором.
+        fleet_bounds = self.aliens.bounding_rect()
+        if fleet_bounds and (
+            fleet_bounds.right >= self.settings.screen_width or fleet_bounds.left <= 0
+        ):
+            self._change_fleet_direction()
 
     def _change_fleet_direction(self):
         """Опускает весь флот и меняет направление флота"""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        self.aliens.drop(self.settings.fleet_drop_speed)
         self.settings.fleet_direction *= -1
 
     def _update_screen(self):
         """Обновляет изображения на экране и отображает новый экран"""
-        # self.screen.fill(self.settings.bg_color) # Заменено на фон из Starfield.draw()
-        # self.screen.fill(self.settings.bg_color) # Заменено на фон из Starfield.draw().
+        # Кадр рисуется в renderer (на экран попадут только изменившиеся области) или прямо на экран.
+        target = self.renderer or self.screen
         # Отрисовка звездного поля (должна быть первой, чтобы быть на заднем плане).
-        self.starfield.draw()
+        self.starfield.draw(target)
         # Отрисовка процедурных космических объектов (планеты, галактики).
-        self.space_objects.draw(self.screen)
+        self.space_objects.draw(target)
 
         # Отрисовка игровых объектов, если игра не в меню (пауза или игра).
         if self.game_state != self.STATE_MENU:
-            self.ship.blitme()
+            # Во время паузы после потери жизни корабль мигает.
+            if (self.respawn_ticks_left // _RESPAWN_BLINK_PERIOD_TICKS) % 2 == 0:
+                self.ship.blitme(target)
             for bullet in self.bullets.sprites():
-                bullet.draw_bullet()
-            self.aliens.draw(self.screen)
-            self.powerups.draw(self.screen)  # Отрисовка бонусов.
+                bullet.draw_bullet(target)
+            self.aliens.draw(target)
+            self.powerups.draw(target)  # Отрисовка бонусов.
 
         # Вывод информации о счете (всегда видим, кроме, возможно, чистого меню без игры).
         if (
             self.game_state != self.STATE_MENU or self.stats.game_active
         ):  # Показываем счет, если игра была начата
-            self.sb.show_score()
+            self.sb.show_score(target)
 
         # Отображение элементов UI в зависимости от состояния игры.
         if (
@@ -913,8 +1327,10 @@ class AlienInvasion:
             or self.game_state == self.STATE_MENU
         ):
             # В состоянии "Игра окончена" или "Меню" отображаем кнопки "Новая игра" и "Выход".
-            self.new_game_button.draw_button()
-            self.exit_button.draw_button()
+            self.new_game_button.draw_button(target)
+            self.exit_button.draw_button(target)
+            if not self.assets_ready:
+                self._draw_preload_progress(target)
         elif self.game_state == self.STATE_PAUSED:
             # В состоянии "Пауза" отображаем сообщение "Пауза" и кнопки меню паузы.
 
@@ -948,10 +1364,10 @@ class AlienInvasion:
                     )
                     if pause_icon_rect.top < _PAUSE_ELEMENT_TOP_MARGIN:
                         pause_icon_rect.top = _PAUSE_ELEMENT_TOP_MARGIN
-                    self.screen.blit(self.pause_icon, pause_icon_rect)
+                    target.blit(self.pause_icon, pause_icon_rect)
 
                 # Отрисовка кэшированного текста "Пауза".
-                self.screen.blit(pause_image_to_blit, current_pause_rect)
+                target.blit(pause_image_to_blit, current_pause_rect)
             else:
                 # Fallback или логирование, если self.paused_text_surface не был создан.
                 logger.error(
@@ -959,13 +1375,23 @@ class AlienInvasion:
                 )
 
             # Отрисовка кнопок меню паузы.
-            self.resume_button.draw_button()
-            self.restart_button_paused.draw_button()
-            self.main_menu_button.draw_button()
+            self.resume_button.draw_button(target)
+            self.restart_button_paused.draw_button(target)
+            self.main_menu_button.draw_button(target)
             # Игровые элементы (корабль, пришельцы, пули, счет) уже отрисованы до этого блока,
             # поэтому они останутся видимыми на экране "Пауза", но "замороженными".
 
-        pygame.display.flip()  # Отображение последнего отрисованного экрана.
+        # Оверлей замеров рисуется поверх всего остального.
+        self.frame_timer.draw(target)
+        if self.renderer:
+            self.renderer.render()  # Перерисовка изменившихся областей на экране
+        self.frame_timer.lap(frame_timing.PHASE_DRAW)
+        if self.renderer:
+            # Вывод изменившихся областей (display.update) или всего кадра (display.flip).
+            self.renderer.present()
+        else:
+            pygame.display.flip()  # Отображение последнего отрисованного экрана.
+        self.frame_timer.lap(frame_timing.PHASE_FLIP)
 
     def _check_ship_powerup_collisions(self):
         """Проверяет столкновения корабля с бонусами."""
@@ -993,9 +1419,18 @@ class AlienInvasion:
                     self.sound_powerup.play()
             # Добавить elif для других типов бонусов, если они появятся позже.
 
+    def _roll_space_object_spawn_interval(self):
+        """Выбирает случайный интервал (мс) до появления следующего космического объекта."""
+        interval = self.rng.randint(
+            self.space_object_spawn_interval_min, self.space_object_spawn_interval_max
+        )
+        if interval < 0:  # Если из-за отрицательного min выбран отрицательный интервал
+            interval = self.rng.randint(0, self.space_object_spawn_interval_max)
+        return interval
+
     def _try_spawn_space_object(self):
         # Пытается создать новый процедурный космический объект (планету/галактику), если пришло время.
-        current_time = pygame.time.get_ticks()
+        current_time = self.get_sim_ticks()
         if (
             current_time - self.last_space_object_spawn_time
             > self.current_spawn_interval
@@ -1004,13 +1439,15 @@ class AlienInvasion:
             if len(self.space_objects) < self.settings.max_space_objects:
                 # Если есть доступные спрайты планет/галактик.
                 if self.settings.planet_sprite_paths:
-                    image_path = random.choice(self.settings.planet_sprite_paths)
+                    image_path = self.rng.choice(self.settings.planet_sprite_paths)
 
                     new_object = SpaceObject(
                         screen_width=self.settings.screen_width,
                         screen_height=self.settings.screen_height,
                         image_path=image_path,
                         fade_duration_ms=self.settings.space_object_fade_duration_ms,
+                        get_ticks=self.get_sim_ticks,
+                        rng=self.rng,
                     )
                     self.space_objects.add(new_object)
                     logger.debug(
@@ -1021,21 +1458,45 @@ class AlienInvasion:
 
                     self.last_space_object_spawn_time = current_time
                     # Установка нового случайного интервала для следующего объекта.
-                    self.current_spawn_interval = random.randint(
-                        self.space_object_spawn_interval_min,
-                        self.space_object_spawn_interval_max,
+                    self.current_spawn_interval = (
+                        self._roll_space_object_spawn_interval()
                     )
-                    if self.current_spawn_interval < 0:  # Дополнительная проверка
-                        self.current_spawn_interval = random.randint(
-                            0, self.space_object_spawn_interval_max
-                        )
                 # else:
                 # logger.debug("Нет доступных спрайтов для космических объектов.") # Для отладки
             # else:
             # logger.debug(f"Max space objects reached ({self.settings.max_space_objects}), not spawning.")
 
 
+def _build_arg_parser():
+    """Создает парсер аргументов командной строки игры."""
+    parser = argparse.ArgumentParser(description="Alien Invasion")
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Зерно генератора случайных чисел для воспроизводимой игры",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        default=None,
+        help="Записывать реплей игры в файл (воспроизведение: python -m alien_invasion.replay PATH)",
+    )
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="Загружать все ассеты до показа меню, без фоновой загрузки",
+    )
+    parser.add_argument(
+        "--frame-timing",
+        action="store_true",
+        help="Показать оверлей замеров времени фаз кадра при запуске (переключается клавишей F3)",
+    )
+    return parser
+
+
 if __name__ == "__main__":
+    args = _build_arg_parser().parse_args()
     # Настройка базовой конфигурации логирования
     logging.basicConfig(
         level=logging.INFO,
@@ -1045,100 +1506,8 @@ if __name__ == "__main__":
     logging.info("Application started.")  # Пример информационного сообщения
 
     # Создание экземпляра и запуск игры.
-    ai = AlienInvasion()
+    ai = AlienInvasion(seed=args.seed, record_path=args.record, preload=not args.no_preload)
+    if args.frame_timing:
+        ai.frame_timer.toggle_overlay()
     ai.run_game()
     logging.info("Application finished.")
-
-# --- Код для профилирования ---
-import cProfile
-import pstats
-import io  # Для сохранения вывода pstats в строку/файл
-
-
-def main_profiled():  # Обертка для профилирования
-    # Настройка базовой конфигурации логирования (если еще не настроено глобально)
-    # logging.basicConfig(
-    #     level=logging.INFO, # Устанавливаем INFO, чтобы видеть стартовые сообщения игры
-    #     format='%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s',
-    #     datefmt='%Y-%m-%d %H:%M:%S'
-    # )
-    # logging.info("Application started for profiling.")
-
-    ai = AlienInvasion()
-    # Вместо ai.run_game() с его бесконечным циклом,
-    # профилируем только создание объекта AlienInvasion.
-    logger.info("Профилирование: только создание объекта AlienInvasion.")
-    try:
-        ai = AlienInvasion()  # Создание объекта
-        logger.info("Профилирование: объект AlienInvasion создан успешно.")
-    except Exception as e:
-        logger.error(
-            f"Профилирование: Ошибка при создании AlienInvasion: {e}", exc_info=True
-        )
-    # Симуляция игрового цикла полностью убрана для этого теста.
-    logger.info("Профилирование: main_profiled завершил попытку создания объекта.")
-
-
-def run_profiler_and_save_stats():
-    profiler = cProfile.Profile()
-
-    # Используем profiler.call() для более чистого перехвата исключений типа SystemExit
-    try:
-        profiler.call(main_profiled)
-    except SystemExit as e:
-        logger.warning(
-            f"Профилирование перехвачено SystemExit: {e}. Статистика будет сохранена."
-        )
-    finally:
-        profiler.disable()  # Убедимся, что профилировщик выключен
-
-    # Сохранение результатов профилирования
-    s = io.StringIO()
-    # Сортировка по совокупному времени, затем по общему времени, затем по количеству вызовов
-    # ps = pstats.Stats(profiler, stream=s).sort_stats('cumulative', 'tottime', 'calls')
-    # Для начала достаточно сортировки по cumulative и tottime
-    ps = pstats.Stats(profiler, stream=s).sort_stats("cumulative", "tottime")
-    ps.print_stats(30)  # Показать топ 30 функций
-
-    # Запись в файл
-    with open("profiling_results.txt", "w") as f:
-        f.write(s.getvalue())
-
-    # Опционально: сохранить бинарный файл для SnakeViz
-    # profiler.dump_stats('profile_results.prof')
-
-    # Вывод в консоль для информации
-    # print("\nРезультаты профилирования сохранены в profiling_results.txt")
-    # print("Топ по совокупному времени ('cumulative'):")
-    # pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
-    # print("\nТоп по общему времени выполнения функции ('tottime'):")
-    # pstats.Stats(profiler).sort_stats('tottime').print_stats(20)
-
-
-if __name__ == "__main__":
-    # --- Управление запуском: обычный или профилирование ---
-    PROFILE_MODE = False  # Измените на True для запуска с профилированием
-
-    if PROFILE_MODE:
-        print("Запуск игры в режиме профилирования...")
-        # Настройка логирования для профилирования (можно сделать менее подробным)
-        logging.basicConfig(
-            level=logging.WARNING,
-            format="%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        run_profiler_and_save_stats()
-        print("Профилирование завершено. Результаты в profiling_results.txt")
-    else:
-        # Обычный запуск игры
-        # Настройка базовой конфигурации логирования (если еще не настроено)
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        logging.info("Application started.")
-        ai = AlienInvasion()
-        ai.run_game()
-        logging.info("Application finished.")
-# --- Конец кода для профилирования ---
@@ -0,0 +1,202 @@
+"""Манифест ассетов: список файлов в assets/ с размером, разрешением и хешем.
+
+Манифест (assets/manifest.json) генерируется командой
+    python tools/validate_assets.py --write-manifest
+и проверяется один раз при старте игры: для каждого файла сверяется его размер
+на диске (os.stat). После этого вопросы "есть ли такой ассет" решаются по памяти,
+так что смена уровня (Settings.initialize_dynamic_settings) не обращается к
+файловой системе.
+
+Если манифеста нет или он поврежден, список файлов строится одним проходом по
+assets/ при первом обращении - поведение игры от этого не меняется.
+
+Формат (версия 1):
+    {"version": 1,
+     "assets": {"gfx/ships/aliens/alien_ship_01.png":
+                    {"bytes": 2465, "width": 93, "height": 84, "sha256": "..."}, ...}}
+Ключи - пути относительно assets/ через "/"; width/height есть только у изображений.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ASSETS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets")
+)
+DEFAULT_MANIFEST_PATH = os.path.join(ASSETS_DIR, MANIFEST_NAME)
+
+_IMAGE_EXTENSIONS = (".png", ".bmp", ".jpg", ".jpeg", ".gif")
+_HASH_CHUNK_BYTES = 1 << 16
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _image_dimensions(path):
+    """(ширина, высота) изображения или (None, None), если его не удалось прочитать."""
+    import pygame
+
+    try:
+        return pygame.image.load(path).get_size()
+    except (pygame.error, FileNotFoundError):
+        return None, None
+
+
+def _walk_assets(assets_dir):
+    """Относительные пути ("/") всех файлов в assets_dir, кроме самого манифеста."""
+    paths = []
+    for dir_path, dir_names, file_names in os.walk(assets_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            relative = os.path.relpath(os.path.join(dir_path, file_name), assets_dir)
+            relative = relative.replace(os.sep, "/")
+            if relative != MANIFEST_NAME:
+                paths.append(relative)
+    return paths
+
+
+def generate_manifest(assets_dir=ASSETS_DIR):
+    """Строит словарь манифеста по текущему содержимому assets_dir."""
+    assets = {}
+    for relative in _walk_assets(assets_dir):
+        path = os.path.join(assets_dir, relative)
+        entry = {"bytes": os.path.getsize(path), "sha256": _file_sha256(path)}
+        if relative.lower().endswith(_IMAGE_EXTENSIONS):
+            entry["width"], entry["height"] = _image_dimensions(path)
+        assets[relative] = entry
+    return {"version": MANIFEST_VERSION, "assets": assets}
+
+
+def write_manifest(path=DEFAULT_MANIFEST_PATH, assets_dir=ASSETS_DIR):
+    """Генерирует манифест для assets_dir и сохраняет его в path. Возвращает словарь манифеста."""
+    manifest = generate_manifest(assets_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write("\n")
+    return manifest
+
+
+class AssetManifest:
+    """Проверенный список доступных ассетов в памяти."""
+
+    def __init__(self, assets_dir, entries):
+        self.assets_dir = os.path.abspath(assets_dir)
+        self.entries = entries  # относительный путь -> запись манифеста
+        self._available = set()  # относительные пути, прошедшие проверку
+        self._unlisted = {}  # абсолютный путь -> существует ли (для путей вне манифеста)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MANIFEST_PATH, assets_dir=ASSETS_DIR):
+        """Читает манифест; ValueError/OSError, если файла нет или он поврежден."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"неподдерживаемая версия манифеста {data.get('version')!r}")
+        entries = data["assets"]
+        if not isinstance(entries, dict):
+            raise ValueError("поле 'assets' должно быть объектом")
+        return cls(assets_dir, entries)
+
+    @classmethod
+    def from_filesystem(cls, assets_dir=ASSETS_DIR):
+        """Манифест без хешей и размеров: все файлы, найденные одним проходом по assets_dir."""
+        manifest = cls(assets_dir, {relative: {} for relative in _walk_assets(assets_dir)})
+        manifest._available = set(manifest.entries)
+        return manifest
+
+    def validate(self, check_hashes=False):
+        """Сверяет манифест с диском и возвращает список проблем (строк).
+
+        Отсутствующие файлы считаются недоступными. Файл с другим размером (или
+        хешем при check_hashes=True) остается доступным, но сообщается как
+        устаревшая запись - манифест нужно перегенерировать.
+        """
+        problems = []
+        self._available = set()
+        for relative, entry in self.entries.items():
+            path = os.path.join(self.assets_dir, relative)
+            try:
+                size = os.stat(path).st_size
+            except OSError:
+                problems.append(f"Ассет не найден: {relative}")
+                continue
+            self._available.add(relative)
+            if "bytes" in entry and size != entry["bytes"]:
+                problems.append(f"Размер {relative} не совпадает с манифестом ({size} != {entry['bytes']})")
+            elif check_hashes and "sha256" in entry and _file_sha256(path) != entry["sha256"]:
+                problems.append(f"Хеш {relative} не совпадает с манифестом")
+        return problems
+
+    def _relative(self, path):
+        relative = os.path.relpath(os.path.abspath(path), self.assets_dir)
+        return relative.replace(os.sep, "/")
+
+    def exists(self, path):
+        """Есть ли ассет path (абсолютный или относительный к рабочему каталогу путь).
+
+        Для путей из манифеста ответ берется из памяти (об отсутствующих файлах
+        validate() уже предупредил); путь вне манифеста проверяется на диске
+        один раз и запоминается.
+        """
+        relative = self._relative(path)
+        if relative in self.entries:
+            return relative in self._available
+        absolute = os.path.abspath(path)
+        if absolute not in self._unlisted:
+            found = os.path.exists(absolute)
+            self._unlisted[absolute] = found
+            if found:
+                logger.debug("Ассет %s отсутствует в манифесте, найден на диске.", path)
+            else:
+                logger.warning("Ассет не найден: %s", path)
+        return self._unlisted[absolute]
+
+    def entry(self, path):
+        """Запись манифеста для path (bytes, width, height, sha256) или None."""
+        return self.entries.get(self._relative(path))
+
+
+_manifest = None
+
+
+def get_manifest():
+    """Возвращает манифест процесса; при первом вызове загружает и проверяет его."""
+    global _manifest
+    if _manifest is None:
+        try:
+            manifest = AssetManifest.load()
+        except FileNotFoundError:
+            logger.info(
+                "Манифест ассетов %s не найден, список файлов строится по каталогу assets.",
+                DEFAULT_MANIFEST_PATH,
+            )
+            manifest = AssetManifest.from_filesystem()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                "Манифест ассетов %s поврежден: %s. Список файлов строится по каталогу assets.",
+                DEFAULT_MANIFEST_PATH,
+                e,
+            )
+            manifest = AssetManifest.from_filesystem()
+        else:
+            for problem in manifest.validate():
+                logger.warning("Манифест ассетов: %s", problem)
+        _manifest = manifest
+    return _manifest
+
+
+def reset_manifest():
+    """Сбрасывает манифест процесса (следующий get_manifest() загрузит его заново)."""
+    global _manifest
+    _manifest = None
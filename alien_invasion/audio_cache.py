@@ -0,0 +1,115 @@
+"""Дисковый кэш звуков, уже декодированных в формат микшера.
+
+pygame.mixer.Sound(path) при каждом запуске декодирует OGG и пересэмплирует его
+под частоту, формат и число каналов микшера. load_sound() делает это один раз:
+получившийся PCM (Sound.get_raw()) сохраняется в файл кэша, а при следующих
+запусках звук создается из этого файла через буфер (pygame.mixer.Sound(buffer=...)),
+отображенный в память через mmap.
+
+Имя файла кэша содержит имя исходного файла, SHA-256 его содержимого и параметры
+микшера, поэтому кэш становится недействительным сам, если файл изменился или
+микшер открыт с другими настройками. При записи новой версии старые файлы
+кэша того же звука удаляются. Любая ошибка кэша (нет прав, поврежденный файл)
+приводит к обычной загрузке из исходного файла.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+_CACHE_EXTENSION = ".pcm"
+_HASH_CHUNK_BYTES = 1 << 16
+_HASH_PREFIX_CHARS = 16  # Первые символы SHA-256 в имени файла кэша
+
+
+def _source_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:_HASH_PREFIX_CHARS]
+
+
+def cache_file_name(path, mixer_format, source_hash=None):
+    """Имя файла кэша для звука path при параметрах микшера (частота, формат, каналы)."""
+    if source_hash is None:
+        source_hash = _source_hash(path)
+    frequency, sample_format, channels = mixer_format
+    return (
+        f"{os.path.basename(path)}-{source_hash}-{frequency}-{sample_format}-{channels}"
+        f"{_CACHE_EXTENSION}"
+    )
+
+
+def _read_cached(cache_path):
+    """Создает Sound из файла кэша; None, если файла нет."""
+    try:
+        with open(cache_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return pygame.mixer.Sound(buffer=b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # Sound копирует данные буфера, после чего отображение можно закрыть
+                return pygame.mixer.Sound(buffer=data)
+    except FileNotFoundError:
+        return None
+
+
+def _write_cached(cache_dir, file_name, sound, source_name):
+    """Атомарно записывает PCM звука в кэш и удаляет старые версии этого звука."""
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(temp_path, os.path.join(cache_dir, file_name))
+    except Exception:
+        os.unlink(temp_path)  # Недописанный файл не должен остаться в кэше
+        raise
+    stale_prefix = source_name + "-"
+    for other in os.listdir(cache_dir):
+        if other != file_name and other.startswith(stale_prefix) and other.endswith(_CACHE_EXTENSION):
+            try:
+                os.remove(os.path.join(cache_dir, other))
+            except OSError:
+                pass
+
+
+def load_sound(path, cache_dir):
+    """Возвращает pygame.mixer.Sound для path, используя кэш декодированного PCM в cache_dir.
+
+    cache_dir=None отключает кэш. Микшер должен быть инициализирован. Ошибки
+    декодирования исходного файла (pygame.error, FileNotFoundError) передаются
+    вызывающему коду, как у pygame.mixer.Sound(path).
+    """
+    mixer_format = pygame.mixer.get_init()
+    if cache_dir is None or not mixer_format:
+        return pygame.mixer.Sound(path)
+
+    try:
+        file_name = cache_file_name(path, mixer_format)
+    except OSError:
+        # Исходный файл недоступен - пусть pygame сообщит об ошибке как обычно
+        return pygame.mixer.Sound(path)
+    cache_path = os.path.join(cache_dir, file_name)
+    try:
+        sound = _read_cached(cache_path)
+    except (OSError, ValueError, pygame.error) as e:
+        logger.warning("Файл кэша звука %s поврежден: %s. Звук декодируется заново.", cache_path, e)
+        sound = None
+    if sound is not None:
+        logger.debug("Звук загружен из кэша: %s", path)
+        return sound
+
+    sound = pygame.mixer.Sound(path)
+    try:
+        _write_cached(cache_dir, file_name, sound, os.path.basename(path))
+        logger.debug("Декодированный звук сохранен в кэш: %s", cache_path)
+    except OSError as e:
+        logger.warning("Не удалось сохранить звук %s в кэш %s: %s", path, cache_dir, e)
+    return sound
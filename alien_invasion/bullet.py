@@ -21,13 +21,14 @@ class Bullet(Sprite):
         # Позиция снаряда хранится в вещественном формате
         self.y = float(self.rect.y)
 
-    def update(self):
-        """Перемещает снаряд вверх по экрану"""
+    def update(self, dt):
+        """Перемещает снаряд вверх по экрану (dt - длительность шага в секундах)"""
         # Обновление позиции снаряда в вещественном формате
-        self.y -= self.settings.bullet_speed
+        self.y -= self.settings.bullet_speed * dt
         # Обновление позиции прямоугольника
         self.rect.y = self.y
 
-    def draw_bullet(self):
-        """Вывод снаряда на экран"""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def draw_bullet(self, surface=None):
+        """Вывод снаряда на экран (или на surface)"""
+        # Заливка прямоугольника дает те же пиксели, что и pygame.draw.rect без рамки
+        (surface if surface is not None else self.screen).fill(self.color, self.rect)
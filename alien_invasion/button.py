@@ -43,12 +43,13 @@ class Button:
         # Убираем self.msg_image_rect.center = self.rect.center отсюда,
         # так как self.rect еще не имеет финальных размеров на этом этапе.
 
-    def draw_button(self):
-        # Отображение пустой кнопки и вывод сообщения
-        self.screen.fill(self.button_color, self.rect)
+    def draw_button(self, surface=None):
+        # Отображение пустой кнопки и вывод сообщения (по умолчанию - на экран)
+        target = surface if surface is not None else self.screen
+        target.fill(self.button_color, self.rect)
         # Убедимся, что текст всегда центрирован относительно текущей позиции rect кнопки
         self.msg_image_rect.center = self.rect.center
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+        target.blit(self.msg_image, self.msg_image_rect)
 
     def is_clicked(self, mouse_pos):
         """Возвращает True, если кнопка была нажата (клик попал в область кнопки)."""
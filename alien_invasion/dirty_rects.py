@@ -0,0 +1,218 @@
+"""Отрисовка кадра по "грязным" прямоугольникам.
+
+DirtyRectRenderer передается в методы отрисовки вместо экрана: его методы blit,
+blits, fill и set_at (как у pygame.Surface) ничего не рисуют сразу, а записывают
+элементы кадра. render() сравнивает их с элементами прошлого кадра: элемент,
+который появился, исчез, сдвинулся или сменил изображение (другая поверхность
+или ее прозрачность), делает грязными свое старое и новое место. Только эти
+области перерисовываются - фон и все элементы кадра, пересекающие область, в
+исходном порядке, - а present() выводит их через pygame.display.update(rects).
+
+Если грязная площадь больше full_redraw_threshold от площади экрана или
+прямоугольников больше max_dirty_rects, кадр рисуется целиком и выводится
+pygame.display.flip(), как без этого модуля. Кадр без изменений (статичные
+меню и пауза) не рисуется и не выводится вовсе.
+
+Сравнение идет по объекту поверхности (и ее прозрачности), а не по пикселям:
+поверхность, которую рисуют поверх себя на месте, не станет грязной сама -
+измененные в ней области сообщаются через mark_dirty(), а invalidate()
+перерисовывает весь следующий кадр.
+"""
+
+import pygame
+
+_OP_BLIT = 0
+_OP_FILL = 1
+# Соседние грязные прямоугольники объединяются, если объединение не больше
+# суммы их площадей, умноженной на этот множитель
+_MERGE_AREA_FACTOR = 2
+
+# Режимы последнего кадра (для статистики и тестов)
+FRAME_FULL = "full"
+FRAME_PARTIAL = "partial"
+FRAME_SKIPPED = "skipped"
+
+
+class DirtyRectRenderer:
+    """Записывает отрисовку кадра и выводит на экран только изменившиеся области."""
+
+    def __init__(self, screen, full_redraw_threshold=0.35, max_dirty_rects=400):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.full_redraw_threshold = full_redraw_threshold
+        self.max_dirty_rects = max_dirty_rects
+        self.background_color = (0, 0, 0)
+        self._items = []  # [(rect, сигнатура, операция, аргумент, область)] в порядке отрисовки
+        self._previous = set()  # Сигнатуры элементов, выведенных в прошлом кадре
+        # Элементы прошлого кадра держат ссылки на свои поверхности: пока сигнатуры
+        # сравниваются, id() старой поверхности не может достаться новой
+        self._previous_items = []
+        self._previous_background = None
+        self._force_full = True
+        self._marked = []  # Области, измененные на месте внутри записанных поверхностей
+        self._pending = []  # Прямоугольники для display.update(); None - нужен flip()
+        self.last_frame_mode = None
+        self.last_dirty_rects = []
+        self.frame_counts = {FRAME_FULL: 0, FRAME_PARTIAL: 0, FRAME_SKIPPED: 0}
+
+    # --- Интерфейс, совместимый с pygame.Surface (для методов отрисовки) ---
+
+    def get_rect(self, **kwargs):
+        return self.screen.get_rect(**kwargs)
+
+    def get_size(self):
+        return self.screen.get_size()
+
+    def get_width(self):
+        return self.screen.get_width()
+
+    def get_height(self):
+        return self.screen.get_height()
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """Записывает blit(source, dest, area); возвращает прямоугольник на экране."""
+        if area is not None:
+            area = pygame.Rect(area)
+            size = area.size
+            area_key = tuple(area)
+        else:
+            size = source.get_size()
+            area_key = None
+        rect = pygame.Rect(dest[0], dest[1], size[0], size[1]).clip(self.screen_rect)
+        if rect.width and rect.height:
+            signature = (
+                _OP_BLIT,
+                id(source),
+                source.get_alpha(),
+                area_key,
+                rect.x,
+                rect.y,
+                rect.width,
+                rect.height,
+            )
+            self._items.append((rect, signature, source, dest, area))
+        return rect
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = [self.blit(*args[:3]) for args in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        """fill() без rect задает цвет фона кадра; с rect - записывает заливку области."""
+        if type(color) is not tuple:
+            color = tuple(pygame.Color(color))
+        if rect is None:
+            self.background_color = color
+            return self.screen_rect.copy()
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            signature = (_OP_FILL, color, None, None, rect.x, rect.y, rect.width, rect.height)
+            self._items.append((rect, signature, color, None, None))
+        return rect
+
+    def set_at(self, pos, color):
+        # Быстрый путь для пикселей звездного поля: их сотни в каждом кадре
+        x, y = int(pos[0]), int(pos[1])
+        if not (0 <= x < self.screen_rect.width and 0 <= y < self.screen_rect.height):
+            return
+        if type(color) is not tuple:
+            color = tuple(pygame.Color(color))
+        rect = pygame.Rect(x, y, 1, 1)
+        self._items.append((rect, (_OP_FILL, color, None, None, x, y, 1, 1), color, None, None))
+
+    # --- Кадр ---
+
+    def invalidate(self):
+        """Следующий кадр будет нарисован и выведен целиком (например, после WINDOWEXPOSED)."""
+        self._force_full = True
+
+    def mark_dirty(self, rects):
+        """Помечает грязными области экрана, содержимое которых изменилось внутри той же
+        поверхности (например, звезды на поверхности неба, которая выводится одним blit)."""
+        self._marked.extend(rects)
+
+    def _draw_item(self, item):
+        rect, signature, argument, dest, area = item
+        if signature[0] == _OP_BLIT:
+            self.screen.blit(argument, dest, area)
+        else:
+            self.screen.fill(argument, rect)
+
+    def _render_full(self):
+        self.screen.fill(self.background_color)
+        for item in self._items:
+            self._draw_item(item)
+        self._pending = None
+        self.last_dirty_rects = [self.screen_rect.copy()]
+        return FRAME_FULL
+
+    @staticmethod
+    def _merge_rects(rects):
+        """Объединяет соприкасающиеся прямоугольники (старое и новое место сдвинувшегося
+        элемента), если объединение не намного больше их суммарной площади."""
+        merged = []
+        for rect in rects:
+            index = rect.inflate(2, 2).collidelist(merged)
+            if index != -1:
+                other = merged[index]
+                union = other.union(rect)
+                if union.width * union.height <= _MERGE_AREA_FACTOR * (
+                    other.width * other.height + rect.width * rect.height
+                ):
+                    merged[index] = union
+                    continue
+            merged.append(rect)
+        return merged
+
+    def _render_partial(self, dirty):
+        item_rects = [item[0] for item in self._items]
+        for dirty_rect in dirty:
+            self.screen.set_clip(dirty_rect)
+            self.screen.fill(self.background_color, dirty_rect)
+            for index in dirty_rect.collidelistall(item_rects):
+                self._draw_item(self._items[index])
+        self.screen.set_clip(None)
+        self._pending = dirty
+        self.last_dirty_rects = dirty
+        return FRAME_PARTIAL
+
+    def render(self):
+        """Рисует на экране изменения записанного кадра; возвращает режим кадра."""
+        current = {item[1] for item in self._items}
+        if self._force_full or self.background_color != self._previous_background:
+            mode = self._render_full()
+        else:
+            changed = current.symmetric_difference(self._previous)
+            dirty = [pygame.Rect(signature[4:8]) for signature in changed]
+            for rect in self._marked:
+                rect = rect.clip(self.screen_rect)
+                if rect.width and rect.height:
+                    dirty.append(rect)
+            dirty = self._merge_rects(dirty)
+            if not dirty:
+                self._pending = []
+                self.last_dirty_rects = []
+                mode = FRAME_SKIPPED
+            elif len(dirty) > self.max_dirty_rects or sum(
+                rect.width * rect.height for rect in dirty
+            ) > self.full_redraw_threshold * self.screen_rect.width * self.screen_rect.height:
+                mode = self._render_full()
+            else:
+                mode = self._render_partial(dirty)
+        self._previous = current
+        self._previous_items = self._items
+        self._previous_background = self.background_color
+        self._force_full = False
+        self._items = []
+        self._marked = []
+        self.last_frame_mode = mode
+        self.frame_counts[mode] += 1
+        return mode
+
+    def present(self):
+        """Выводит нарисованное на экран: flip() для полного кадра, update(rects) для частичного."""
+        if self._pending is None:
+            pygame.display.flip()
+        elif self._pending:
+            pygame.display.update(self._pending)
+        self._pending = []
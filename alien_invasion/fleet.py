@@ -0,0 +1,383 @@
+"""Строй (формация) флота пришельцев.
+
+Флот движется как единое целое: все пришельцы смещаются вбок с одной
+скоростью и опускаются вместе. Раньше каждый шаг симуляции вызывал
+Alien.update() для каждого пришельца, а опускание флота перебирало всех
+пришельцев. Fleet - группа спрайтов пришельцев, которая хранит одно начало
+координат (origin) флота, а каждый пришелец - свое постоянное смещение в
+сетке строя. Движение и опускание меняют только origin, поэтому их стоимость
+не зависит от размера флота.
+
+Прямоугольники пришельцев (Alien.rect) выводятся из origin лениво: когда
+группу перебирают (столкновения, отрисовка) и только если origin сдвинулся на
+целый пиксель с прошлого перебора.
+
+Габариты строя (bounding_rect) тоже хранятся относительно origin: для каждой
+колонки и каждого ряда строя известны число живых пришельцев и границы.
+Движение габариты не пересчитывает, а пересчет по колонкам и рядам (не по
+пришельцам) нужен только когда уничтожен последний пришелец колонки или ряда.
+Проверки края экрана, нижней границы и близости корабля сравнивают один
+прямоугольник вместо перебора всего флота.
+
+Для столкновений прямоугольники пришельцев строя лежат в SpatialHash
+(alien_invasion/spatial_hash.py) тоже относительно origin: сетку не нужно
+перестраивать при движении флота, а при уничтожении пришелец просто
+удаляется из нее. Запрос сдвигает прямоугольник корабля в систему
+координат строя.
+
+Пули летят строго вверх, поэтому для них есть индекс колонок: колонка строя ->
+ее пришельцы, упорядоченные по высоте, и указатель на нижнего живого
+пришельца. Попадание пули ищется поиском колонки по x (bisect по левым
+границам колонок) и сравнением y с нижним живым пришельцем колонки.
+"""
+
+import bisect
+import math
+
+import pygame
+
+from alien_invasion.spatial_hash import SpatialHash
+
+
+class _FleetColumn:
+    """Пришельцы одной колонки строя сверху вниз и указатель на нижнего живого."""
+
+    def __init__(self, left):
+        self.left = left  # Левая граница колонки относительно origin
+        self.tops = []  # Верхние границы пришельцев относительно origin, по возрастанию
+        self.aliens = []
+        self.rects = []  # Прямоугольники пришельцев относительно origin
+        self.alive = []
+        self.lowest = -1  # Индекс нижнего живого пришельца; -1 - живых нет
+        self.max_height = 0
+
+    def add(self, alien, rect):
+        index = bisect.bisect_right(self.tops, rect.top)
+        self.tops.insert(index, rect.top)
+        self.aliens.insert(index, alien)
+        self.rects.insert(index, rect)
+        self.alive.insert(index, True)
+        if index <= self.lowest:
+            self.lowest += 1  # Новый пришелец выше нижнего живого: указатель сдвигается
+        else:
+            self.lowest = index
+        self.max_height = max(self.max_height, rect.height)
+
+    def remove(self, alien):
+        index = bisect.bisect_left(self.tops, alien.offset_y)
+        while self.aliens[index] is not alien:
+            index += 1
+        self.alive[index] = False
+        if index == self.lowest:
+            lowest = index - 1
+            while lowest >= 0 and not self.alive[lowest]:
+                lowest -= 1
+            self.lowest = lowest
+
+    def collect_hits(self, rect, hits):
+        """Добавляет в hits живых пришельцев колонки, чьи прямоугольники пересекают rect."""
+        lowest = self.lowest
+        if lowest < 0 or rect.top > self.tops[lowest] + self.max_height:
+            return  # Пуля ниже нижнего живого пришельца колонки
+        # Выше rect.bottom пришельцы начинаются с этого индекса и ниже
+        index = min(lowest, bisect.bisect_right(self.tops, rect.bottom) - 1)
+        tops = self.tops
+        alive = self.alive
+        rects = self.rects
+        reach = rect.top - self.max_height
+        colliderect = rect.colliderect
+        while index >= 0 and tops[index] >= reach:
+            if alive[index] and colliderect(rects[index]):
+                hits.add(self.aliens[index])
+            index -= 1
+
+
+class Fleet(pygame.sprite.Group):
+    """Группа пришельцев с общим началом координат строя."""
+
+    def __init__(self, settings):
+        super().__init__()
+        self.settings = settings
+        self.x = 0.0  # Точная горизонтальная позиция origin
+        self.y = 0  # Вертикальная позиция origin (опускание - целые пиксели)
+        self.origin_x = 0  # Целочисленный origin, из которого строятся rect пришельцев
+        self.origin_y = 0
+        # Номер версии origin: увеличивается при каждом его сдвиге на целый пиксель
+        self.version = 0
+        self._synced_version = 0  # Версия origin, по которой выставлены rect пришельцев
+        # Колонка строя -> [число пришельцев, левая граница, правая граница] (относительно origin)
+        self._columns = {}
+        # Ряд строя -> [число пришельцев, верхняя граница, нижняя граница]
+        self._rows = {}
+        # Габариты строя относительно origin: (left, top, right, bottom) или None - строй пуст
+        self._extent = None
+        self._extent_stale = False
+        # Пришельцы в группе вне строя (двигаются сами): они учитываются в габаритах отдельно
+        self._loose = set()
+        # Прямоугольники пришельцев строя относительно origin, разложенные по ячейкам
+        self._grid = SpatialHash(settings.collision_grid_cell_size)
+        # Пришелец -> порядковый номер добавления: результаты столкновений упорядочены
+        # так же, как группа (и как у pygame.sprite.spritecollide)
+        self._order = {}
+        self._next_order = 0
+        # Индекс колонок для попаданий пуль: ключ колонки -> _FleetColumn, а также левые
+        # границы колонок по возрастанию и ключи колонок в том же порядке
+        self._column_index = {}
+        self._column_lefts = []
+        self._column_keys = []
+        self._max_column_width = 0
+
+    def reset(self):
+        """Возвращает origin в (0, 0) для нового строя."""
+        self.x = 0.0
+        self.y = 0
+        self._moved()
+
+    def add_to_formation(self, alien, column, row):
+        """Добавляет пришельца в строй: его текущая позиция становится смещением от origin."""
+        if self._synced_version != self.version:
+            self._sync_rects()  # rect остальных пришельцев должны соответствовать текущему origin
+        alien.fleet_column = column
+        alien.fleet_row = row
+        alien.offset_x = alien.rect.x - self.origin_x
+        alien.offset_y = alien.rect.y - self.origin_y
+        alien.fleet = self
+        self.add(alien)
+
+    def update(self, dt):
+        """Сдвигает флот вбок по fleet_direction (dt в секундах); пришельцы вне строя - Alien.update()."""
+        self.x += self.settings.alien_speed_current * self.settings.fleet_direction * dt
+        self._moved()
+        for alien in self._loose:
+            topleft = alien.rect.topleft
+            alien.update(dt)
+            if alien.rect.topleft != topleft:
+                self._extent_stale = True
+
+    def drop(self, distance):
+        """Опускает флот на distance пикселей (округляется до целого, как при сдвиге Rect)."""
+        # Дробное опускание округляется на каждом шаге, как раньше при rect.y += distance:
+        # origin по вертикали остается целым, и габариты строя совпадают с rect пришельцев
+        self.y += math.floor(distance + 0.5)
+        self._moved()
+
+    def bounding_rect(self):
+        """Прямоугольник, охватывающий всех пришельцев флота; None, если флот пуст."""
+        if self._extent_stale:
+            self._recompute_extent()
+        extent = self._extent
+        bounds = None
+        if extent is not None:
+            left, top, right, bottom = extent
+            bounds = pygame.Rect(
+                self.origin_x + left, self.origin_y + top, right - left, bottom - top
+            )
+        for alien in self._loose:
+            bounds = alien.rect.copy() if bounds is None else bounds.union(alien.rect)
+        return bounds
+
+    def collide_rect(self, rect):
+        """Пришельцы, чьи rect пересекают rect (Rect.colliderect), в порядке группы.
+
+        То же, что pygame.sprite.spritecollide(sprite, fleet, False) для sprite с этим rect,
+        но без перебора всего флота.
+        """
+        local_rect = pygame.Rect(
+            rect.x - self.origin_x, rect.y - self.origin_y, rect.width, rect.height
+        )
+        hits = self._grid.query(local_rect)
+        for alien in self._loose:
+            if rect.colliderect(alien.rect):
+                hits.add(alien)
+        if not hits:
+            return []
+        return self._ordered_hits(hits)
+
+    def collide_column_rect(self, rect):
+        """То же, что collide_rect(), но поиск идет по индексу колонок.
+
+        Быстрее сетки для узких прямоугольников (пуль): колонка находится по x,
+        пришельцы в ней - сравнением y.
+        """
+        local_left = rect.x - self.origin_x
+        local_rect = pygame.Rect(local_left, rect.y - self.origin_y, rect.width, rect.height)
+        hits = set()
+        lefts = self._column_lefts
+        keys = self._column_keys
+        column_index = self._column_index
+        # Колонки, начинающиеся не правее пули; левее пули их можно не смотреть, когда
+        # даже самая широкая колонка заканчивается до пули
+        reach = local_left - self._max_column_width
+        index = bisect.bisect_right(lefts, local_rect.right) - 1
+        while index >= 0 and lefts[index] >= reach:
+            column_index[keys[index]].collect_hits(local_rect, hits)
+            index -= 1
+        for alien in self._loose:
+            if rect.colliderect(alien.rect):
+                hits.add(alien)
+        if not hits:
+            return []
+        return self._ordered_hits(hits)
+
+    def groupcollide(self, group, dokill, dokill_aliens):
+        """То же, что pygame.sprite.groupcollide(group, fleet, dokill, dokill_aliens).
+
+        Возвращает словарь {спрайт group: список задетых пришельцев} с теми же
+        ключами, списками и порядком, что и pygame.
+        """
+        crashed = {}
+        # Спрайты вне габаритов флота ни с кем не сталкиваются. Габариты берутся до
+        # уничтожений: они могут быть шире нужного, но не уже.
+        bounds = self.bounding_rect()
+        if bounds is None:
+            return crashed
+        for sprite in group.sprites():
+            if not bounds.colliderect(sprite.rect):
+                continue
+            hits = self.collide_column_rect(sprite.rect)
+            if hits:
+                if dokill_aliens:
+                    for alien in hits:
+                        alien.kill()
+                crashed[sprite] = hits
+                if dokill:
+                    sprite.kill()
+        return crashed
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._order[sprite] = self._next_order
+        self._next_order += 1
+        if sprite.fleet is not self:
+            self._loose.add(sprite)
+            return
+        rect = sprite.rect
+        left = sprite.offset_x
+        top = sprite.offset_y
+        right = left + rect.width
+        bottom = top + rect.height
+        local_rect = pygame.Rect(left, top, rect.width, rect.height)
+        self._grid.insert(sprite, local_rect)
+        column = self._columns.get(sprite.fleet_column)
+        if column is None:
+            self._columns[sprite.fleet_column] = [1, left, right]
+        else:
+            column[0] += 1
+            column[1] = min(column[1], left)
+            column[2] = max(column[2], right)
+        # Ширина колонки считается по ее правой границе из self._columns, уже с этим пришельцем
+        self._add_to_column_index(sprite, local_rect)
+        row = self._rows.get(sprite.fleet_row)
+        if row is None:
+            self._rows[sprite.fleet_row] = [1, top, bottom]
+        else:
+            row[0] += 1
+            row[1] = min(row[1], top)
+            row[2] = max(row[2], bottom)
+        if self._extent is None:
+            self._extent = (left, top, right, bottom)
+        else:
+            ext_left, ext_top, ext_right, ext_bottom = self._extent
+            self._extent = (
+                min(ext_left, left),
+                min(ext_top, top),
+                max(ext_right, right),
+                max(ext_bottom, bottom),
+            )
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self._order[sprite]
+        if sprite.fleet is not self:
+            self._loose.discard(sprite)
+            return
+        self._grid.remove(sprite)
+        self._column_index[sprite.fleet_column].remove(sprite)
+        for lines, key in ((self._columns, sprite.fleet_column), (self._rows, sprite.fleet_row)):
+            line = lines[key]
+            line[0] -= 1
+            if line[0] == 0:
+                # Колонка или ряд опустели: габариты могут сузиться
+                del lines[key]
+                self._extent_stale = True
+        if sprite.fleet_column not in self._columns:
+            self._drop_from_column_index(sprite.fleet_column)
+
+    def sprites(self):
+        """Список пришельцев; их rect приводятся к текущему origin."""
+        if self._synced_version != self.version:
+            self._sync_rects()
+        return list(self.spritedict)
+
+    def _ordered_hits(self, hits):
+        """Упорядочивает найденных пришельцев как в группе и выставляет их rect."""
+        hits = sorted(hits, key=self._order.__getitem__)
+        origin_x = self.origin_x
+        origin_y = self.origin_y
+        for alien in hits:
+            if alien.fleet is self:
+                alien.rect.topleft = (origin_x + alien.offset_x, origin_y + alien.offset_y)
+        return hits
+
+    def _add_to_column_index(self, alien, local_rect):
+        key = alien.fleet_column
+        column = self._column_index.get(key)
+        if column is not None and local_rect.left < column.left:
+            # Колонка расширилась влево: ее место в списке левых границ меняется
+            self._drop_from_column_index(key)
+            self._column_index[key] = column
+            column.left = local_rect.left
+            self._insert_column(key, column)
+        elif column is None:
+            column = self._column_index[key] = _FleetColumn(local_rect.left)
+            self._insert_column(key, column)
+        column.add(alien, local_rect)
+        # Ширина - от левой границы колонки до правой границы всех ее пришельцев: расширение
+        # колонки влево увеличивает ширину и для пришельцев, добавленных раньше
+        self._max_column_width = max(
+            self._max_column_width, self._columns[key][2] - column.left
+        )
+
+    def _insert_column(self, key, column):
+        index = bisect.bisect_right(self._column_lefts, column.left)
+        self._column_lefts.insert(index, column.left)
+        self._column_keys.insert(index, key)
+
+    def _drop_from_column_index(self, key):
+        column = self._column_index.pop(key)
+        index = bisect.bisect_left(self._column_lefts, column.left)
+        while self._column_keys[index] != key:
+            index += 1
+        del self._column_lefts[index]
+        del self._column_keys[index]
+
+    def _moved(self):
+        # floor, а не int(): при отрицательном сдвиге int() округлял бы к нулю, и пришелец
+        # оказывался бы на пиксель правее, чем int() от его собственной координаты
+        origin_x = math.floor(self.x)
+        if origin_x != self.origin_x or self.y != self.origin_y:
+            self.origin_x = origin_x
+            self.origin_y = self.y
+            self.version += 1
+
+    def _recompute_extent(self):
+        self._extent_stale = False
+        if not self._columns:
+            self._extent = None
+            return
+        columns = self._columns.values()
+        rows = self._rows.values()
+        self._extent = (
+            min(column[1] for column in columns),
+            min(row[1] for row in rows),
+            max(column[2] for column in columns),
+            max(row[2] for row in rows),
+        )
+
+    def _sync_rects(self):
+        origin_x = self.origin_x
+        origin_y = self.origin_y
+        for alien in self.spritedict:
+            if alien.fleet is self:  # Пришельцы вне строя двигаются сами
+                alien.rect.topleft = (origin_x + alien.offset_x, origin_y + alien.offset_y)
+        self._synced_version = self.version
@@ -0,0 +1,199 @@
+"""Замер времени кадра по фазам игрового цикла.
+
+FrameTimer накапливает время каждой фазы кадра (опрос событий, обновление звезд,
+корабля и пуль, коллизии и т.д.) с помощью time.perf_counter_ns и по завершении
+кадра записывает строку в кольцевой буфер фиксированного размера. По буферу
+считаются скользящие avg/p95/p99 для оверлея, а сам буфер можно выгрузить в CSV.
+
+Пока замер выключен, lap() и end_frame() сразу возвращаются, поэтому
+инструментированный цикл почти не теряет в скорости.
+"""
+
+import csv
+import logging
+from array import array
+from time import perf_counter_ns
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+# Фазы кадра в порядке их выполнения в run_game.
+PHASE_EVENTS = 0
+PHASE_STARFIELD = 1
+PHASE_SHIP_BULLETS = 2
+PHASE_COLLISIONS = 3
+PHASE_ALIENS = 4
+PHASE_POWERUPS = 5
+PHASE_SPACE_OBJECTS = 6
+PHASE_DRAW = 7
+PHASE_FLIP = 8
+PHASE_NAMES = (
+    "events",
+    "starfield",
+    "ship_bullets",
+    "collisions",
+    "aliens",
+    "powerups",
+    "space_objects",
+    "draw",
+    "flip",
+)
+
+_NS_PER_MS = 1_000_000
+_OVERLAY_FONT_SIZE = 18
+_OVERLAY_LINE_SPACING = 2
+_OVERLAY_PADDING = 6
+_OVERLAY_MARGIN = 10
+_OVERLAY_BG_COLOR = (0, 0, 0, 170)
+_OVERLAY_TEXT_COLOR = (200, 255, 200)
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль (метод ближайшего ранга) для уже отсортированной последовательности."""
+    if not sorted_values:
+        return 0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class FrameTimer:
+    """Кольцевой буфер времени фаз кадра с оверлеем статистики."""
+
+    def __init__(self, capacity=600, overlay_refresh_ms=500):
+        """capacity - число последних кадров в буфере; overlay_refresh_ms - период обновления оверлея."""
+        self.capacity = capacity
+        self.overlay_refresh_ms = overlay_refresh_ms
+        self.enabled = False
+        self.overlay_visible = False
+
+        n_phases = len(PHASE_NAMES)
+        # Строка на кадр, столбец на фазу; значения в наносекундах.
+        self._samples = array("q", bytes(8 * capacity * n_phases))
+        self._current = [0] * n_phases  # Накопление текущего кадра
+        self._next_row = 0
+        self.frames_recorded = 0
+        self._lap_start_ns = 0
+
+        self._font = None
+        self._overlay_surface = None
+        self._overlay_built_ns = 0
+
+    def set_enabled(self, enabled):
+        """Включает или выключает сбор замеров (накопленный буфер сохраняется)."""
+        self.enabled = enabled
+        self._current = [0] * len(PHASE_NAMES)
+        self._lap_start_ns = perf_counter_ns()
+
+    def toggle_overlay(self):
+        """Показывает/скрывает оверлей; сбор замеров включается вместе с оверлеем."""
+        self.overlay_visible = not self.overlay_visible
+        self.set_enabled(self.overlay_visible)
+        self._overlay_surface = None
+
+    def begin_frame(self):
+        """Отмечает начало кадра (время ожидания clock.tick в фазы не попадает)."""
+        if self.enabled:
+            self._lap_start_ns = perf_counter_ns()
+
+    def lap(self, phase=None):
+        """Добавляет время с предыдущей отметки к фазе phase (None - только сдвинуть отметку)."""
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        if phase is not None:
+            self._current[phase] += now - self._lap_start_ns
+        self._lap_start_ns = now
+
+    def end_frame(self):
+        """Записывает накопленное время фаз кадра в кольцевой буфер."""
+        if not self.enabled:
+            return
+        n_phases = len(PHASE_NAMES)
+        offset = self._next_row * n_phases
+        current = self._current
+        for i in range(n_phases):
+            self._samples[offset + i] = current[i]
+            current[i] = 0
+        self._next_row = (self._next_row + 1) % self.capacity
+        self.frames_recorded += 1
+
+    def _rows(self):
+        """Возвращает строки буфера (списки наносекунд по фазам) от старых к новым."""
+        n_phases = len(PHASE_NAMES)
+        count = min(self.frames_recorded, self.capacity)
+        first = (self._next_row - count) % self.capacity
+        rows = []
+        for k in range(count):
+            offset = ((first + k) % self.capacity) * n_phases
+            rows.append(self._samples[offset : offset + n_phases].tolist())
+        return rows
+
+    def phase_stats(self):
+        """Возвращает [(имя фазы, avg_ms, p95_ms, p99_ms), ...] по кадрам в буфере, плюс итог "frame"."""
+        rows = self._rows()
+        columns = [list(column) for column in zip(*rows)] if rows else []
+        if columns:
+            columns.append([sum(row) for row in rows])
+        stats = []
+        for name, values in zip(PHASE_NAMES + ("frame",), columns):
+            values.sort()
+            stats.append(
+                (
+                    name,
+                    sum(values) / len(values) / _NS_PER_MS,
+                    percentile(values, 0.95) / _NS_PER_MS,
+                    percentile(values, 0.99) / _NS_PER_MS,
+                )
+            )
+        return stats
+
+    def dump_csv(self, path):
+        """Выгружает буфер в CSV: номер кадра и время каждой фазы в наносекундах."""
+        rows = self._rows()
+        first_frame = self.frames_recorded - len(rows)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("frame",) + PHASE_NAMES)
+            for k, row in enumerate(rows):
+                writer.writerow([first_frame + k] + row)
+        logger.info("Замеры %d кадров сохранены в %s.", len(rows), path)
+
+    def _build_overlay(self):
+        """Рисует таблицу avg/p95/p99 на полупрозрачной панели."""
+        if self._font is None:
+            self._font = pygame.font.Font(None, _OVERLAY_FONT_SIZE)
+        lines = [f"{'phase':<14}{'avg':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, avg_ms, p95_ms, p99_ms in self.phase_stats():
+            lines.append(f"{name:<14}{avg_ms:>7.2f}{p95_ms:>7.2f}{p99_ms:>7.2f}")
+        images = [self._font.render(line, True, _OVERLAY_TEXT_COLOR) for line in lines]
+
+        width = max(image.get_width() for image in images) + 2 * _OVERLAY_PADDING
+        height = (
+            sum(image.get_height() + _OVERLAY_LINE_SPACING for image in images)
+            + 2 * _OVERLAY_PADDING
+        )
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill(_OVERLAY_BG_COLOR)
+        y = _OVERLAY_PADDING
+        for image in images:
+            surface.blit(image, (_OVERLAY_PADDING, y))
+            y += image.get_height() + _OVERLAY_LINE_SPACING
+        return surface
+
+    def draw(self, screen):
+        """Рисует оверлей в левом нижнем углу экрана (таблица пересчитывается раз в overlay_refresh_ms)."""
+        if not self.overlay_visible:
+            return
+        now = perf_counter_ns()
+        if (
+            self._overlay_surface is None
+            or now - self._overlay_built_ns >= self.overlay_refresh_ms * _NS_PER_MS
+        ):
+            self._overlay_surface = self._build_overlay()
+            self._overlay_built_ns = now
+        screen_rect = screen.get_rect()
+        overlay_rect = self._overlay_surface.get_rect(
+            left=_OVERLAY_MARGIN, bottom=screen_rect.bottom - _OVERLAY_MARGIN
+        )
+        screen.blit(self._overlay_surface, overlay_rect)
@@ -1,6 +1,8 @@
 import json
 import logging
 
+from alien_invasion.highscore_store import HighScoreStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,7 +19,15 @@ class GameStats:
 
         # Рекорд загружается из файла или устанавливается в 0.
         self.high_score = 0 # Initialize before attempting to load
-        self._load_high_score()
+        # None - рекорд живет только в памяти (settings.highscore_persist выключен)
+        self.high_score_store = None
+        if self.settings.highscore_persist:
+            self._load_high_score()
+            # Новые рекорды записываются в фоне (см. highscore_store.py)
+            self.high_score_store = HighScoreStore(
+                self.settings.highscore_filepath, self.settings.highscore_save_delay_s
+            )
+            self.high_score_store.saved_value = self.high_score  # Уже на диске
 
     def _load_high_score(self):
         """Загружает рекордный счет из файла, если он существует."""
@@ -46,17 +56,15 @@ class GameStats:
             self.high_score = 0
 
     def _save_high_score(self):
-        """Сохраняет текущий рекордный счет в файл."""
-        try:
-            with open(self.settings.highscore_filepath, "w") as f:
-                json.dump(self.high_score, f)
-        except Exception as e:
-            logger.error(
-                "Could not save high score to %s. Error: %s",
-                self.settings.highscore_filepath,
-                e,
-                exc_info=True,
-            )
+        """Передает текущий рекорд на запись в файл (в фоне, не блокируя кадр)."""
+        if self.high_score_store is not None:
+            self.high_score_store.submit(self.high_score)
+
+    def flush_high_score(self, wait=False):
+        """Записывает рекорд без отсрочки (окончание игры, выход); wait=True ждет записи."""
+        if self.high_score_store is None:
+            return True
+        return self.high_score_store.flush(wait=wait)
 
     def reset_stats(self):
         """Инициализирует статистику, изменяющуюся в ходе игры"""
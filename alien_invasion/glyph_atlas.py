@@ -0,0 +1,145 @@
+"""Атлас глифов для часто обновляемых чисел интерфейса (счет, уровень, рекорд).
+
+Раньше каждое изменение счета вызывало font.render() (SDL_ttf растеризует всю
+строку) и convert() - две новые поверхности на каждое попадание. GlyphAtlas
+один раз рендерит цифры, запятую и целые подписи (например, "Рекорд: ") одним
+шрифтом и цветом и складывает их в одну поверхность-атлас. Число затем
+собирается копированием глифов из атласа (blit с area) в переиспользуемый
+буфер TextBuffer, так что обновление текста не обращается к SDL_ttf и не
+создает поверхностей.
+
+Глифы стоят вплотную с шагом своей ширины, поэтому кернинг между цифрами не
+учитывается: ширина собранной строки может отличаться от font.size() на
+пиксель-другой. Символы, которых нет в атласе, собрать нельзя - для них
+вызывающий код рендерит строку шрифтом, как раньше.
+"""
+
+import pygame
+
+# Символы, из которых состоят числа "{:,}"
+DIGIT_CHARS = "0123456789,"
+# Запас ширины буфера: столько глифов-цифр сверх начальной строки помещается
+# без пересоздания буфера
+_BUFFER_SPARE_GLYPHS = 4
+
+
+class GlyphAtlas:
+    """Глифы одного шрифта и цвета в одной поверхности."""
+
+    def __init__(self, font, color, background=None, labels=()):
+        """Рендерит символы DIGIT_CHARS и строки labels (каждую целиком) один раз.
+
+        background=None дает прозрачный фон (атлас с альфа-каналом), иначе глифы
+        рендерятся на непрозрачном фоне этого цвета. Возбуждает TypeError, если
+        font.render() возвращает не pygame.Surface.
+        """
+        self.color = color
+        self.background = background
+        self.has_alpha = background is None
+        pieces = list(DIGIT_CHARS) + [label for label in labels if label]
+        rendered = []
+        for piece in pieces:
+            image = font.render(piece, True, color, background)
+            if not isinstance(image, pygame.Surface):
+                raise TypeError("font.render() returned %r, not a pygame.Surface" % type(image))
+            rendered.append(image)
+
+        self.height = max(image.get_height() for image in rendered)
+        width = sum(image.get_width() for image in rendered)
+        self.surface = self.new_surface((width, self.height))
+        self._rects = {}  # Символ или подпись -> область в атласе
+        x = 0
+        for piece, image in zip(pieces, rendered):
+            self.surface.blit(image, (x, 0), None, self.blit_flags)
+            self._rects[piece] = pygame.Rect(x, 0, image.get_width(), self.height)
+            x += image.get_width()
+
+    @property
+    def blit_flags(self):
+        # Прозрачные глифы копируются в очищенный (нулевой) буфер через
+        # BLEND_RGBA_MAX: обычный blit смешал бы альфу края глифа с пустым фоном
+        return pygame.BLEND_RGBA_MAX if self.has_alpha else 0
+
+    @property
+    def clear_color(self):
+        return (0, 0, 0, 0) if self.has_alpha else self.background
+
+    def new_surface(self, size):
+        """Создает поверхность формата атласа, залитую его фоном."""
+        if self.has_alpha:
+            surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        else:
+            surface = pygame.Surface(size).convert()
+        surface.fill(self.clear_color)
+        return surface
+
+    def can_compose(self, text, prefix=""):
+        """True, если text (и подпись prefix) целиком есть в атласе."""
+        if prefix and prefix not in self._rects:
+            return False
+        rects = self._rects
+        return all(char in rects for char in text)
+
+    def measure(self, text, prefix=""):
+        """Ширина собранной строки prefix + text в пикселях."""
+        rects = self._rects
+        width = rects[prefix].width if prefix else 0
+        for char in text:
+            width += rects[char].width
+        return width
+
+    def compose(self, target, text, prefix="", x=0, y=0):
+        """Копирует глифы prefix + text в target начиная с (x, y); возвращает ширину.
+
+        Область под строкой в target должна быть заранее залита clear_color.
+        """
+        rects = self._rects
+        atlas = self.surface
+        flags = self.blit_flags
+        start = x
+        if prefix:
+            area = rects[prefix]
+            target.blit(atlas, (x, y), area, flags)
+            x += area.width
+        for char in text:
+            area = rects[char]
+            target.blit(atlas, (x, y), area, flags)
+            x += area.width
+        return x - start
+
+
+class TextBuffer:
+    """Переиспользуемая поверхность для строк, собираемых из GlyphAtlas.
+
+    render() возвращает subsurface буфера ровно по ширине строки. Такие
+    subsurface кэшируются по ширине, поэтому после первых обновлений
+    изменение текста не создает ни одной поверхности: меняются только пиксели
+    буфера. Тот же объект изображения с новым содержимым не виден тем, кто
+    сравнивает поверхности по объекту (DirtyRectRenderer), - владелец буфера
+    сообщает об изменении сам.
+    """
+
+    def __init__(self, atlas, sample_text="", sample_prefix=""):
+        """Выделяет буфер под строку sample_prefix + sample_text с запасом."""
+        self.atlas = atlas
+        width = atlas.measure(sample_text, sample_prefix)
+        self._allocate(width + _BUFFER_SPARE_GLYPHS * atlas.measure("0"))
+
+    def _allocate(self, width):
+        self.surface = self.atlas.new_surface((max(1, width), self.atlas.height))
+        self._views = {}  # Ширина -> subsurface буфера
+
+    def render(self, text, prefix=""):
+        """Собирает prefix + text в буфере и возвращает изображение строки."""
+        atlas = self.atlas
+        width = atlas.measure(text, prefix)
+        if width > self.surface.get_width():
+            # Строка длиннее всех прежних: буфер пересоздается с запасом (редко)
+            self._allocate(width + _BUFFER_SPARE_GLYPHS * atlas.measure("0"))
+        view = self._views.get(width)
+        if view is None:
+            view = self.surface.subsurface((0, 0, max(1, width), atlas.height))
+            self._views[width] = view
+        view.fill(atlas.clear_color)
+        atlas.compose(view, text, prefix)
+        return view
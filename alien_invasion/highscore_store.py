@@ -0,0 +1,144 @@
+"""Отложенная (write-behind) запись рекорда на диск.
+
+Раньше каждый новый рекорд сразу записывался в highscore.json прямо в кадре:
+после того как игрок превысил старый рекорд, это была блокирующая запись на
+диск при каждом попадании. HighScoreStore только запоминает последнее значение
+(submit), а записывает его фоновый поток: не раньше чем через delay_s секунд
+после первого незаписанного значения, либо сразу по flush() (окончание игры)
+и close() (выход из игры, в том числе через atexit).
+
+Файл пишется во временный файл в том же каталоге, сбрасывается на диск
+(fsync) и атомарно подменяет старый через os.replace(): сбой посреди записи
+оставляет на диске старый рекорд целиком, а не обрезанный файл.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path, value):
+    """Атомарно записывает value в path как JSON (временный файл + os.replace)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".highscore-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)  # Недописанный файл не должен остаться рядом с рекордом
+        raise
+
+
+class HighScoreStore:
+    """Записывает последнее переданное значение рекорда в фоновом потоке."""
+
+    def __init__(self, path, delay_s=2.0):
+        self.path = path
+        self.delay_s = delay_s
+        self.saved_value = None  # Последнее значение, записанное на диск
+        self.writes = 0  # Число выполненных записей (для статистики и тестов)
+        self._cond = threading.Condition()
+        self._pending = None  # Значение, которое еще не записано
+        self._deadline = None  # Время (time.monotonic), когда pending будет записан
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+        self._thread = None
+
+    def submit(self, value):
+        """Запоминает новое значение рекорда; запись произойдет в фоне."""
+        with self._cond:
+            if self._pending is None and value == self.saved_value:
+                return
+            self._pending = value
+            if self._deadline is None:
+                # Отсрочка считается от первого незаписанного значения, а не от последнего:
+                # пока счет растет, рекорд все равно записывается раз в delay_s секунд
+                self._deadline = time.monotonic() + self.delay_s
+            self._start()
+            self._cond.notify()
+
+    def flush(self, wait=False, timeout=None):
+        """Записывает незаписанное значение без отсрочки.
+
+        wait=True ждет окончания записи (не дольше timeout секунд); возвращает
+        True, если незаписанных значений не осталось.
+        """
+        with self._cond:
+            if self._pending is not None:
+                self._flush_requested = True
+                self._start()
+                self._cond.notify()
+            if wait:
+                return self._cond.wait_for(
+                    lambda: self._pending is None and not self._writing, timeout
+                )
+            return self._pending is None and not self._writing
+
+    def close(self, timeout=5.0):
+        """Записывает незаписанное значение и останавливает фоновый поток."""
+        self.flush(wait=True, timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            atexit.unregister(self.close)
+
+    def _start(self):
+        # Вызывается под self._cond
+        if self._thread is not None or self._closed:
+            return
+        self._thread = threading.Thread(target=self._run, name="highscore-writer", daemon=True)
+        self._thread.start()
+        # Выход из игры через sys.exit() из любого места записывает последний рекорд
+        atexit.register(self.close)
+
+    def _next_value(self):
+        """Ждет значения, которое пора записать; None - поток нужно остановить."""
+        with self._cond:
+            while True:
+                if self._pending is not None:
+                    remaining = self._deadline - time.monotonic()
+                    if self._flush_requested or self._closed or remaining <= 0:
+                        value = self._pending
+                        self._pending = None
+                        self._deadline = None
+                        self._flush_requested = False
+                        self._writing = True
+                        return value
+                    self._cond.wait(remaining)
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        while True:
+            value = self._next_value()
+            if value is None:
+                return
+            saved = False
+            try:
+                write_json_atomic(self.path, value)
+                saved = True
+            except Exception as e:
+                logger.error(
+                    "Could not save high score to %s. Error: %s", self.path, e, exc_info=True
+                )
+            with self._cond:
+                self._writing = False
+                if saved:
+                    self.saved_value = value
+                    self.writes += 1
+                self._cond.notify_all()
@@ -0,0 +1,267 @@
+"""Общий для процесса кэш изображений.
+
+Каждый файл декодируется с диска один раз за процесс; масштабированные варианты
+кэшируются отдельно по ключу (путь, размер, флаги). load_image() возвращает общую
+поверхность, которую нельзя изменять: ее же получат все остальные объекты.
+Если поверхность нужно менять (альфа, рисование поверх), используйте
+load_image_copy(). Постоянные производные варианты (например, окрашенные
+спрайты пришельцев) строятся один раз через load_variant() и тоже общие.
+
+Если собран текстурный атлас (tools/build_atlas.py -> assets/gfx/atlas/atlas.json),
+спрайты из него берутся как subsurface одной загруженной страницы атласа вместо
+чтения отдельных файлов. Спрайты, которых нет в атласе, а также все спрайты при
+отсутствующем или поврежденном атласе загружаются из своих файлов, как раньше.
+
+Запись атласа используется, только если она соответствует файлу: хеш исходного
+PNG в индексе совпадает с хешем в манифесте ассетов (manifest.json в корне
+спрайтов), а спрайт лежит в атласе в исходном размере. Иначе (PNG изменен после
+сборки атласа, спрайт уменьшен при сборке, манифеста нет) спрайт загружается из
+своего файла.
+
+Неудачные загрузки тоже запоминаются: повторный запрос того же файла сразу
+возбуждает pygame.error без обращения к диску, а вызывающий код создает fallback.
+
+Кэш можно заполнять из фонового потока (alien_invasion/preloader.py): все
+обращения к нему выполняются под общей блокировкой.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import pygame
+
+from alien_invasion.asset_manifest import MANIFEST_NAME, AssetManifest
+
+logger = logging.getLogger(__name__)
+
+_ATLAS_INDEX_VERSION = 2
+DEFAULT_ATLAS_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "assets", "gfx", "atlas", "atlas.json"
+)
+
+_lock = threading.RLock()  # load_variant() вызывает load_image() под той же блокировкой
+_surfaces = {}  # (путь, размер или None, alpha) -> pygame.Surface
+_failures = {}  # путь -> текст ошибки загрузки
+_hits = 0
+_misses = 0
+
+_atlas_index_path = DEFAULT_ATLAS_INDEX_PATH
+_atlas_sprites = None  # нормализованный путь -> (страница, Rect); None - индекс еще не прочитан
+_atlas_page_files = []  # [(путь к странице, (w, h)), ...]
+_atlas_pages = {}  # номер страницы -> Surface (None - страницу загрузить не удалось)
+
+
+def _normalize_path(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def set_atlas_index(path):
+    """Задает индекс текстурного атласа (None - не использовать атлас) и очищает кэш."""
+    global _atlas_index_path
+    with _lock:
+        _atlas_index_path = path
+        clear()
+
+
+def _read_atlas_index():
+    """Читает индекс атласа; при его отсутствии или повреждении атлас не используется."""
+    global _atlas_sprites, _atlas_page_files
+    _atlas_sprites = {}
+    _atlas_page_files = []
+    if not _atlas_index_path:
+        return
+    try:
+        with open(_atlas_index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != _ATLAS_INDEX_VERSION:
+            raise ValueError(f"неподдерживаемая версия индекса {index.get('version')!r}")
+        index_dir = os.path.dirname(os.path.abspath(_atlas_index_path))
+        root = os.path.join(index_dir, index["root"])
+        page_files = [
+            (os.path.join(index_dir, page["file"]), tuple(page["size"]))
+            for page in index["pages"]
+        ]
+        # Хеши исходных файлов сверяются с манифестом (а не с диском): атлас не читает PNG
+        manifest_path = os.path.join(root, MANIFEST_NAME)
+        try:
+            manifest = AssetManifest.load(manifest_path, root)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                "Манифест ассетов %s недоступен (%s): записи атласа не проверить, "
+                "спрайты загружаются из отдельных файлов.",
+                manifest_path,
+                e,
+            )
+            return
+        sprites = {}
+        stale = []
+        for name, entry in index["sprites"].items():
+            page = entry["page"]
+            if not 0 <= page < len(page_files):
+                raise ValueError(f"спрайт {name} ссылается на несуществующую страницу {page}")
+            rect = pygame.Rect(entry["rect"])
+            if list(rect.size) != list(entry["size"]):
+                # Спрайт уменьшен при сборке: load_image(path) должен вернуть файл как есть
+                logger.debug("Спрайт %s в атласе уменьшен, загружается из файла.", name)
+                continue
+            if manifest.entries.get(name, {}).get("sha256") != entry["sha256"]:
+                stale.append(name)
+                continue
+            sprites[_normalize_path(os.path.join(root, name))] = (page, rect)
+        if stale:
+            logger.warning(
+                "Атлас %s устарел для %d спрайтов (хеш не совпадает с манифестом): %s. "
+                "Они загружаются из файлов; пересоберите атлас: python tools/build_atlas.py",
+                _atlas_index_path,
+                len(stale),
+                ", ".join(sorted(stale)),
+            )
+    except FileNotFoundError:
+        logger.info("Текстурный атлас не найден (%s), спрайты загружаются из отдельных файлов.", _atlas_index_path)
+        return
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(
+            "Индекс атласа %s поврежден: %s. Спрайты загружаются из отдельных файлов.",
+            _atlas_index_path,
+            e,
+        )
+        return
+    _atlas_sprites = sprites
+    _atlas_page_files = page_files
+    logger.debug("Индекс атласа загружен: %d спрайтов на %d страницах.", len(sprites), len(page_files))
+
+
+def _atlas_page(number):
+    """Загружает страницу атласа один раз; None, если она недоступна или не совпадает с индексом."""
+    if number in _atlas_pages:
+        return _atlas_pages[number]
+    page_path, expected_size = _atlas_page_files[number]
+    page = None
+    try:
+        image = pygame.image.load(page_path)
+        if tuple(image.get_size()) != expected_size:
+            raise pygame.error(f"размер {image.get_size()} не совпадает с индексом {expected_size}")
+        page = image.convert_alpha()
+    except (pygame.error, FileNotFoundError) as e:
+        logger.warning("Страница атласа %s недоступна: %s. Используются отдельные файлы.", page_path, e)
+    _atlas_pages[number] = page
+    return page
+
+
+def _load_from_atlas(path):
+    """Возвращает subsurface спрайта path из атласа или None, если его там нет."""
+    if _atlas_sprites is None:
+        _read_atlas_index()
+    entry = _atlas_sprites.get(_normalize_path(path))
+    if entry is None:
+        return None
+    page_number, rect = entry
+    page = _atlas_page(page_number)
+    if page is None:
+        return None
+    try:
+        return page.subsurface(rect)
+    except ValueError as e:  # Прямоугольник за пределами страницы
+        logger.warning("Спрайт %s вне страницы атласа: %s. Загружается из файла.", path, e)
+        return None
+
+
+def _load_from_disk(path, alpha):
+    """Декодирует файл и приводит его к формату экрана."""
+    if path in _failures:
+        raise pygame.error(_failures[path])
+    try:
+        image = pygame.image.load(path)
+    except (pygame.error, FileNotFoundError) as e:
+        _failures[path] = str(e)
+        raise pygame.error(str(e)) from e
+    return image.convert_alpha() if alpha else image.convert()
+
+
+def load_image(path, size=None, alpha=True):
+    """Возвращает общую поверхность для path, масштабированную до size (w, h).
+
+    alpha=True - поверхность с альфа-каналом (convert_alpha), иначе convert().
+    Возвращаемую поверхность изменять нельзя. Возбуждает pygame.error, если
+    файл не удалось загрузить.
+    """
+    global _hits, _misses
+    with _lock:
+        size = tuple(size) if size is not None else None
+        key = (path, size, alpha)
+        surface = _surfaces.get(key)
+        if surface is not None:
+            _hits += 1
+            return surface
+        _misses += 1
+
+        original_key = (path, None, alpha)
+        original = _surfaces.get(original_key)
+        if original is None:
+            # Атлас содержит только спрайты с альфа-каналом
+            if alpha:
+                original = _load_from_atlas(path)
+            if original is None:
+                original = _load_from_disk(path, alpha)
+                logger.debug("Изображение загружено в кэш: %s", path)
+            _surfaces[original_key] = original
+        if size is None:
+            return original
+        surface = pygame.transform.scale(original, size)
+        _surfaces[key] = surface
+        return surface
+
+
+def load_image_copy(path, size=None, alpha=True):
+    """Как load_image(), но возвращает собственную копию, которую можно изменять."""
+    return load_image(path, size, alpha).copy()
+
+
+def load_variant(path, size, variant, build, alpha=True):
+    """Возвращает общую поверхность-вариант изображения path размера size.
+
+    variant - хешируемый идентификатор варианта (например, цвет оттенка);
+    build(surface) вызывается один раз на ключ (путь, размер, флаги, вариант) с
+    собственной копией load_image(path, size, alpha) и возвращает готовый вариант.
+    """
+    global _hits, _misses
+    with _lock:
+        size = tuple(size) if size is not None else None
+        key = (path, size, alpha, variant)
+        surface = _surfaces.get(key)
+        if surface is not None:
+            _hits += 1
+            return surface
+        _misses += 1
+        surface = build(load_image_copy(path, size, alpha))
+        _surfaces[key] = surface
+        return surface
+
+
+def cache_info():
+    """Статистика кэша: попадания, промахи, число поверхностей и неудачных файлов."""
+    with _lock:
+        return {
+            "hits": _hits,
+            "misses": _misses,
+            "surfaces": len(_surfaces),
+            "failures": len(_failures),
+            "atlas_pages": sum(1 for page in _atlas_pages.values() if page is not None),
+        }
+
+
+def clear():
+    """Очищает кэш (например, в тестах, подменяющих pygame.image.load).
+
+    Индекс и страницы атласа будут прочитаны заново при следующей загрузке.
+    """
+    global _hits, _misses, _atlas_sprites
+    with _lock:
+        _surfaces.clear()
+        _failures.clear()
+        _atlas_pages.clear()
+        _atlas_sprites = None
+        _hits = 0
+        _misses = 0
@@ -6,9 +6,10 @@ class PowerUp(Sprite):
     """Класс для представления бонуса (power-up) в игре."""
 
 
-import os  # Для проверки существования файла
 import logging  # Для логирования ошибок загрузки
 
+from alien_invasion import image_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,7 +49,7 @@ class PowerUp(Sprite):
             logger.warning(
                 f"Неизвестный тип бонуса '{self.powerup_type}'. Будет использован fallback."
             )
-            self.speed = 0.5  # Медленная скорость по умолчанию для неизвестных типов
+            self.speed = 150.0  # Медленная скорость по умолчанию для неизвестных типов (пикселей в секунду)
 
         # Загрузка изображения или создание fallback поверхности
         target_size = (
@@ -56,22 +57,17 @@ class PowerUp(Sprite):
             self.settings.powerup_display_height,
         )
 
-        if image_path and os.path.exists(image_path):
+        self.image = None
+        if image_path:
             try:
-                self.image = pygame.image.load(image_path).convert_alpha()
-                self.image = pygame.transform.scale(self.image, target_size)
+                # Общая поверхность из image_cache: бонус ее не изменяет, поэтому без копии.
+                self.image = image_cache.load_image(image_path, target_size)
             except pygame.error as e:
                 logger.warning(
                     f"Не удалось загрузить изображение бонуса '{image_path}': {e}. Используется fallback."
                 )
-                self.image = pygame.Surface(target_size)
-                self.image.fill(fallback_color)
-        else:
-            if image_path:  # Путь был указан, но файл не найден
-                logger.warning(
-                    f"Файл изображения бонуса не найден: '{image_path}'. Используется fallback."
-                )
-            # Если image_path не был определен (неизвестный тип бонуса) или файл не существует
+        if self.image is None:
+            # Если image_path не был определен (неизвестный тип бонуса) или файл не загрузился
             self.image = pygame.Surface(target_size)
             self.image.fill(fallback_color)
 
@@ -83,9 +79,9 @@ class PowerUp(Sprite):
         # Сохранение точной вертикальной позиции
         self.y = float(self.rect.y)
 
-    def update(self):
-        """Перемещает бонус вниз по экрану."""
-        self.y += self.speed
+    def update(self, dt):
+        """Перемещает бонус вниз по экрану (dt - длительность шага в секундах)."""
+        self.y += self.speed * dt
         self.rect.y = self.y
 
         # Удаление бонуса, если он вышел за нижний край экрана
@@ -0,0 +1,88 @@
+"""Фоновая загрузка ассетов, пока на экране главное меню.
+
+AssetPreloader выполняет список задач (имя, функция без аргументов) в отдельном
+потоке. Задачи - это чтение и декодирование файлов (pygame.image.load,
+pygame.mixer.Sound), которые большую часть времени проводят в C-коде SDL без
+GIL, поэтому главный поток продолжает рисовать меню. Результаты задач
+собираются в словарь results; ошибки задач не прерывают загрузку остальных
+ассетов и сохраняются в errors, а вызывающий код использует свои обычные
+fallback-пути.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AssetPreloader:
+    """Выполняет задачи загрузки ассетов в фоновом потоке и сообщает о прогрессе."""
+
+    def __init__(self, tasks):
+        self._tasks = list(tasks)  # [(имя, функция), ...]
+        self.results = {}  # имя -> результат функции
+        self.errors = {}  # имя -> исключение
+        self.elapsed_s = None  # Длительность загрузки, когда она завершена
+        self._completed = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+
+    @property
+    def total(self):
+        return len(self._tasks)
+
+    @property
+    def completed(self):
+        with self._lock:
+            return self._completed
+
+    @property
+    def progress(self):
+        """Доля выполненных задач от 0.0 до 1.0."""
+        if not self._tasks:
+            return 1.0
+        return self.completed / len(self._tasks)
+
+    def start(self):
+        """Запускает фоновый поток загрузки (поток-демон не мешает выходу из игры)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="asset-preloader", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """Выполняет все задачи в текущем потоке (без фоновой загрузки)."""
+        if self._thread is None:
+            self._run()
+
+    def _run(self):
+        started = time.perf_counter()
+        for name, task in self._tasks:
+            try:
+                result = task()
+            except Exception as e:  # Ошибка одного ассета не должна останавливать загрузку остальных
+                # Сообщение об ошибке выводит код, который использует ассет (и его fallback)
+                logger.debug("Фоновая загрузка ассета %s не удалась: %s", name, e)
+                result = None
+                self.errors[name] = e
+            with self._lock:
+                self.results[name] = result
+                self._completed += 1
+        self.elapsed_s = time.perf_counter() - started
+        logger.info(
+            "Фоновая загрузка ассетов завершена: %d задач за %.1f мс.",
+            len(self._tasks),
+            self.elapsed_s * 1000,
+        )
+        self._done.set()
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Ждет завершения загрузки; возвращает True, если она завершена."""
+        if self._thread is None:
+            self.run()
+        return self._done.wait(timeout)
@@ -0,0 +1,299 @@
+"""Профилирование игрового процесса под cProfile.
+
+Прогоняет сценарную или записанную (реплей) игровую сессию на N кадров или
+N секунд и сохраняет:
+    profile.pstats    - статистика cProfile (pstats, snakeviz и т.п.);
+    profile.collapsed - "свернутые" стеки для flamegraph.pl / speedscope;
+    summary.txt       - параметры прогона, время кадра (avg/p95/p99) и топ функций.
+
+Кадр - это шаги симуляции, приходящиеся на один кадр отрисовки
+(settings.sim_tick_rate / settings.render_fps_limit), и, с --render, отрисовка.
+В режиме выборки (--sample-every K) профилировщик включается только на каждый
+K-й кадр: накладные расходы cProfile меньше искажают остальные кадры.
+
+Примеры:
+    python -m alien_invasion.profiling --frames 3000
+    python -m alien_invasion.profiling --seconds 20 --render --sample-every 10
+    python -m alien_invasion.profiling --replay session.airp --output-dir prof
+"""
+
+import argparse
+import cProfile
+import io
+import logging
+import os
+import pstats
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_OUTPUT_DIR = "profiling_results"
+_DEFAULT_FRAMES = 3000
+_SUMMARY_TOP_FUNCTIONS = 30
+_COLLAPSED_MAX_DEPTH = 64
+_COLLAPSED_MIN_US = 1  # Ветви короче микросекунды в flamegraph не попадают
+_US_PER_SECOND = 1_000_000
+_MS_PER_SECOND = 1000
+# Сценарий ввода: корабль ходит от края к краю и стреляет каждые несколько шагов.
+_SCRIPT_SWEEP_TICKS = 240
+_SCRIPT_FIRE_EVERY_TICKS = 6
+
+
+def scripted_actions(tick):
+    """Детерминированный ввод сценарной сессии для шага tick."""
+    moving_right = (tick // _SCRIPT_SWEEP_TICKS) % 2 == 0
+    return {
+        "left": not moving_right,
+        "right": moving_right,
+        "fire": tick % _SCRIPT_FIRE_EVERY_TICKS == 0,
+    }
+
+
+def _function_label(func):
+    """Подпись функции pstats для свернутого стека (без ';', недопустимого в формате)."""
+    filename, line, name = func
+    if filename == "~":  # Встроенные функции
+        label = name
+    else:
+        label = f"{os.path.basename(filename)}:{name}:{line}"
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(stats):
+    """Строит свернутые стеки {"a;b;c": микросекунды} по графу вызовов pstats.
+
+    cProfile хранит только пары вызывающий -> вызываемый, поэтому время функции,
+    вызываемой из нескольких мест, делится между путями пропорционально
+    кумулятивному времени каждого ребра (как в flameprof).
+    """
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge
+
+    stacks = defaultdict(int)
+
+    def walk(func, path, funcs_on_path, fraction):
+        _, _, self_time, cumulative_time, _ = stats[func]
+        path = path + (_function_label(func),)
+        self_us = int(self_time * fraction * _US_PER_SECOND)
+        if self_us >= _COLLAPSED_MIN_US:
+            stacks[";".join(path)] += self_us
+        if len(path) >= _COLLAPSED_MAX_DEPTH:
+            return
+        funcs_on_path = funcs_on_path | {func}
+        for child, edge in callees.get(func, {}).items():
+            if child in funcs_on_path or child not in stats:
+                continue  # Рекурсия: время уже учтено выше по стеку
+            child_cumulative = stats[child][3]
+            edge_cumulative = edge[3] * fraction
+            if (
+                child_cumulative <= 0
+                or edge_cumulative * _US_PER_SECOND < _COLLAPSED_MIN_US
+            ):
+                continue
+            walk(
+                child,
+                path,
+                funcs_on_path,
+                min(1.0, edge_cumulative / child_cumulative),
+            )
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(func, (), frozenset(), 1.0)
+    return dict(stacks)
+
+
+class ProfileSession:
+    """Игровая сессия для профилирования: сценарный ввод или реплей."""
+
+    def __init__(self, game, replay=None, render=False):
+        self.game = game
+        self.render = render
+        self.player = None
+        self.window_closed = False  # Окно (--render) закрыто пользователем
+        if replay is not None:
+            from alien_invasion.replay import ReplayPlayer
+
+            self.player = ReplayPlayer(game, replay)
+            game.reset(seed=replay.seed)
+        else:
+            game.reset(seed=game.seed)
+        self.tick = 0
+        settings = game.settings
+        self.ticks_per_frame = max(
+            1, settings.sim_tick_rate // max(1, settings.render_fps_limit)
+        )
+
+    @property
+    def finished(self):
+        """Сессия закончилась (реплей воспроизведен полностью или окно закрыто)."""
+        if self.window_closed:
+            return True
+        return self.player is not None and self.player.ticks_played >= len(
+            self.player.replay
+        )
+
+    def pump_events(self):
+        """С отрисовкой в окно обрабатывает события окна: иначе ОС считает его зависшим.
+
+        Закрытие окна заканчивает сессию.
+        """
+        if not self.render:
+            return
+        import pygame
+
+        pygame.event.pump()
+        if pygame.event.get(pygame.QUIT):
+            self.window_closed = True
+
+    def run_frame(self):
+        """Выполняет один кадр: шаги симуляции и, при необходимости, отрисовку."""
+        game = self.game
+        for _ in range(self.ticks_per_frame):
+            if self.player is not None:
+                if self.finished:
+                    break
+                self.player._play_tick()
+            else:
+                game.step(scripted_actions(self.tick))
+                if game.game_state == game.STATE_GAME_OVER:
+                    game.reset()  # Сценарная сессия продолжается новой игрой
+            self.tick += 1
+        if self.render:
+            game._update_screen()
+
+
+def profile_session(session, frames=None, seconds=None, sample_every=1):
+    """Прогоняет сессию под cProfile.
+
+    Возвращает (profiler, frame_times_s, profiled_frames). При sample_every > 1 в
+    frame_times_s попадают только кадры без профилировщика - их время не искажено
+    накладными расходами cProfile.
+    """
+    profiler = cProfile.Profile()
+    frame_times = []
+    profiled_frames = 0
+    started = time.perf_counter()
+    frame = 0
+    while not session.finished:
+        if frames is not None and frame >= frames:
+            break
+        if seconds is not None and time.perf_counter() - started >= seconds:
+            break
+        sampled = frame % sample_every == 0
+        frame_start = time.perf_counter()
+        if sampled:
+            profiler.enable()
+        session.run_frame()
+        if sampled:
+            profiler.disable()
+            profiled_frames += 1
+        if not sampled or sample_every == 1:
+            frame_times.append(time.perf_counter() - frame_start)
+        # События окна обрабатываются вне профилировщика и замера времени кадра
+        session.pump_events()
+        frame += 1
+    return profiler, frame_times, profiled_frames
+
+
+def write_results(profiler, frame_times, output_dir, run_info):
+    """Сохраняет pstats, свернутые стеки и текстовую сводку в output_dir."""
+    from alien_invasion.frame_timing import percentile
+
+    os.makedirs(output_dir, exist_ok=True)
+    pstats_path = os.path.join(output_dir, "profile.pstats")
+    collapsed_path = os.path.join(output_dir, "profile.collapsed")
+    summary_path = os.path.join(output_dir, "summary.txt")
+
+    profiler.dump_stats(pstats_path)
+    stats = pstats.Stats(profiler)
+
+    stacks = collapsed_stacks(stats.stats)
+    with open(collapsed_path, "w") as f:
+        for stack, weight in sorted(stacks.items()):
+            f.write(f"{stack} {weight}\n")
+
+    sorted_times = sorted(frame_times)
+    total_s = sum(frame_times)
+    lines = [f"{key}: {value}" for key, value in run_info.items()]
+    lines.append(f"timed_frames: {len(frame_times)}")
+    lines.append(f"timed_wall_time_s: {total_s:.3f}")
+    if frame_times:
+        lines.append(
+            "frame_ms avg/p95/p99/max: "
+            f"{total_s / len(frame_times) * _MS_PER_SECOND:.3f} / "
+            f"{percentile(sorted_times, 0.95) * _MS_PER_SECOND:.3f} / "
+            f"{percentile(sorted_times, 0.99) * _MS_PER_SECOND:.3f} / "
+            f"{sorted_times[-1] * _MS_PER_SECOND:.3f}"
+        )
+    for sort_key in ("cumulative", "tottime"):
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(sort_key).print_stats(
+            _SUMMARY_TOP_FUNCTIONS
+        )
+        lines.append("")
+        lines.append(f"--- top {_SUMMARY_TOP_FUNCTIONS} by {sort_key} ---")
+        lines.append(stream.getvalue().strip())
+    summary = "\n".join(lines) + "\n"
+    with open(summary_path, "w") as f:
+        f.write(summary)
+    return summary
+
+
+def main(argv=None):
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description="Профилирование Alien Invasion под cProfile")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument("--frames", type=int, help=f"Число кадров (по умолчанию {_DEFAULT_FRAMES})")
+    limit.add_argument("--seconds", type=float, help="Длительность прогона в секундах")
+    parser.add_argument("--replay", metavar="PATH", help="Профилировать воспроизведение реплея вместо сценария")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно сценарной сессии")
+    parser.add_argument("--render", action="store_true", help="Отрисовывать кадры (в окне)")
+    parser.add_argument(
+        "--sample-every",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Профилировать только каждый K-й кадр (по умолчанию - все кадры)",
+    )
+    parser.add_argument("--output-dir", default=_DEFAULT_OUTPUT_DIR, help="Каталог для результатов")
+    args = parser.parse_args(argv)
+    if args.sample_every < 1:
+        parser.error("--sample-every должен быть не меньше 1")
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    from alien_invasion.alien_invasion import AlienInvasion
+    from alien_invasion.replay import Replay
+
+    replay = Replay.load(args.replay) if args.replay else None
+    frames = args.frames
+    if frames is None and args.seconds is None:
+        frames = _DEFAULT_FRAMES
+
+    # Скриптовые игры профилирования (в том числе с --render) не записывают рекорд игрока
+    game = AlienInvasion(headless=not args.render, seed=args.seed, persist_high_score=False)
+    session = ProfileSession(game, replay=replay, render=args.render)
+    profiler, frame_times, profiled_frames = profile_session(
+        session, frames=frames, seconds=args.seconds, sample_every=args.sample_every
+    )
+    run_info = {
+        "session": f"replay {args.replay}" if replay else f"scripted, seed {args.seed}",
+        "render": args.render,
+        "ticks_per_frame": session.ticks_per_frame,
+        "sample_every": args.sample_every,
+        "profiled_frames": profiled_frames,
+    }
+    summary = write_results(profiler, frame_times, args.output_dir, run_info)
+    print("\n".join(summary.splitlines()[: len(run_info) + 3]))
+    print(f"Результаты профилирования сохранены в {args.output_dir}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Запись и воспроизведение ввода игрока (реплеи).
+
+Реплей хранит зерно генератора случайных чисел и состояние ввода на каждом шаге
+симуляции: удерживаемое движение влево/вправо, пауза и число выстрелов с прошлого шага.
+Поскольку игра детерминирована при фиксированном зерне (см. AlienInvasion.rng), этого
+достаточно, чтобы в точности повторить игровую сессию: быстро и без отрисовки (для
+замеров производительности) или в реальном времени с отрисовкой.
+
+Формат файла (little-endian):
+    заголовок: магическая строка b"AIRP", версия (uint8), зерно (int64),
+               частота симуляции (uint16), число шагов (uint32);
+    данные:    серии (длина серии uint16, байт ввода uint8) - ввод обычно
+               удерживается много шагов подряд, поэтому серии дают компактный файл.
+
+Воспроизведение:
+    python -m alien_invasion.replay session.airp             # максимальная скорость, без окна
+    python -m alien_invasion.replay session.airp --realtime  # реальное время с отрисовкой
+"""
+
+import argparse
+import logging
+import struct
+import sys
+import time
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"AIRP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBqHI")
+_RUN = struct.Struct("<HB")
+_MAX_RUN_LENGTH = 0xFFFF
+
+# Биты байта ввода одного шага симуляции.
+INPUT_LEFT = 0x01
+INPUT_RIGHT = 0x02
+INPUT_PAUSED = 0x04
+_FIRE_SHIFT = 3  # Старшие 5 бит - число выстрелов с прошлого шага
+_MAX_FIRE_COUNT = 0xFF >> _FIRE_SHIFT
+
+
+def encode_input(left, right, paused, fire_count):
+    """Упаковывает состояние ввода одного шага в байт."""
+    value = min(fire_count, _MAX_FIRE_COUNT) << _FIRE_SHIFT
+    if left:
+        value |= INPUT_LEFT
+    if right:
+        value |= INPUT_RIGHT
+    if paused:
+        value |= INPUT_PAUSED
+    return value
+
+
+def decode_input(value):
+    """Распаковывает байт ввода в кортеж (left, right, paused, fire_count)."""
+    return (
+        bool(value & INPUT_LEFT),
+        bool(value & INPUT_RIGHT),
+        bool(value & INPUT_PAUSED),
+        value >> _FIRE_SHIFT,
+    )
+
+
+class Replay:
+    """Записанная игровая сессия: зерно, частота симуляции и ввод по шагам."""
+
+    def __init__(self, seed, sim_tick_rate, inputs=None):
+        self.seed = seed
+        self.sim_tick_rate = sim_tick_rate
+        self.inputs = bytearray(inputs or b"")
+
+    def save(self, path):
+        """Сохраняет реплей в бинарный файл."""
+        chunks = [
+            _HEADER.pack(_MAGIC, _VERSION, self.seed, self.sim_tick_rate, len(self.inputs))
+        ]
+        run_value = None
+        run_length = 0
+        for value in self.inputs:
+            if value == run_value and run_length < _MAX_RUN_LENGTH:
+                run_length += 1
+                continue
+            if run_length:
+                chunks.append(_RUN.pack(run_length, run_value))
+            run_value = value
+            run_length = 1
+        if run_length:
+            chunks.append(_RUN.pack(run_length, run_value))
+        with open(path, "wb") as f:
+            f.write(b"".join(chunks))
+
+    @classmethod
+    def load(cls, path):
+        """Загружает реплей из файла. Поднимает ValueError для неверного формата."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"Файл реплея слишком короткий: {path}")
+        magic, version, seed, sim_tick_rate, tick_count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError(f"Файл не является реплеем Alien Invasion: {path}")
+        if version != _VERSION:
+            raise ValueError(f"Неподдерживаемая версия реплея {version}: {path}")
+
+        inputs = bytearray()
+        for run_length, value in _RUN.iter_unpack(data[_HEADER.size :]):
+            inputs.extend(bytes((value,)) * run_length)
+        if len(inputs) != tick_count:
+            raise ValueError(
+                f"Реплей поврежден: ожидалось {tick_count} шагов, прочитано {len(inputs)}."
+            )
+        return cls(seed, sim_tick_rate, inputs)
+
+    def __len__(self):
+        return len(self.inputs)
+
+
+class ReplayRecorder:
+    """Записывает ввод игрока по шагам симуляции и сохраняет реплей в файл."""
+
+    def __init__(self, path):
+        self.path = path
+        self.replay = None
+        self._pending_fire_count = 0
+
+    @property
+    def recording(self):
+        return self.replay is not None
+
+    def start(self, seed, sim_tick_rate):
+        """Начинает новую запись (предыдущая незавершенная запись сохраняется)."""
+        self.stop()
+        self.replay = Replay(seed, sim_tick_rate)
+        self._pending_fire_count = 0
+        logger.info("Запись реплея в %s (зерно %d).", self.path, seed)
+
+    def record_fire(self):
+        """Отмечает выстрел; он попадет в запись ближайшего шага симуляции."""
+        if self.recording:
+            self._pending_fire_count += 1
+
+    def record_tick(self, moving_left, moving_right, paused):
+        """Записывает ввод, действующий на очередном шаге симуляции."""
+        fire_count = self._pending_fire_count
+        # Выстрелы сверх лимита байта переносятся на следующие шаги.
+        self._pending_fire_count = max(0, fire_count - _MAX_FIRE_COUNT)
+        self.replay.inputs.append(
+            encode_input(moving_left, moving_right, paused, fire_count)
+        )
+
+    def stop(self):
+        """Завершает запись и сохраняет файл реплея."""
+        if not self.recording:
+            return
+        replay, self.replay = self.replay, None
+        try:
+            replay.save(self.path)
+            logger.info("Реплей сохранен: %s (%d шагов).", self.path, len(replay))
+        except OSError as e:
+            logger.error("Не удалось сохранить реплей %s: %s", self.path, e)
+
+
+class ReplayPlayer:
+    """Воспроизводит реплей в экземпляре AlienInvasion."""
+
+    def __init__(self, game, replay):
+        if replay.sim_tick_rate != game.settings.sim_tick_rate:
+            raise ValueError(
+                f"Реплей записан с частотой симуляции {replay.sim_tick_rate} Гц, "
+                f"а игра работает на {game.settings.sim_tick_rate} Гц."
+            )
+        self.game = game
+        self.replay = replay
+        self.ticks_played = 0
+
+    def _play_tick(self):
+        """Применяет ввод очередного шага и выполняет шаг симуляции."""
+        game = self.game
+        left, right, paused, fire_count = decode_input(
+            self.replay.inputs[self.ticks_played]
+        )
+        if game.game_state in (game.STATE_PLAYING, game.STATE_PAUSED):
+            game.game_state = game.STATE_PAUSED if paused else game.STATE_PLAYING
+        game.ship.moving_left = left
+        game.ship.moving_right = right
+        for _ in range(fire_count):
+            game._fire_bullet()
+        game._update_simulation(game.sim_dt)
+        self.ticks_played += 1
+
+    def play(self, realtime=False):
+        """Воспроизводит реплей с начала и возвращает итоговое состояние игры.
+
+        realtime=False - с максимальной скоростью без отрисовки;
+        realtime=True - в реальном времени с отрисовкой (закрытие окна прерывает показ).
+        """
+        game = self.game
+        game.reset(seed=self.replay.seed)
+        self.ticks_played = 0
+        total_ticks = len(self.replay)
+
+        if not realtime:
+            while self.ticks_played < total_ticks:
+                self._play_tick()
+            return game.get_state()
+
+        while self.ticks_played < total_ticks:
+            frame_time_s = game.clock.tick(game.settings.render_fps_limit) / 1000
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return game.get_state()
+            game.sim_accumulator += frame_time_s
+            while game.sim_accumulator >= game.sim_dt and self.ticks_played < total_ticks:
+                self._play_tick()
+                game.sim_accumulator -= game.sim_dt
+            game._update_screen()
+        return game.get_state()
+
+
+def main():
+    """Воспроизводит файл реплея из командной строки."""
+    parser = argparse.ArgumentParser(description="Воспроизведение реплея Alien Invasion")
+    parser.add_argument("path", help="Файл реплея")
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Воспроизводить в реальном времени с отрисовкой (по умолчанию - максимальная скорость без окна)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    from alien_invasion.alien_invasion import AlienInvasion
+
+    replay = Replay.load(args.path)
+    # Воспроизведение не должно менять рекорд игрока, в том числе с --realtime
+    game = AlienInvasion(
+        headless=not args.realtime, seed=replay.seed, persist_high_score=False
+    )
+    player = ReplayPlayer(game, replay)
+
+    start = time.perf_counter()
+    state = player.play(realtime=args.realtime)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Воспроизведено {player.ticks_played} шагов за {elapsed:.2f} с "
+        f"({player.ticks_played / elapsed if elapsed else 0:.0f} шагов/с). "
+        f"Счет: {state['score']}, уровень: {state['level']}, состояние: {state['game_state']}."
+    )
+    pygame.quit()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,22 @@ import pygame  # Added import
 import logging
 from pygame.sprite import Group
 from alien_invasion.ship import Ship
+from alien_invasion import image_cache
+from alien_invasion.glyph_atlas import GlyphAtlas, TextBuffer
 
 # Constants for Scoreboard layout and appearance
 _UI_ICON_SIZE = (32, 32)  # Standard size for UI icons like hearts, stars
 _SCORE_FRAME_PADDING = 15  # Padding inside the score frame to the text
 # _LIVES_ICON_TEXT_SPACING = 5 # Space between lives heart icon and 'xN' text - Удалено, так как текст xN не используется
 _LIVES_ICON_SPACING = 5  # Пространство между иконками жизней
+# Строка, под которую заранее выделяются буферы счета и рекорда
+_SCORE_BUFFER_SAMPLE = "0,000,000,000"
+
+# Поля HUD, которые игровой код отмечает измененными через Scoreboard.mark_changed()
+HUD_SCORE = "score"
+HUD_HIGH_SCORE = "high_score"
+HUD_LEVEL = "level"
+HUD_SHIPS = "ships"
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +53,8 @@ class Scoreboard:
             heart_icon_path = self.settings.ui_heart_icon_path
             if os.path.exists(heart_icon_path):
                 try:
-                    loaded_heart_icon = pygame.image.load(heart_icon_path).convert_alpha()
-                    self.heart_icon = pygame.transform.scale(loaded_heart_icon, _UI_ICON_SIZE)
+                    # Общая поверхность из image_cache (атлас или файл)
+                    self.heart_icon = image_cache.load_image(heart_icon_path, _UI_ICON_SIZE)
                 except pygame.error as e_load_heart: # Catch error if load or scale fails
                     logger.warning("Failed to load/scale heart icon %s: %s. Fallback will be used.", heart_icon_path, e_load_heart)
                     self.heart_icon = None # Ensure it's None if loading/scaling failed
@@ -71,9 +81,8 @@ class Scoreboard:
         try:
             frame_bg_path = self.settings.ui_score_frame_bg_path
             if os.path.exists(frame_bg_path):
-                self.original_score_frame_bg = pygame.image.load(
-                    frame_bg_path
-                ).convert_alpha()
+                # Общая поверхность из image_cache; масштабируется в _prep_score_frame
+                self.original_score_frame_bg = image_cache.load_image(frame_bg_path)
                 self.frame_loaded_successfully = True
                 logger.info(
                     "UI asset loaded: Score frame background '%s'.", frame_bg_path
@@ -92,6 +101,13 @@ class Scoreboard:
             )
             # self.frame_loaded_successfully остается False
 
+        # Русский комментарий: Атлас глифов для счета, рекорда и уровня (см. glyph_atlas.py)
+        self._score_text = None
+        self._high_score_text = None
+        self._level_text = None
+        self._changed_rects = []  # Области экрана, содержимое которых обновилось с прошлого show_score()
+        self._prep_text_buffers()
+
         # Подготовка изображений счетов. Эти методы создадут score_rect, high_score_rect и т.д.
         self.prep_score()
         self.prep_high_score()
@@ -102,6 +118,15 @@ class Scoreboard:
         # Этот метод вызывается после prep_score и prep_level, чтобы их rect были доступны.
         self._prep_score_frame()
 
+        # Русский комментарий: Весь HUD собирается в одну поверхность и выводится одним blit.
+        # Игровой код только отмечает измененные поля (mark_changed), а пересборка
+        # выполняется один раз перед отрисовкой кадра (update).
+        self._dirty_fields = set()
+        self.hud_image = None
+        self.hud_rect = None
+        self._hud_canvas = None
+        self._rebuild_hud()
+
     def _prep_score_frame(self):
         """Подготавливает фон (рамку) для отображения счета и уровня."""
         if not (self.frame_loaded_successfully and self.original_score_frame_bg):
@@ -189,6 +214,38 @@ class Scoreboard:
             )
             self.frame_loaded_successfully = False
 
+    def _prep_text_buffers(self):
+        """Готовит атласы глифов и буферы для счета, рекорда и уровня.
+
+        Если шрифт не дает настоящих поверхностей (моки в тестах) или атлас не
+        удалось построить, буферы остаются None и текст рендерится шрифтом.
+        """
+        label = self.settings.text_high_score_label
+        try:
+            # Русский комментарий: Счет рисуется поверх рамки (прозрачный фон), рекорд и уровень - на фоне игры
+            opaque_atlas = GlyphAtlas(
+                self.font, self.text_color, self.settings.bg_color, labels=(label,)
+            )
+            if self.frame_loaded_successfully:
+                score_atlas = GlyphAtlas(self.font, self.text_color)
+            else:
+                score_atlas = opaque_atlas
+        except (TypeError, pygame.error) as e:
+            logger.debug("Glyph atlas unavailable, scoreboard text uses font.render(): %s", e)
+            return
+        self._score_text = TextBuffer(score_atlas, _SCORE_BUFFER_SAMPLE)
+        self._high_score_text = TextBuffer(opaque_atlas, _SCORE_BUFFER_SAMPLE, label)
+        self._level_text = TextBuffer(opaque_atlas, "000")
+
+    def _render_text(self, buffer, text, background, prefix=""):
+        """Изображение строки prefix + text: из атласа глифов или, если нельзя, шрифтом."""
+        if buffer is not None and buffer.atlas.can_compose(text, prefix):
+            return buffer.render(text, prefix)
+        image = self.font.render(prefix + text, True, self.text_color, background)
+        if background is None:
+            return image.convert_alpha()
+        return image.convert()
+
     def prep_score(self):
         """Преобразует текущий счет в графическое изображение"""
         rounded_score = round(self.stats.score, -1)
@@ -201,24 +258,20 @@ class Scoreboard:
         padding_x = self.settings.score_padding_right
         padding_y = self.settings.score_padding_top
 
-        temp_score_image = self.font.render(
-            score_str, True, self.text_color, text_bg_color
-        )
-        if text_bg_color is None:
-            self.score_image = temp_score_image.convert_alpha()
-        else:
-            self.score_image = temp_score_image.convert()
+        self.score_image = self._render_text(self._score_text, score_str, text_bg_color)
 
         # Вывод счета в правой верхней части экрана
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - padding_x
         self.score_rect.top = padding_y
+        self._changed_rects.append(self.score_rect)
+        self._hud_stale = True
         # self._prep_score_frame()  # Обновляем рамку после изменения счета - вызов перенесен в конец __init__
 
     def prep_high_score(self):
         """Преобразует рекордный счет в графическое изображение"""
         high_score = round(self.stats.high_score, -1)
-        high_score_str = f"{self.settings.text_high_score_label}{high_score:,}"
+        high_score_str = f"{high_score:,}"
 
         # Русский комментарий: Фон текста рекорда делаем прозрачным, если рамка будет общая (пока не используется для рекорда).
         # Если рамка отдельная для рекорда или ее нет, используем цвет фона игры.
@@ -226,29 +279,34 @@ class Scoreboard:
         # Оставляем фон для рекорда, т.к. рамка его не покрывает
         text_bg_color_high = self.settings.bg_color
 
-        temp_high_score_image = self.font.render(
-            high_score_str, True, self.text_color, text_bg_color_high
+        self.high_score_image = self._render_text(
+            self._high_score_text,
+            high_score_str,
+            text_bg_color_high,
+            prefix=self.settings.text_high_score_label,
         )
-        self.high_score_image = temp_high_score_image.convert()
 
         # Рекорд выравнивается по центру верхней стороны
         self.high_score_rect = self.high_score_image.get_rect()
         self.high_score_rect.centerx = self.screen_rect.centerx
         # Используем общий отступ сверху
         self.high_score_rect.top = self.settings.score_padding_top
+        self._changed_rects.append(self.high_score_rect)
+        self._hud_stale = True
 
     def prep_level(self):
         """Преобразует уровень в графическое изображение"""
         level_str = str(self.stats.level)
-        temp_level_image = self.font.render(
-            level_str, True, self.text_color, self.settings.bg_color
+        self.level_image = self._render_text(
+            self._level_text, level_str, self.settings.bg_color
         )
-        self.level_image = temp_level_image.convert()
 
         # Уровень выводится под текущим счетом
         self.level_rect = self.level_image.get_rect()
         self.level_rect.right = self.score_rect.right
         self.level_rect.top = self.score_rect.bottom + self.settings.level_score_spacing
+        self._changed_rects.append(self.level_rect)
+        self._hud_stale = True
         # self._prep_score_frame()  # Обновляем рамку после изменения уровня - вызов перенесен в конец __init__
 
     def prep_ships(self):
@@ -291,33 +349,196 @@ class Scoreboard:
                 )
                 ship.rect.y = self.settings.lives_display_padding_top
                 self.ships_group_fallback.add(ship)
+        self._hud_stale = True
 
     def check_high_score(self):
-        """Проверяет появился ли новый рекорд"""
+        """Проверяет появился ли новый рекорд (изображение рекорда обновит update())"""
         if self.stats.score > self.stats.high_score:
             self.stats.high_score = self.stats.score
-            self.prep_high_score()
+            self.mark_changed(HUD_HIGH_SCORE)
             self.stats._save_high_score()  # Сохраняем новый рекорд
 
-    def show_score(self):
-        """Выводит текущий счет, рекорд и число оставшихся кораблей"""
+    def mark_changed(self, *fields):
+        """Отмечает поля HUD (HUD_SCORE, HUD_HIGH_SCORE, HUD_LEVEL, HUD_SHIPS) измененными.
+
+        Сколько бы раз поле ни отмечалось за кадр, его изображение строится один
+        раз - в update() перед отрисовкой.
+        """
+        self._dirty_fields.update(fields)
+
+    def _field_rect(self, field):
+        """Область экрана, которую занимает поле HUD (None, если поле пустое)."""
+        if field == HUD_SCORE:
+            return self.score_rect
+        if field == HUD_HIGH_SCORE:
+            return self.high_score_rect
+        if field == HUD_LEVEL:
+            return self.level_rect
+        rects = [item["rect"] for item in self.life_icons_to_draw]
+        rects.extend(ship.rect for ship in self.ships_group_fallback)
+        if not rects:
+            return None
+        bounds = rects[0]
+        for rect in rects[1:]:
+            bounds = bounds.union(rect)
+        return bounds
+
+    def update(self):
+        """Перестраивает отмеченные поля и общий HUD; возвращает True, если что-то изменилось."""
+        fields = self._dirty_fields
+        if not fields:
+            # Поля, перестроенные прямым вызовом prep_*(), тоже попадают в HUD
+            if self._hud_stale:
+                self._rebuild_hud()
+                return True
+            return False
+        # Старые области полей тоже нужно перерисовать: новый текст может быть уже
+        changed = [self._field_rect(field) for field in fields]
+        if self.scaled_score_frame_bg is not None and (HUD_SCORE in fields or HUD_LEVEL in fields):
+            changed.append(self.score_frame_rect)
+        # Копии: _refit_score_frame() сдвигает score_frame_rect на месте
+        changed = [rect.copy() for rect in changed if rect is not None]
+        if HUD_SCORE in fields:
+            self.prep_score()
+        if HUD_HIGH_SCORE in fields:
+            self.prep_high_score()
+        if HUD_LEVEL in fields or HUD_SCORE in fields:
+            # Уровень выровнен по правому краю счета
+            self.prep_level()
+        if HUD_SHIPS in fields:
+            self.prep_ships()
+        if HUD_SCORE in fields or HUD_LEVEL in fields:
+            self._refit_score_frame()
+            changed.append(self.score_frame_rect)
+        changed.extend(self._field_rect(field) for field in fields)
+        changed = [rect for rect in changed if rect is not None]
+        self._changed_rects.extend(changed)
+        fields.clear()
+        self._rebuild_hud(changed)
+        return True
+
+    def _refit_score_frame(self):
+        """Пересчитывает рамку, если блок счета и уровня изменил размер (а не при каждом очке)."""
+        if self.scaled_score_frame_bg is None:
+            return
+        text_rect = self.score_rect.union(self.level_rect)
+        frame_size = (
+            text_rect.width + 2 * _SCORE_FRAME_PADDING,
+            text_rect.height + 2 * _SCORE_FRAME_PADDING,
+        )
+        if tuple(self.score_frame_rect.size) != frame_size:
+            self._prep_score_frame()
+        else:
+            self.score_frame_rect.center = text_rect.center
+
+    def _hud_items(self):
+        """Изображения HUD и их места на экране в порядке отрисовки."""
+        items = []
+        if (
+            self.frame_loaded_successfully
+            and self.scaled_score_frame_bg
+            and self.score_frame_rect
+        ):
+            items.append((self.scaled_score_frame_bg, self.score_frame_rect))
+        items.append((self.score_image, self.score_rect))
+        items.append((self.high_score_image, self.high_score_rect))
+        items.append((self.level_image, self.level_rect))
+        if self.heart_icon and self.life_icons_to_draw:
+            items.extend((item["image"], item["rect"]) for item in self.life_icons_to_draw)
+        elif not self.heart_icon:
+            items.extend((ship.image, ship.rect) for ship in self.ships_group_fallback)
+        return items
+
+    def _rebuild_hud(self, regions=None):
+        """Собирает рамку, счет, рекорд, уровень и жизни в одну поверхность hud_image.
+
+        regions - области экрана, которые изменились; если HUD не сдвинулся и не
+        изменил размер, перерисовываются только они, иначе HUD собирается целиком.
+        Поверхность переиспользуется, пока размер HUD не меняется. Если собрать HUD
+        нельзя (например, изображения - моки в тестах), hud_image остается None и
+        show_score() рисует элементы по отдельности.
+        """
+        self._hud_stale = False
+        items = self._hud_items()
+        try:
+            rects = [pygame.Rect(rect) for _, rect in items]
+            bounds = rects[0].unionall(rects[1:])
+            if self.hud_image is None or self.hud_image.get_size() != bounds.size:
+                self._hud_canvas = pygame.Surface(bounds.size, pygame.SRCALPHA).convert_alpha()
+                self.hud_image = self._hud_canvas.copy()
+                regions = None
+            if regions is None or bounds != self.hud_rect:
+                local_regions = [self._hud_canvas.get_rect()]
+            else:
+                # Пересекающиеся области (старое и новое место текста, рамка) объединяются
+                local_regions = []
+                for region in regions:
+                    region = pygame.Rect(region).move(-bounds.x, -bounds.y)
+                    index = region.collidelist(local_regions)
+                    while index != -1:
+                        region.union_ip(local_regions.pop(index))
+                        index = region.collidelist(local_regions)
+                    local_regions.append(region.clip(self._hud_canvas.get_rect()))
+            # HUD почти весь прозрачный и меняется редко: RLE-кодирование (заново после
+            # каждой пересборки) делает ежекадровый blit на порядок дешевле. SDL
+            # перекодирует RLE-поверхность после каждой записи в нее, поэтому на время
+            # сборки RLE снимается (кодирование произойдет при следующем blit)
+            self.hud_image.set_alpha(255, 0)
+            # Сборка идет на холсте без RLE: в RLE-поверхность SDL смешивает полупрозрачные
+            # пиксели рамки с пустым фоном вместо копирования. В hud_image холст копируется
+            # через BLEND_RGBA_MAX по нулевому фону - это точная копия
+            canvas = self._hud_canvas
+            for region in local_regions:
+                if not (region.width and region.height):
+                    continue
+                canvas.set_clip(region)
+                canvas.fill((0, 0, 0, 0), region)
+                for (image, _), rect in zip(items, rects):
+                    canvas.blit(image, (rect.x - bounds.x, rect.y - bounds.y))
+                self.hud_image.fill((0, 0, 0, 0), region)
+                self.hud_image.blit(canvas, region, region, pygame.BLEND_RGBA_MAX)
+            canvas.set_clip(None)
+            self.hud_image.set_alpha(255, pygame.RLEACCEL)
+        except (TypeError, pygame.error) as e:
+            logger.debug("HUD is drawn element by element: %s", e)
+            self.hud_image = None
+            self.hud_rect = None
+            return
+        if self.hud_rect is not None and self.hud_rect != bounds:
+            self._changed_rects.append(self.hud_rect)
+        self.hud_rect = bounds
+
+    def show_score(self, surface=None):
+        """Выводит текущий счет, рекорд и число оставшихся кораблей (на экран или на surface)"""
+        target = surface if surface is not None else self.screen
+        self.update()
+        if self._changed_rects:
+            # Русский комментарий: hud_image и изображения из TextBuffer - те же объекты с новыми
+            # пикселями, поэтому DirtyRectRenderer узнает об изменениях только через mark_dirty()
+            mark_dirty = getattr(target, "mark_dirty", None)
+            if mark_dirty is not None:
+                mark_dirty(self._changed_rects)
+            self._changed_rects = []
+        if self.hud_image is not None:
+            target.blit(self.hud_image, self.hud_rect)
+            return
         # Русский комментарий: Отрисовка предварительно смасштабированной рамки счета, если она успешно загружена и подготовлена
         if (
             self.frame_loaded_successfully
             and self.scaled_score_frame_bg
             and self.score_frame_rect
         ):
-            self.screen.blit(self.scaled_score_frame_bg, self.score_frame_rect)
+            target.blit(self.scaled_score_frame_bg, self.score_frame_rect)
         # Русский комментарий: Текстовые элементы счета, рекорда и уровня рисуются поверх рамки (или без нее)
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
+        target.blit(self.score_image, self.score_rect)
+        target.blit(self.high_score_image, self.high_score_rect)
+        target.blit(self.level_image, self.level_rect)
 
         # Русский комментарий: Отображение жизней
         if self.heart_icon and self.life_icons_to_draw:
             for item in self.life_icons_to_draw:
-                self.screen.blit(item["image"], item["rect"])
+                target.blit(item["image"], item["rect"])
         elif not self.heart_icon and hasattr(
             self, "ships_group_fallback"
         ):  # Используем старую систему с кораблями, если иконки нет
-            self.ships_group_fallback.draw(self.screen)
+            self.ships_group_fallback.draw(target)
@@ -2,6 +2,8 @@ import os
 import math  # Импортируем модуль math для математических операций
 import logging
 
+from alien_invasion.asset_manifest import get_manifest
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,14 +44,43 @@ class Settings:
         self.screen_height = 800
         self.bg_color = (230, 230, 230)
 
+        # Фон: "particles" - звездное поле из отдельных звезд, "layers" - заранее отрисованные
+        # слои с параллаксом (несколько blit'ов за кадр при любом числе звезд), см. starfield.py
+        self.background_mode = "particles"
+        self.starfield_stars_per_layer = 150  # Звезд в ближнем слое (в дальнем - вдвое меньше)
+        # Базовый слой режима "layers"; используется, только если изображение не меньше экрана
+        self.background_base_image_path = os.path.join(
+            self._ASSETS_DIR, "gfx", "backgrounds", "background01.png"
+        )
+        self.background_base_speed = 7.5  # Скорость прокрутки базового слоя, пикселей в секунду
+
+        # Параметры игрового цикла (фиксированный шаг симуляции).
+        # Все скорости ниже задаются в пикселях в секунду и умножаются на длительность шага.
+        self.sim_tick_rate = 120  # Частота шагов симуляции (тиков в секунду)
+        self.render_fps_limit = 60  # Ограничение частоты отрисовки (0 - без ограничения)
+        # Максимум шагов симуляции за один кадр (защита от "спирали смерти" на медленных машинах)
+        self.max_catchup_ticks = 5
+
+        # Отрисовка по "грязным" прямоугольникам (alien_invasion/dirty_rects.py): на экран
+        # выводятся только изменившиеся области, статичный кадр не перерисовывается.
+        self.dirty_rect_rendering = True
+        # Доля площади экрана, после которой кадр рисуется и выводится целиком (flip)
+        self.dirty_rect_full_redraw_threshold = 0.35
+        self.dirty_rect_max_rects = 400  # Больше прямоугольников за кадр - полная перерисовка
+
+        # Замер времени фаз кадра (F3 - оверлей avg/p95/p99, F4 - выгрузка буфера в CSV)
+        self.frame_timing_buffer_frames = 600  # Размер кольцевого буфера (кадров)
+        self.frame_timing_overlay_refresh_ms = 500  # Период пересчета таблицы оверлея
+        self.frame_timing_csv_path = "frame_timing.csv"
+
         # Настройки корабля
-        self.ship_speed = 1.5
+        self.ship_speed = 450.0  # пикселей в секунду
         self.ship_limit = 3
         self.ship_display_width = 64  # Ширина корабля для отображения
         self.ship_display_height = 64  # Высота корабля для отображения
 
         # Параметры снаряда
-        self.bullet_speed = 1.5
+        self.bullet_speed = 450.0  # пикселей в секунду
         self.bullet_width = 3
         self.bullet_height = 15
         self.bullet_color = (255, 0, 0)  # Ярко-красный
@@ -60,13 +91,13 @@ class Settings:
         self.alien_display_height = 50  # Высота пришельца для отображения
         # self.alien_speed = 1.0 # Заменено на alien_speed_current, min_alien_speed, max_alien_speed
         # Минимальная скорость пришельцев (начальная)
-        self.min_alien_speed = 0.5
+        self.min_alien_speed = 150.0  # пикселей в секунду
         # Текущая скорость пришельцев, изменяется динамически
         self.alien_speed_current = self.min_alien_speed
-        self.alien_speed_max = 3.0  # Максимальная скорость пришельцев
+        self.alien_speed_max = 900.0  # Максимальная скорость пришельцев (пикселей в секунду)
         # Целевой счет для достижения максимальной скорости пришельцев
         self.target_score_for_max_speed = 50000
-        self.fleet_drop_speed = 10
+        self.fleet_drop_speed = 10  # пикселей за одно снижение флота (не скорость в секунду)
 
         # Темп ускорения игры
         self.speedup_scale = 1.15  # Уменьшен для более плавной прогрессии
@@ -74,7 +105,14 @@ class Settings:
         self.score_scale = 1.5
 
         # Game behavior settings
-        self.ship_hit_pause_duration = 0.5
+        self.ship_hit_pause_duration = 0.5  # Пауза после потери жизни (секунды времени симуляции)
+        # True - headless-прогоны (боты, прогоны баланса) продолжают раунд сразу после
+        # потери жизни. По умолчанию выключено: реплей, записанный в окне, воспроизводится
+        # в headless-режиме с теми же паузами.
+        self.headless_skip_respawn_pause = False
+        # Сторона ячейки сетки для поиска столкновений (alien_invasion/spatial_hash.py), пиксели.
+        # Порядка размера пришельца: пуля проверяется только с пришельцами своих ячеек.
+        self.collision_grid_cell_size = 64
 
         # Fleet layout settings
         self.fleet_screen_margin_x_factor = 2.0
@@ -96,6 +134,13 @@ class Settings:
 
         # Хранение рекорда
         self.highscore_filepath = os.path.join(_SETTINGS_DIR, "highscore.json")
+        # Новый рекорд записывается в фоне не чаще раза в столько секунд
+        # (и сразу - при окончании игры и выходе)
+        self.highscore_save_delay_s = 2.0
+        # False - рекорд не читается из файла и не записывается в него. AlienInvasion
+        # выключает хранение в headless-режиме: боты, реплеи и профилирование не
+        # должны трогать рекорд игрока.
+        self.highscore_persist = True
 
         # Scoreboard settings
         self.scoreboard_text_color = (30, 30, 30)
@@ -121,6 +166,15 @@ class Settings:
         self.button_font_size = 48
         self.button_font_name = None
 
+        # Индикатор фоновой загрузки ассетов под кнопками главного меню
+        self.preload_bar_width = 300
+        self.preload_bar_height = 8
+        self.preload_bar_spacing_y = 30  # Отступ от кнопки "Выход"
+        self.preload_bar_color = (0, 255, 0)
+        self.preload_bar_border_color = (255, 255, 255)
+        self.preload_text_font_size = 24
+        self.text_preload_message = "Загрузка ресурсов: {}%"
+
         # Настройки меню
         # self.menu_new_game_button_text = "Новая игра" # Заменено общими локализуемыми строками
         # self.menu_exit_button_text = "Выход" # Заменено общими локализуемыми строками
@@ -220,6 +274,9 @@ class Settings:
             "outer_space_loop.ogg",
         )
         self.music_volume = 0.5  # Громкость музыки по умолчанию (0.0 до 1.0)
+        # Кэш звуков, декодированных в формат микшера (см. alien_invasion/audio_cache.py).
+        # None - декодировать звуки при каждом запуске.
+        self.audio_cache_dir = os.path.join(_SETTINGS_DIR, "..", ".cache", "audio")
 
         self.initialize_dynamic_settings(self.current_level_number)
 
@@ -235,23 +292,23 @@ class Settings:
         if level_number < 6:
             # Старая логика для уровней 1-5
             # Скорость пришельцев: базовая + прирост за уровень, с ограничением сверху
-            base_speed = 0.3  # Начальная скорость на уровне 1
+            base_speed = 90.0  # Начальная скорость на уровне 1 (пикселей в секунду)
             # Прирост 3% от базовой скорости за каждый уровень после первого
             speed_step_per_level = base_speed * 0.03
             # Рассчитанная скорость для текущего уровня
             current_speed = base_speed + (level_number - 1) * speed_step_per_level
             max_speed_cap_old_logic = (
-                1.5  # Максимальная скорость пришельцев по старой логике
+                450.0  # Максимальная скорость пришельцев по старой логике
             )
-            # Возвращаем минимальное значение между рассчитанной скоростью и старым капом (1.5),
+            # Возвращаем минимальное значение между рассчитанной скоростью и старым капом (450.0),
             # но также не превышая глобальный максимум self.alien_speed_max
             return min(current_speed, max_speed_cap_old_logic, self.alien_speed_max)
         else:
             # Новая логика для уровней 6 и выше
             # Рассчитываем скорость для уровня 5 по старой формуле как базовую
-            level_5_base_speed = 0.3  # Базовая скорость на уровне 1
+            level_5_base_speed = 90.0  # Базовая скорость на уровне 1
             level_5_speed_step = level_5_base_speed * 0.03
-            # Скорость на уровне 5: 0.3 + 4 * 0.009 = 0.336
+            # Скорость на уровне 5: 90.0 + 4 * 2.7 = 100.8
             level_5_speed = level_5_base_speed + (5 - 1) * level_5_speed_step
 
             # Рассчитываем множитель скорости, который увеличивается каждые 5 уровней
@@ -265,7 +322,7 @@ class Settings:
             # Рассчитываем новую скорость путем умножения скорости 5-го уровня на множитель
             calculated_speed = level_5_speed * speed_multiplier
 
-            # Итоговая скорость ограничивается глобальным максимальным значением self.alien_speed_max (3.0)
+            # Итоговая скорость ограничивается глобальным максимальным значением self.alien_speed_max (900.0)
             # Русский комментарий: Итоговая скорость пришельцев.
             return min(calculated_speed, self.alien_speed_max)
 
@@ -482,15 +539,15 @@ class Settings:
         # Сброс общих настроек скорости корабля и снарядов.
         # Эти параметры могут быть сделаны зависимыми от уровня, если потребуется в будущем,
         # но пока они остаются фиксированными или изменяются через другие механизмы (например, `increase_speed`).
-        self.ship_speed = 1.5
-        self.bullet_speed = 1.5
+        self.ship_speed = 450.0
+        self.bullet_speed = 450.0
 
         # Настройки пришельцев из данных уровня, полученных из level_config
         # Минимальная/начальная скорость пришельцев для уровня
         self.min_alien_speed = level_config["min_alien_speed"]
         # Текущая скорость пришельцев (может меняться в течении уровня DDA)
         self.alien_speed_current = self.min_alien_speed
-        # Коэффициент увеличения скорости (для DDA)
+        # Коэффициент увеличения скорости (для DDA), пикселей в секунду за секунду
         self.alien_speed_increase_rate = level_config["alien_speed_increase_rate"]
         # Максимальная скорость на данном уровне (для DDA)
         self.alien_speed_max_level = level_config["alien_speed_max_level"]
@@ -553,6 +610,11 @@ class Settings:
         # Направление сбрасывается на каждом уровне или при инициализации.
         self.fleet_direction = 1
 
+        # Наличие файлов проверяется по манифесту ассетов (он сверяется с диском один раз
+        # за процесс и сам предупреждает об отсутствующих файлах), поэтому смена уровня
+        # не обращается к файловой системе.
+        manifest = get_manifest()
+
         # Пути к спрайтам пришельцев
         self.alien_sprite_paths = []
         base_alien_gfx_path = os.path.join(
@@ -563,11 +625,8 @@ class Settings:
         ):  # Загружаем все 24 спрайта alien_ship_01.png ... alien_ship_24.png
             # Например, alien_ship_01.png
             path = os.path.join(base_alien_gfx_path, f"alien_ship_{i:02d}.png")
-            if os.path.exists(path):
+            if manifest.exists(path):
                 self.alien_sprite_paths.append(path)
-            else:
-                # Русский комментарий: Предупреждение о ненайденном спрайте пришельца.
-                logger.warning("Ассет не найден: спрайт пришельца - %s", path)
 
         if not self.alien_sprite_paths:
             # Русский комментарий: Критическая ошибка, если не загружено ни одного спрайта пришельца.
@@ -579,7 +638,7 @@ class Settings:
             fallback_alien_path = os.path.join(
                 self._ASSETS_DIR, "gfx", "ships", "aliens", "alien_ship_01.png"
             )
-            if os.path.exists(fallback_alien_path):
+            if manifest.exists(fallback_alien_path):
                 self.alien_sprite_paths.append(fallback_alien_path)
             else:
                 # Этот else маловероятен, если структура ассетов корректна, но для полноты:
@@ -610,11 +669,8 @@ class Settings:
         ]
         for p_file in planet_files:
             path = os.path.join(base_planet_gfx_path, p_file)
-            if os.path.exists(path):
+            if manifest.exists(path):
                 self.planet_sprite_paths.append(path)
-            else:
-                # Русский комментарий: Предупреждение о ненайденном спрайте планеты/галактики.
-                logger.warning("Ассет не найден: спрайт планеты/галактики - %s", path)
 
         if not self.planet_sprite_paths:
             # Русский комментарий: Информация об отсутствии загруженных спрайтов планет/галактик.
@@ -3,6 +3,8 @@ from pygame.sprite import Sprite
 import sys
 import logging
 
+from alien_invasion import image_cache
+
 logger = logging.getLogger(__name__)
 
 # Constants for ship fallback visuals and effects
@@ -23,12 +25,16 @@ class Ship(Sprite):
         self.screen = ai_game.screen
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
+        # Источник времени для длительности эффектов: время симуляции игры, если оно доступно.
+        self.get_ticks = getattr(ai_game, "get_sim_ticks", None)
 
         # Загрузка изображения корабля и получение его rect
+        display_size = (self.settings.ship_display_width, self.settings.ship_display_height)
         try:
-            self.original_image = pygame.image.load(
-                self.settings.ship_image_path
-            ).convert_alpha()
+            # Общая поверхность из image_cache (атлас или файл): ниже с нее только снимаются копии.
+            self.original_image = image_cache.load_image(
+                self.settings.ship_image_path, display_size
+            )
         except pygame.error as e:
             logger.warning(
                 "Не удалось загрузить спрайт корабля: %s - %s. Using fallback.",
@@ -38,11 +44,7 @@ class Ship(Sprite):
             # Загружаем простой прямоугольник как fallback
             self.original_image = pygame.Surface(_FALLBACK_SHIP_SIZE)
             self.original_image.fill(_FALLBACK_SHIP_COLOR)  # Синий прямоугольник
-
-        self.original_image = pygame.transform.scale(
-            self.original_image,
-            (self.settings.ship_display_width, self.settings.ship_display_height),
-        )
+            self.original_image = pygame.transform.scale(self.original_image, display_size)
 
         # Создаем варианты спрайта
         self.image_normal = self.original_image
@@ -69,15 +71,18 @@ class Ship(Sprite):
         self.double_fire_active = False
         self.double_fire_activation_time = 0
 
-    def update(self):
-        """Обновляет позицию корабля с учетом флагов"""
+    def update(self, dt):
+        """Обновляет позицию корабля с учетом флагов.
+
+        dt - длительность шага симуляции в секундах.
+        """
         self._check_effects_duration()
 
         # Обновляется атрибут х, не rect
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         # Обновление атрибута rect на основании self.x
         self.rect.x = self.x
@@ -85,11 +90,12 @@ class Ship(Sprite):
         # Русский комментарий: Обновление визуального состояния корабля
         self.update_visual_state()
 
-    def blitme(self):
+    def blitme(self, surface=None):
         """Рисует корабль в текущей позиции, используя актуальный спрайт (self.image),
         который может меняться в зависимости от активных эффектов (щит, двойной выстрел).
+        surface - куда рисовать (по умолчанию - экран).
         """
-        self.screen.blit(self.image, self.rect)
+        (surface if surface is not None else self.screen).blit(self.image, self.rect)
         # Старая отрисовка щита как отдельного прямоугольника удалена,
         # так как теперь щит - это вариант спрайта self.image_shielded.
 
@@ -136,18 +142,24 @@ class Ship(Sprite):
     def activate_shield(self):
         # Русский комментарий: Активирует щит.
         self.shield_active = True
-        self.shield_activation_time = pygame.time.get_ticks()
+        self.shield_activation_time = self._current_ticks()
         logger.debug("Щит активирован на корабле")
 
     def activate_double_fire(self):
         # Русский комментарий: Активирует двойной выстрел.
         self.double_fire_active = True
-        self.double_fire_activation_time = pygame.time.get_ticks()
+        self.double_fire_activation_time = self._current_ticks()
         logger.debug("Двойной выстрел активирован на корабле")
 
+    def _current_ticks(self):
+        # Русский комментарий: Текущее время в мс - время симуляции игры или, если его нет, системное время pygame.
+        if self.get_ticks is not None:
+            return self.get_ticks()
+        return pygame.time.get_ticks()
+
     def _check_effects_duration(self):
         # Русский комментарий: Проверяет длительность активных эффектов.
-        current_time = pygame.time.get_ticks()
+        current_time = self._current_ticks()
         if (
             self.shield_active
             and current_time - self.shield_activation_time
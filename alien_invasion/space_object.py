@@ -2,17 +2,32 @@ import pygame
 import random
 import math  # Добавлено для math.copysign
 
+from alien_invasion import image_cache
+
 # Русский комментарий: Диапазон коэффициентов для размера планет (относительно меньшей стороны экрана)
 # Позволяет планетам быть значительно крупнее и частично за экраном.
 _TARGET_SIZE_RATIO_RANGE = (0.15, 0.6)  # Пример: от 15% до 60% меньшей стороны экрана
-# Русский комментарий: Диапазон скоростей для медленного дрейфа (пикселей в кадр)
-_DRIFT_SPEED_RANGE = (0.05, 0.20)
+# Русский комментарий: Диапазон скоростей для медленного дрейфа (пикселей в секунду)
+_DRIFT_SPEED_RANGE = (15.0, 60.0)
 
 
 class SpaceObject(pygame.sprite.Sprite):
     # Русский комментарий: Класс для представления процедурно появляющихся планет или галактик.
-    def __init__(self, screen_width, screen_height, image_path, fade_duration_ms=3000):
+    def __init__(
+        self,
+        screen_width,
+        screen_height,
+        image_path,
+        fade_duration_ms=3000,
+        get_ticks=None,
+        rng=None,
+    ):
         super().__init__()
+        # Позиция, размер и скорость объекта берутся из rng игры, чтобы прогоны повторялись.
+        self.rng = rng or random
+        # Источник времени для fade-in/out (например, время симуляции игры).
+        # Если не задан, используется pygame.time.get_ticks.
+        self.get_ticks = get_ticks
 
         self.screen_width = screen_width
         self.screen_height = screen_height
@@ -21,7 +36,8 @@ class SpaceObject(pygame.sprite.Sprite):
         self.fade_duration_ms = fade_duration_ms
 
         try:
-            self.original_image = pygame.image.load(image_path).convert_alpha()
+            # Общая поверхность из image_cache: ниже она только масштабируется, но не изменяется.
+            self.original_image = image_cache.load_image(image_path)
         except pygame.error as e:
             print(
                 f"WARNING: Failed to load space object image: {image_path} - {e}. Using fallback."
@@ -47,7 +63,7 @@ class SpaceObject(pygame.sprite.Sprite):
         # Масштабирование изображения
         # Размер теперь относительно меньшей стороны экрана для лучшей адаптивности
         min_screen_dimension = min(self.screen_width, self.screen_height)
-        target_ratio = random.uniform(
+        target_ratio = self.rng.uniform(
             _TARGET_SIZE_RATIO_RANGE[0], _TARGET_SIZE_RATIO_RANGE[1]
         )
 
@@ -88,56 +104,62 @@ class SpaceObject(pygame.sprite.Sprite):
         self.alpha = 0  # Начальная прозрачность (полностью прозрачен)
         self.image.set_alpha(self.alpha)
         self.state = "fade_in"  # 'fade_in', 'visible', 'fade_out'
-        self.creation_time = pygame.time.get_ticks()  # Для fade-in/out
+        self.creation_time = self._current_ticks()  # Для fade-in/out
         self.visible_start_time = 0  # Для отслеживания времени в состоянии 'visible' (пока не используется для логики fade_out)
 
     def _set_initial_position_and_velocity(self):
         """Устанавливает начальную позицию за пределами экрана и случайную диагональную скорость."""
         self.dx = 0 # Initialize dx
         self.dy = 0 # Initialize dy
-        side = random.choice(["top", "bottom", "left", "right"])
-        speed_magnitude = random.uniform(_DRIFT_SPEED_RANGE[0], _DRIFT_SPEED_RANGE[1])
+        side = self.rng.choice(["top", "bottom", "left", "right"])
+        speed_magnitude = self.rng.uniform(_DRIFT_SPEED_RANGE[0], _DRIFT_SPEED_RANGE[1])
 
         # Задаем начальные координаты так, чтобы объект был полностью за экраном
         if side == "top":
-            self.rect.centerx = random.randint(0, self.screen_width)
+            self.rect.centerx = self.rng.randint(0, self.screen_width)
             self.rect.bottom = -self.rect.height // 2  # Половина высоты над экраном
-            self.dx = random.uniform(
+            self.dx = self.rng.uniform(
                 -speed_magnitude, speed_magnitude
             )  # Может двигаться влево или вправо
             self.dy = speed_magnitude  # Движется вниз
         elif side == "bottom":
-            self.rect.centerx = random.randint(0, self.screen_width)
+            self.rect.centerx = self.rng.randint(0, self.screen_width)
             self.rect.top = self.screen_height + self.rect.height // 2
-            self.dx = random.uniform(-speed_magnitude, speed_magnitude)
+            self.dx = self.rng.uniform(-speed_magnitude, speed_magnitude)
             self.dy = -speed_magnitude  # Движется вверх
         elif side == "left":
             self.rect.right = -self.rect.width // 2
-            self.rect.centery = random.randint(0, self.screen_height)
+            self.rect.centery = self.rng.randint(0, self.screen_height)
             self.dx = speed_magnitude  # Движется вправо
-            self.dy = random.uniform(
+            self.dy = self.rng.uniform(
                 -speed_magnitude, speed_magnitude
             )  # Может двигаться вверх или вниз
         elif side == "right":
             self.rect.left = self.screen_width + self.rect.width // 2
-            self.rect.centery = random.randint(0, self.screen_height)
+            self.rect.centery = self.rng.randint(0, self.screen_height)
             self.dx = -speed_magnitude  # Движется влево
-            self.dy = random.uniform(-speed_magnitude, speed_magnitude)
+            self.dy = self.rng.uniform(-speed_magnitude, speed_magnitude)
 
         # Убедимся, что объект не стоит на месте (хотя с uniform это маловероятно для обоих dx и dy)
         if self.dx == 0 and self.dy == 0:
             self.dx = (
-                speed_magnitude if random.choice([True, False]) else -speed_magnitude
+                speed_magnitude if self.rng.choice([True, False]) else -speed_magnitude
             )
             self.dy = (
-                speed_magnitude if random.choice([True, False]) else -speed_magnitude
+                speed_magnitude if self.rng.choice([True, False]) else -speed_magnitude
             )
             if self.dx == 0 and self.dy == 0:  # Если все еще нули (крайне маловероятно)
                 self.dy = speed_magnitude  # Просто двигаем вниз
 
+    def _current_ticks(self):
+        """Возвращает текущее время в миллисекундах из заданного источника времени."""
+        if self.get_ticks is not None:
+            return self.get_ticks()
+        return pygame.time.get_ticks()
+
     def _update_fade_state(self):
         """Обновляет состояние прозрачности (fade-in/out)."""
-        current_time = pygame.time.get_ticks()
+        current_time = self._current_ticks()
         time_elapsed = current_time - self.creation_time
 
         if self.state == "fade_in":
@@ -158,13 +180,13 @@ class SpaceObject(pygame.sprite.Sprite):
         self.alpha = min(max(0, self.alpha), 255)
         self.image.set_alpha(self.alpha)
 
-    def update(self):
+    def update(self, dt):
         # Обновление состояния прозрачности
         self._update_fade_state()
 
-        # Движение
-        self.x += self.dx
-        self.y += self.dy
+        # Движение (dx, dy в пикселях в секунду, dt - длительность шага в секундах)
+        self.x += self.dx * dt
+        self.y += self.dy * dt
         self.rect.x = int(self.x)
         self.rect.y = int(self.y)
 
@@ -214,6 +236,6 @@ class SpaceObject(pygame.sprite.Sprite):
         ):  # Начинаем fade-out только если объект был полностью видим
             self.state = "fade_out"
             self.creation_time = (
-                pygame.time.get_ticks()
+                self._current_ticks()
             )  # Сбрасываем таймер для fade-out
             # print(f"SpaceObject starting fade_out at ({self.rect.x}, {self.rect.y})") # Для отладки
@@ -0,0 +1,92 @@
+"""Равномерная сетка (spatial hash) для быстрого поиска пересечений прямоугольников.
+
+pygame.sprite.groupcollide() и spritecollide() сравнивают прямоугольник с
+каждым спрайтом группы: при b пулях и a пришельцах это b * a вызовов
+colliderect() в Python. SpatialHash раскладывает прямоугольники по ячейкам
+сетки со стороной cell_size, и запрос проверяет только объекты из ячеек,
+которые накрывает прямоугольник запроса.
+
+Результат запроса точный: кандидаты из ячеек проверяются тем же
+Rect.colliderect(), что и в pygame, поэтому находится ровно то же, что нашел
+бы полный перебор. Прямоугольник запроса попадает и в ячейки, которых он
+только касается правым или нижним краем, - так в кандидаты гарантированно
+попадают все объекты, которые пересекает colliderect().
+"""
+
+import pygame
+
+
+class SpatialHash:
+    """Объекты с прямоугольниками, разложенные по ячейкам равномерной сетки."""
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError(f"Размер ячейки должен быть положительным, получено {cell_size}")
+        self.cell_size = cell_size
+        self._cells = {}  # (столбец, строка) -> {объект: None} (dict - быстрое удаление)
+        self._items = {}  # Объект -> (Rect, список его ячеек)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def clear(self):
+        """Удаляет все объекты."""
+        self._cells.clear()
+        self._items.clear()
+
+    def insert(self, item, rect):
+        """Добавляет объект item с прямоугольником rect (или заменяет его прямоугольник)."""
+        if item in self._items:
+            self.remove(item)
+        rect = pygame.Rect(rect)
+        cells = self._cells_for(rect)
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                bucket = self._cells[cell] = {}
+            bucket[item] = None
+        self._items[item] = (rect, cells)
+
+    def remove(self, item):
+        """Удаляет объект; отсутствующий объект игнорируется."""
+        entry = self._items.pop(item, None)
+        if entry is None:
+            return
+        for cell in entry[1]:
+            bucket = self._cells[cell]
+            del bucket[item]
+            if not bucket:
+                del self._cells[cell]
+
+    def query(self, rect):
+        """Возвращает множество объектов, чьи прямоугольники пересекают rect (Rect.colliderect)."""
+        cells = self._cells
+        items = self._items
+        colliderect = rect.colliderect
+        size = self.cell_size
+        found = set()
+        # Объект в нескольких ячейках проверяется повторно, но результат - множество
+        for col in range(rect.left // size, rect.right // size + 1):
+            for row in range(rect.top // size, rect.bottom // size + 1):
+                bucket = cells.get((col, row))
+                if bucket:
+                    for item in bucket:
+                        if colliderect(items[item][0]):
+                            found.add(item)
+        return found
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        # Правая и нижняя границы включаются: касание края тоже дает кандидата
+        first_col = rect.left // size
+        last_col = rect.right // size
+        first_row = rect.top // size
+        last_row = rect.bottom // size
+        return [
+            (col, row)
+            for col in range(first_col, last_col + 1)
+            for row in range(first_row, last_row + 1)
+        ]
@@ -1,19 +1,43 @@
-import pygame
+import logging
 import random
 
+import numpy as np
+import pygame
+
+from alien_invasion import image_cache
+
+logger = logging.getLogger(__name__)
+
+# Режимы фона (settings.background_mode)
+BACKGROUND_PARTICLES = "particles"  # Звездное поле из отдельных звезд (Starfield)
+BACKGROUND_LAYERS = "layers"  # Заранее отрисованные слои с параллаксом (ParallaxStarfield)
+
 
 class Starfield:
     # Русский комментарий: Класс для создания и управления эффектом звездного неба с параллаксом.
-    def __init__(self, screen, screen_width, screen_height, num_stars_per_layer=150):
+    # Звезды хранятся в массивах NumPy (координаты, размер, слой), поэтому обновление и
+    # отрисовка выполняются несколькими векторными операциями независимо от числа звезд.
+
+    # Русский комментарий: True - фон меняет весь экран в каждом кадре, и учет "грязных"
+    # прямоугольников (alien_invasion/dirty_rects.py) не нужен. Отдельные звезды меняют лишь
+    # несколько пикселей, поэтому звездное поле перерисовывается по областям.
+    redraws_every_frame = False
+
+    def __init__(
+        self, screen, screen_width, screen_height, num_stars_per_layer=150, rng=None
+    ):
         self.screen = screen
+        # Источник случайности для позиций звезд (обычно ai_game.rng), иначе - модуль random.
+        self.rng = rng or random
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.num_stars_per_layer = num_stars_per_layer
 
         # Русский комментарий: Определение слоев. Каждый слой: (speed, color, size_range)
+        # Скорость слоя задается в пикселях в секунду.
         self.layers_config = [
             {
-                "speed": 0.05,
+                "speed": 15.0,
                 "color": (100, 100, 100),
                 "size_range": (
                     # Дальний слой (медленный, тусклый, мелкий)
@@ -23,7 +47,7 @@ class Starfield:
                 "num_stars": self.num_stars_per_layer // 2,
             },
             {
-                "speed": 0.10,
+                "speed": 30.0,
                 "color": (180, 180, 180),
                 "size_range": (
                     # Средний слой (быстрее, ярче, чуть крупнее)
@@ -34,52 +58,271 @@ class Starfield:
             },
         ]
 
-        self.layers = []
-        for config in self.layers_config:
-            stars = []
+        # Русский комментарий: Звезды всех слоев подряд (сначала дальний слой). Случайные
+        # числа берутся в том же порядке, что и при поштучном создании звезд, поэтому
+        # одно и то же зерно дает то же небо и ту же последовательность ai_game.rng.
+        xs, ys, sizes, layers = [], [], [], []
+        for layer_index, config in enumerate(self.layers_config):
             for _ in range(config["num_stars"]):
-                x = random.randrange(0, self.screen_width)
-                y = random.randrange(0, self.screen_height)
-                size = random.randint(config["size_range"][0], config["size_range"][1])
-                # Русский комментарий: Добавляем исходную y-координату для сброса при выходе за экран
-                stars.append(
-                    {
-                        "x": x,
-                        "y": y,
-                        "initial_y": y,
-                        "size": size,
-                        "speed": config["speed"],
-                        "color": config["color"],
-                    }
-                )
-            self.layers.append(stars)
-
-    def update(self):
-        # Русский комментарий: Обновляет позицию каждой звезды в каждом слое.
-        for layer_idx, stars_in_layer in enumerate(self.layers):
-            # Correctly get speed from config
-            layer_speed = self.layers_config[layer_idx]["speed"]
-            for star in stars_in_layer:
-                star["y"] += layer_speed  # Use layer_speed here
-                # Русский комментарий: Если звезда ушла за нижний край, переносим ее наверх со случайной X координатой.
-                if star["y"] > self.screen_height:
-                    star["y"] = 0  # Появляется сверху
-                    star["x"] = random.randrange(0, self.screen_width)
-
-    def draw(self):
-        # Русский комментарий: Отрисовывает все звезды всех слоев.
-        self.screen.fill((0, 0, 0))  # Черный фон космоса
-        for stars_in_layer in self.layers:
-            for star in stars_in_layer:
-                # Звезды рисуются как маленькие прямоугольники или круги
-                # pygame.draw.rect(self.screen, star['color'], (star['x'], star['y'], star['size'], star['size']))
-                # Для более "звездного" вида можно использовать круги или просто пиксели, если размер 1
-                if star["size"] == 1:
-                    self.screen.set_at((int(star["x"]), int(star["y"])), star["color"])
+                xs.append(self.rng.randrange(0, self.screen_width))
+                ys.append(self.rng.randrange(0, self.screen_height))
+                sizes.append(self.rng.randint(config["size_range"][0], config["size_range"][1]))
+                layers.append(layer_index)
+        self.x = np.array(xs, dtype=np.float64)
+        self.y = np.array(ys, dtype=np.float64)
+        self.size = np.array(sizes, dtype=np.intp)
+        self.layer = np.array(layers, dtype=np.intp)
+        self.speed = np.array(
+            [config["speed"] for config in self.layers_config], dtype=np.float64
+        )[self.layer]
+
+        # Русский комментарий: Группы звезд (слой, размер) в порядке отрисовки со "штампом" -
+        # смещениями пикселей звезды относительно ее центра.
+        self._stamp_groups = []
+        for layer_index, config in enumerate(self.layers_config):
+            for size in np.unique(self.size[self.layer == layer_index]):
+                indices = np.flatnonzero((self.layer == layer_index) & (self.size == size))
+                dx, dy = self._stamp_offsets(int(size))
+                self._stamp_groups.append((layer_index, config["color"], int(size), indices, dx, dy))
+
+        self._canvas = None  # Собственная поверхность неба для отрисовки через DirtyRectRenderer
+        self._drawn_x = None  # Целые координаты звезд на _canvas
+        self._drawn_y = None
+
+    @staticmethod
+    def _stamp_offsets(size):
+        # Русский комментарий: Звезда размера 1 - один пиксель; крупные звезды - круг радиуса size.
+        # Пиксели круга берутся из pygame.draw.circle, так что результат совпадает с ним.
+        if size == 1:
+            return np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.intp)
+        sprite = pygame.Surface((2 * size + 1, 2 * size + 1), 0, 32)
+        sprite.fill((0, 0, 0))
+        pygame.draw.circle(sprite, (255, 255, 255), (size, size), size)
+        dx, dy = np.nonzero(pygame.surfarray.array2d(sprite))
+        return (dx - size).astype(np.intp), (dy - size).astype(np.intp)
+
+    def update(self, dt):
+        # Русский комментарий: Обновляет позицию всех звезд (dt - длительность шага в секундах).
+        self.y += self.speed * dt
+        # Русский комментарий: Звезды, ушедшие за нижний край, переносятся наверх со случайной X координатой.
+        wrapped = np.flatnonzero(self.y > self.screen_height)
+        if wrapped.size:
+            self.y[wrapped] = 0  # Появляются сверху
+            for index in wrapped:
+                self.x[index] = self.rng.randrange(0, self.screen_width)
+
+    def _stamp(self, surface, star_x, star_y, layer=None):
+        # Русский комментарий: Рисует звезды прямо в пиксели поверхности (слой за слоем, ближний - поверх);
+        # layer - номер слоя, если нужны только его звезды.
+        width, height = surface.get_size()
+        pixels = pygame.surfarray.pixels2d(surface)  # Индексы [x, y]; блокирует поверхность
+        rows = pixels.T  # Индексы [y, x]; без выравнивания строк - непрерывный массив
+        flat = rows.reshape(-1) if rows.flags.c_contiguous else None
+        try:
+            for group_layer, color, size, indices, dx, dy in self._stamp_groups:
+                if layer is not None and group_layer != layer:
+                    continue
+                mapped = surface.map_rgb(color)
+                x = star_x[indices]
+                y = star_y[indices]
+                radius = size if size > 1 else 0
+                if flat is not None:
+                    # Звезды целиком внутри экрана пишутся по плоскому индексу без проверок границ
+                    inside = (x >= radius) & (x < width - radius) & (y >= radius) & (y < height - radius)
+                    base = y[inside] * width + x[inside]
+                    flat[(base[:, None] + (dy * width + dx)).ravel()] = mapped
+                    x = x[~inside]
+                    y = y[~inside]
+                px = (x[:, None] + dx).ravel()
+                py = (y[:, None] + dy).ravel()
+                visible = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[visible], py[visible]] = mapped
+        finally:
+            del pixels, rows, flat  # Снимает блокировку поверхности
+
+    def _draw_per_star(self, surface, star_x, star_y):
+        # Русский комментарий: Запасной путь для поверхностей без доступа к пикселям (например, 24 бита).
+        for _layer, color, size, indices, _dx, _dy in self._stamp_groups:
+            for index in indices:
+                position = (int(star_x[index]), int(star_y[index]))
+                if size == 1:
+                    surface.set_at(position, color)
                 else:
-                    pygame.draw.circle(
-                        self.screen,
-                        star["color"],
-                        (int(star["x"]), int(star["y"])),
-                        star["size"],
-                    )
+                    pygame.draw.circle(surface, color, position, size)
+
+    def _draw_to_recorder(self, target, star_x, star_y):
+        # Русский комментарий: Небо рисуется на собственную поверхность, которая выводится одним blit;
+        # рекордеру кадра (DirtyRectRenderer) сообщается только о звездах, сменивших пиксель.
+        if self._canvas is None:
+            self._canvas = pygame.Surface((self.screen_width, self.screen_height), 0, 32)
+            moved = None
+        else:
+            moved = np.flatnonzero((star_x != self._drawn_x) | (star_y != self._drawn_y))
+        if moved is None or moved.size:
+            # Русский комментарий: Поверхность неба перерисовывается, только если какая-то звезда сдвинулась.
+            self._canvas.fill((0, 0, 0))
+            self._stamp(self._canvas, star_x, star_y)
+        target.fill((0, 0, 0))
+        target.blit(self._canvas, (0, 0))
+
+        if moved is not None and moved.size:
+            rects = self._moved_star_rects(moved, star_x, star_y)
+            if len(rects) > target.max_dirty_rects:
+                target.invalidate()
+            else:
+                target.mark_dirty(rects)
+        self._drawn_x = star_x
+        self._drawn_y = star_y
+
+    def _moved_star_rects(self, moved, star_x, star_y):
+        # Русский комментарий: Области экрана, которые изменили звезды moved. Звезда, сдвинувшаяся
+        # вниз на пару пикселей, дает один прямоугольник со старым и новым местом; звезда,
+        # перенесенная наверх, - два отдельных.
+        radius = np.where(self.size[moved] == 1, 0, self.size[moved])
+        side = 2 * radius + 1
+        old_x, old_y = self._drawn_x[moved], self._drawn_y[moved]
+        new_x, new_y = star_x[moved], star_y[moved]
+        step = new_y - old_y
+        joined = (old_x == new_x) & (step >= 0) & (step <= side)
+        rects = [
+            pygame.Rect(x - r, y - r, s, s + dy)
+            for x, y, r, s, dy in zip(
+                old_x[joined].tolist(),
+                old_y[joined].tolist(),
+                radius[joined].tolist(),
+                side[joined].tolist(),
+                step[joined].tolist(),
+            )
+        ]
+        split = ~joined
+        for xs, ys in ((old_x[split], old_y[split]), (new_x[split], new_y[split])):
+            rects.extend(
+                pygame.Rect(x - r, y - r, s, s)
+                for x, y, r, s in zip(xs.tolist(), ys.tolist(), radius[split].tolist(), side[split].tolist())
+            )
+        return rects
+
+    def draw(self, surface=None):
+        # Русский комментарий: Отрисовывает все звезды всех слоев на surface (по умолчанию - на экран).
+        target = surface if surface is not None else self.screen
+        star_x = self.x.astype(np.intp)
+        star_y = self.y.astype(np.intp)
+        if not isinstance(target, pygame.Surface):
+            self._draw_to_recorder(target, star_x, star_y)
+            return
+        target.fill((0, 0, 0))  # Черный фон космоса
+        try:
+            self._stamp(target, star_x, star_y)
+        except ValueError:
+            self._draw_per_star(target, star_x, star_y)
+
+
+class ParallaxStarfield(Starfield):
+    # Русский комментарий: Фон из заранее отрисованных слоев. Звезды каждого слоя Starfield один раз
+    # рисуются на поверхность высотой в экран, которая бесшовно повторяется по вертикали. В каждом
+    # кадре слой выводится двумя частями со смещением прокрутки, поэтому стоимость кадра - несколько
+    # blit'ов при любом числе звезд. Узор слоя повторяется: звезды, ушедшие за нижний край, не
+    # получают новую случайную X координату.
+    def __init__(
+        self,
+        screen,
+        screen_width,
+        screen_height,
+        num_stars_per_layer=150,
+        rng=None,
+        base_image_path=None,
+        base_speed=0.0,
+    ):
+        super().__init__(screen, screen_width, screen_height, num_stars_per_layer, rng)
+        self.tiles = []  # Поверхности слоев снизу вверх (звездные слои - с прозрачным фоном)
+        self.speeds = []  # Скорость прокрутки каждого слоя, пикселей в секунду
+
+        base = self._load_base_image(base_image_path) if base_image_path else None
+        if base is not None:
+            self.tiles.append(base)
+            self.speeds.append(base_speed)
+
+        star_x = self.x.astype(np.intp)
+        star_y = self.y.astype(np.intp)
+        for layer_index, config in enumerate(self.layers_config):
+            tile = pygame.Surface((screen_width, screen_height), 0, 32)
+            tile.fill((0, 0, 0))
+            # Русский комментарий: Звезды у верхнего и нижнего краев рисуются и с другой стороны,
+            # чтобы стык повторяющихся копий слоя был незаметен.
+            for shift in (-screen_height, 0, screen_height):
+                self._stamp(tile, star_x, star_y + shift, layer=layer_index)
+            # Русский комментарий: Слой прозрачен вне звезд. С RLE пустые участки пропускаются целиком,
+            # и вывод разреженного слоя стоит меньше копирования непрозрачной поверхности.
+            tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            self.tiles.append(tile)
+            self.speeds.append(config["speed"])
+        self.offsets = [0.0] * len(self.tiles)  # Текущая прокрутка слоев, 0 <= offset < screen_height
+
+    @property
+    def redraws_every_frame(self):
+        # Русский комментарий: Прокрутка меняет область (area) blit'ов слоя в каждом кадре, и
+        # DirtyRectRenderer все равно перерисовывал бы весь экран, сначала сравнив кадры. Сдвиг
+        # содержимого на весь экран не выразить стабильными blit'ами, поэтому движущиеся слои
+        # рисуются прямо на экран. Неподвижные слои (все скорости 0) рисуются по областям.
+        return any(self.speeds)
+
+    def _load_base_image(self, path):
+        # Русский комментарий: Базовый (самый дальний) слой из изображения. Подходит только непрозрачный
+        # фон не меньше экрана; маленький спрайт не растягивается на весь экран.
+        try:
+            image = image_cache.load_image(path, alpha=False)
+        except pygame.error as e:
+            logger.warning("Изображение фона %s не загружено: %s. Базовый слой - черное небо.", path, e)
+            return None
+        width, height = image.get_size()
+        if width < self.screen_width or height < self.screen_height:
+            logger.info(
+                "Изображение %s (%dx%d) меньше экрана и не используется как фон. Базовый слой - черное небо.",
+                path,
+                width,
+                height,
+            )
+            return None
+        return image_cache.load_image(path, (self.screen_width, self.screen_height), alpha=False)
+
+    def update(self, dt):
+        # Русский комментарий: Сдвигает каждый слой на его скорость (dt - длительность шага в секундах).
+        for index, speed in enumerate(self.speeds):
+            self.offsets[index] = (self.offsets[index] + speed * dt) % self.screen_height
+
+    def draw(self, surface=None):
+        # Русский комментарий: Выводит слои снизу вверх, каждый - двумя частями по смещению прокрутки.
+        target = surface if surface is not None else self.screen
+        if self.tiles[0].get_colorkey() is not None:  # Нет непрозрачного базового слоя
+            target.fill((0, 0, 0))
+        width, height = self.screen_width, self.screen_height
+        for tile, offset in zip(self.tiles, self.offsets):
+            shift = int(offset)
+            target.blit(tile, (0, shift), (0, 0, width, height - shift))
+            if shift:
+                target.blit(tile, (0, 0), (0, height - shift, width, shift))
+
+
+def create_starfield(settings, screen, rng):
+    """Создает фон игры по settings.background_mode: звездное поле или слои с параллаксом."""
+    if settings.background_mode == BACKGROUND_LAYERS:
+        return ParallaxStarfield(
+            screen,
+            settings.screen_width,
+            settings.screen_height,
+            settings.starfield_stars_per_layer,
+            rng=rng,
+            base_image_path=settings.background_base_image_path,
+            base_speed=settings.background_base_speed,
+        )
+    if settings.background_mode != BACKGROUND_PARTICLES:
+        logger.warning(
+            "Неизвестный режим фона %r, используется звездное поле.", settings.background_mode
+        )
+    return Starfield(
+        screen,
+        settings.screen_width,
+        settings.screen_height,
+        settings.starfield_stars_per_layer,
+        rng=rng,
+    )
@@ -0,0 +1,272 @@
+"""Параллельный запуск нескольких headless-экземпляров AlienInvasion.
+
+Каждый рабочий процесс владеет одним экземпляром игры. Действия и наблюдения
+передаются через общую память (multiprocessing.RawArray + представления NumPy),
+а по каналам (Pipe) передаются только короткие команды. Это позволяет шагать
+всеми средами пакетно и масштабировать пропускную способность по ядрам CPU.
+
+Запуск замера пропускной способности:
+    python -m alien_invasion.vec_env --envs 8 --steps 2000
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Порядок действий в буфере действий (одна строка uint8 на среду).
+ACTION_FIELDS = ("left", "right", "fire")
+# Порядок полей в буфере наблюдений (одна строка float64 на среду).
+OBSERVATION_FIELDS = (
+    "time_ms",
+    "game_state",
+    "score",
+    "level",
+    "ships_left",
+    "ship_x",
+    "aliens_left",
+    "fleet_bottom",
+    "fleet_direction",
+    "bullets",
+    "powerups",
+    "shield_active",
+    "double_fire_active",
+    "respawning",  # Пауза после потери жизни: корабль не двигается и не стреляет
+)
+# Кодирование строкового состояния игры в число для буфера наблюдений.
+GAME_STATE_CODES = ("menu", "playing", "paused", "game_over")
+
+_CMD_RESET = "reset"
+_CMD_STEP = "step"
+_CMD_CLOSE = "close"
+_REPLY_OK = "ok"
+_REPLY_ERROR = "error"
+
+
+def encode_observation(state, out_row):
+    """Записывает словарь состояния из AlienInvasion.get_state() в строку буфера наблюдений."""
+    for i, field in enumerate(OBSERVATION_FIELDS):
+        value = state[field]
+        if field == "game_state":
+            value = GAME_STATE_CODES.index(value)
+        out_row[i] = value
+
+
+def _worker(index, conn, actions_buf, observations_buf, rewards_buf, dones_buf, auto_reset):
+    # Русский комментарий: Цикл рабочего процесса - один экземпляр игры, команды из канала.
+    # Импорт внутри процесса: pygame инициализируется только в рабочих процессах.
+    from alien_invasion.alien_invasion import AlienInvasion
+
+    actions = np.frombuffer(actions_buf, dtype=np.uint8).reshape(-1, len(ACTION_FIELDS))
+    observations = np.frombuffer(observations_buf, dtype=np.float64).reshape(
+        -1, len(OBSERVATION_FIELDS)
+    )
+    rewards = np.frombuffer(rewards_buf, dtype=np.float64)
+    dones = np.frombuffer(dones_buf, dtype=np.uint8)
+
+    try:
+        # Рабочие процессы не пишут рекорд: N процессов гонялись бы за файл рекорда игрока
+        game = AlienInvasion(headless=True, persist_high_score=False)
+    except Exception:
+        conn.send((_REPLY_ERROR, traceback.format_exc()))
+        return
+    conn.send((_REPLY_OK, None))
+
+    while True:
+        command, arg = conn.recv()
+        try:
+            if command == _CMD_STEP:
+                action = {
+                    name: bool(actions[index, i]) for i, name in enumerate(ACTION_FIELDS)
+                }
+                total_reward = 0
+                done = False
+                state = None
+                # arg - число тиков симуляции с одним и тем же действием (пакет шагов).
+                for _ in range(arg):
+                    state, reward, done = game.step(action)
+                    total_reward += reward
+                    if done:
+                        break
+                if done and auto_reset:
+                    state = game.reset()
+                encode_observation(state, observations[index])
+                rewards[index] = total_reward
+                dones[index] = done
+            elif command == _CMD_RESET:
+                encode_observation(game.reset(seed=arg), observations[index])
+                rewards[index] = 0
+                dones[index] = 0
+            elif command == _CMD_CLOSE:
+                conn.send((_REPLY_OK, None))
+                break
+            else:
+                raise ValueError(f"Неизвестная команда рабочего процесса: {command!r}")
+        except Exception:
+            conn.send((_REPLY_ERROR, traceback.format_exc()))
+            continue
+        conn.send((_REPLY_OK, None))
+    conn.close()
+
+
+class VecAlienInvasion:
+    """Набор из n_envs независимых headless-экземпляров игры в отдельных процессах."""
+
+    def __init__(self, n_envs=None, seed=None, auto_reset=True, start_method="spawn"):
+        """Запускает рабочие процессы.
+
+        n_envs - число сред (по умолчанию - число ядер CPU).
+        seed - базовое зерно: среда i получает seed + i при каждом reset().
+        auto_reset - автоматически начинать новую игру в среде после game over.
+        start_method - способ запуска процессов multiprocessing ("spawn" безопасен для SDL).
+        """
+        self.n_envs = n_envs or os.cpu_count() or 1
+        self.seed = seed
+        self.auto_reset = auto_reset
+        ctx = multiprocessing.get_context(start_method)
+
+        self._actions_buf = ctx.RawArray("B", self.n_envs * len(ACTION_FIELDS))
+        self._observations_buf = ctx.RawArray(
+            "d", self.n_envs * len(OBSERVATION_FIELDS)
+        )
+        self._rewards_buf = ctx.RawArray("d", self.n_envs)
+        self._dones_buf = ctx.RawArray("B", self.n_envs)
+
+        self.actions = np.frombuffer(self._actions_buf, dtype=np.uint8).reshape(
+            self.n_envs, len(ACTION_FIELDS)
+        )
+        self.observations = np.frombuffer(
+            self._observations_buf, dtype=np.float64
+        ).reshape(self.n_envs, len(OBSERVATION_FIELDS))
+        self.rewards = np.frombuffer(self._rewards_buf, dtype=np.float64)
+        self.dones = np.frombuffer(self._dones_buf, dtype=np.uint8)
+
+        self._conns = []
+        self._processes = []
+        self.closed = False
+        for index in range(self.n_envs):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(
+                    index,
+                    child_conn,
+                    self._actions_buf,
+                    self._observations_buf,
+                    self._rewards_buf,
+                    self._dones_buf,
+                    self.auto_reset,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+        try:
+            self._wait_all()
+        except RuntimeError:
+            self.close()
+            raise
+        logger.info("Запущено %d сред AlienInvasion.", self.n_envs)
+
+    def _wait_all(self):
+        """Ждет ответа от всех рабочих процессов и поднимает ошибку, если кто-то упал."""
+        errors = []
+        for index, conn in enumerate(self._conns):
+            status, payload = conn.recv()
+            if status == _REPLY_ERROR:
+                errors.append(f"Среда {index}:\n{payload}")
+        if errors:
+            raise RuntimeError("Ошибка в рабочем процессе:\n" + "\n".join(errors))
+
+    def reset(self, seed=None):
+        """Начинает новую игру во всех средах и возвращает копию наблюдений."""
+        base_seed = self.seed if seed is None else seed
+        for index, conn in enumerate(self._conns):
+            env_seed = None if base_seed is None else base_seed + index
+            conn.send((_CMD_RESET, env_seed))
+        self._wait_all()
+        return self.observations.copy()
+
+    def step(self, actions, repeat=1):
+        """Делает пакетный шаг во всех средах.
+
+        actions - массив формы (n_envs, len(ACTION_FIELDS)) из 0/1.
+        repeat - сколько тиков симуляции выполнить с этими действиями за один обмен
+        с процессами (меньше накладных расходов на синхронизацию).
+        Возвращает (observations, rewards, dones) - копии буферов общей памяти.
+        """
+        if repeat < 1:
+            raise ValueError(f"repeat должен быть не меньше 1, получено {repeat}")
+        self.actions[:] = actions
+        for conn in self._conns:
+            conn.send((_CMD_STEP, repeat))
+        self._wait_all()
+        return self.observations.copy(), self.rewards.copy(), self.dones.astype(bool)
+
+    def close(self):
+        """Останавливает рабочие процессы."""
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self._conns:
+            try:
+                conn.send((_CMD_CLOSE, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+def main():
+    """Замер пропускной способности пакетного шага на случайных действиях."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, default=os.cpu_count(), help="Число сред")
+    parser.add_argument("--steps", type=int, default=1000, help="Число пакетных шагов")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Тиков симуляции на один пакетный шаг"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Базовое зерно")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(module)s - %(funcName)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    rng = np.random.default_rng(args.seed)
+    with VecAlienInvasion(args.envs, seed=args.seed) as envs:
+        envs.reset()
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            actions = rng.integers(0, 2, size=envs.actions.shape, dtype=np.uint8)
+            envs.step(actions, repeat=args.repeat)
+        elapsed = time.perf_counter() - start
+
+    total_ticks = args.envs * args.steps * args.repeat
+    print(
+        f"{args.envs} сред, {total_ticks} тиков за {elapsed:.2f} с: "
+        f"{total_ticks / elapsed:.0f} тиков/с"
+    )
+
+
+if __name__ == "__main__":
+    main()
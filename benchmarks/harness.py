@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Минимальная обвязка для замеров производительности.
+
+Каждый бенчмарк - функция setup(), возвращающая операцию (callable без аргументов).
+Обвязка подбирает число повторов операции так, чтобы одна серия длилась не меньше
+min_time секунд, делает несколько серий и отдельным прогоном под tracemalloc
+замеряет память. Результаты сохраняются в JSON и сравниваются с базовой линией.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+_CALIBRATION_FRACTION = 0.1  # Калибровочная серия - десятая часть min_time
+_MEMORY_SAMPLE_OPS = 50  # Сколько операций прогоняется под tracemalloc
+_NS_PER_SECOND = 1_000_000_000
+
+STATUS_OK = "ok"
+STATUS_FASTER = "faster"
+STATUS_REGRESSION = "REGRESSION"
+STATUS_NEW = "new"
+STATUS_MISSING = "missing"
+
+
+class Benchmark:
+    """Описание одного бенчмарка."""
+
+    def __init__(self, name, setup, group, params=None):
+        self.name = name
+        self.setup = setup
+        self.group = group  # "micro" или "macro"
+        self.params = params or {}
+
+
+def _time_batch(op, iterations):
+    """Время выполнения iterations вызовов op в секундах (сборщик мусора выключен, как в timeit)."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            op()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def measure_time(op, min_time=0.2, repeat=5):
+    """Возвращает (iterations, [время серии, ...]) для операции op."""
+    iterations = 1
+    while True:
+        elapsed = _time_batch(op, iterations)
+        if elapsed >= min_time * _CALIBRATION_FRACTION:
+            break
+        iterations *= 2
+    iterations = max(1, int(iterations * min_time / elapsed))
+    return iterations, [_time_batch(op, iterations) for _ in range(repeat)]
+
+
+def measure_memory(op, ops=_MEMORY_SAMPLE_OPS):
+    """Возвращает (пик выделенной памяти за серию, остаток памяти на операцию) в байтах."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for _ in range(ops):
+            op()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before, (after - before) / ops
+
+
+def run_benchmark(benchmark, min_time=0.2, repeat=5):
+    """Выполняет бенчмарк и возвращает словарь с результатами."""
+    op = benchmark.setup()
+    op()  # Прогрев: ленивые кэши, первые аллокации
+    iterations, batch_times = measure_time(op, min_time=min_time, repeat=repeat)
+    peak_bytes, retained_per_op = measure_memory(op)
+    best = min(batch_times) / iterations
+    median = statistics.median(batch_times) / iterations
+    return {
+        "group": benchmark.group,
+        "params": benchmark.params,
+        "iterations": iterations,
+        "repeat": repeat,
+        "ops_per_sec": 1 / best if best > 0 else float("inf"),
+        "median_ops_per_sec": 1 / median if median > 0 else float("inf"),
+        "ns_per_op": best * _NS_PER_SECOND,
+        "peak_mem_bytes": peak_bytes,
+        "retained_bytes_per_op": retained_per_op,
+    }
+
+
+def environment_info():
+    """Сведения об окружении для файла результатов."""
+    try:
+        import pygame
+
+        pygame_version = pygame.version.ver
+    except ImportError:
+        pygame_version = None
+    info = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pygame": pygame_version,
+    }
+    try:
+        import resource
+
+        # ru_maxrss: килобайты в Linux, байты в macOS
+        info["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:  # Windows
+        pass
+    return info
+
+
+def save_results(path, results):
+    """Сохраняет результаты прогона в JSON."""
+    document = {"meta": environment_info(), "benchmarks": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path):
+    """Загружает словарь бенчмарков из JSON-файла результатов."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["benchmarks"]
+
+
+def compare_results(current, baseline, threshold=0.10):
+    """Сравнивает ops/sec с базовой линией.
+
+    Возвращает список (имя, ops/sec базы, ops/sec сейчас, изменение, статус).
+    Замедление больше threshold (доля) помечается как регрессия.
+    """
+    rows = []
+    for name in sorted(set(current) | set(baseline)):
+        if name not in baseline:
+            rows.append((name, None, current[name]["ops_per_sec"], None, STATUS_NEW))
+            continue
+        if name not in current:
+            rows.append((name, baseline[name]["ops_per_sec"], None, None, STATUS_MISSING))
+            continue
+        base_ops = baseline[name]["ops_per_sec"]
+        current_ops = current[name]["ops_per_sec"]
+        change = current_ops / base_ops - 1 if base_ops else 0.0
+        if change < -threshold:
+            status = STATUS_REGRESSION
+        elif change > threshold:
+            status = STATUS_FASTER
+        else:
+            status = STATUS_OK
+        rows.append((name, base_ops, current_ops, change, status))
+    return rows
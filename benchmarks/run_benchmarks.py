@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Набор бенчмарков горячих путей Alien Invasion.
+
+Микробенчмарки замеряют отдельные операции (создание пришельца и флота,
+шаг движения флота, groupcollide и столкновения через сетку флота, звездное поле, Scoreboard.prep_score), макробенчмарк - полный
+кадр headless-игры. Для каждого выводятся ops/sec и память; результаты
+сохраняются в JSON и могут сравниваться с сохраненной базовой линией.
+
+Примеры:
+    python benchmarks/run_benchmarks.py                     # все бенчмарки -> benchmarks/results.json
+    python benchmarks/run_benchmarks.py --save-baseline     # сохранить базовую линию
+    python benchmarks/run_benchmarks.py --compare           # сравнить с базовой линией (код 1 при регрессии)
+    python benchmarks/run_benchmarks.py --filter starfield --min-time 0.5
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+import pygame
+
+_BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Добавляем корневую директорию проекта в sys.path (как в tests/)
+sys.path.insert(0, os.path.abspath(os.path.join(_BENCHMARKS_DIR, "..")))
+
+from benchmarks.harness import (  # noqa: E402
+    STATUS_REGRESSION,
+    Benchmark,
+    compare_results,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+_DEFAULT_RESULTS_PATH = os.path.join(_BENCHMARKS_DIR, "results.json")
+_DEFAULT_BASELINE_PATH = os.path.join(_BENCHMARKS_DIR, "baseline.json")
+_SEED = 12345
+_FLEET_LEVELS = (1, 5, 10)
+_STAR_COUNTS = (150, 1_000, 10_000)
+_COLLISION_BULLETS = 50
+# Стресс-сценарий столкновений: мелкие пришельцы (сотни во флоте) и много пуль
+_STRESS_BULLETS = 200
+_STRESS_ALIEN_SIZE = 12
+_BENCH_SCORE = 1_234_560
+
+
+def _make_game(level=1):
+    """Создает headless-игру с фиксированным зерном и начатой игрой на уровне level."""
+    from alien_invasion.alien_invasion import AlienInvasion
+
+    # Рекорд не читается и не записывается: бенчмарки не должны трогать highscore.json.
+    game = AlienInvasion(headless=True, seed=_SEED, persist_high_score=False)
+    game.reset(seed=_SEED)
+    if level != 1:
+        game.stats.level = level
+        game.settings.initialize_dynamic_settings(level)
+        game._reset_round_elements()
+    return game
+
+
+def _bench_alien_construct():
+    from alien_invasion.alien import Alien
+
+    game = _make_game()
+    return lambda: Alien(game)
+
+
+def _bench_create_fleet(level):
+    def setup():
+        game = _make_game(level)
+
+        def op():
+            game.aliens.empty()
+            game._create_fleet()
+
+        return op
+
+    return setup
+
+
+def _bench_fleet_step(level):
+    def setup():
+        game = _make_game(level)
+        dt = 1.0 / 120
+
+        def op():
+            # Шаг движения флота, как в кадре: проверка краев и сдвиг строя
+            game._check_fleet_edges()
+            game.aliens.update(dt)
+
+        return op
+
+    return setup
+
+
+def _collision_game(level, bullet_count, alien_size=None):
+    """Игра с флотом уровня level и bullet_count пулями на высоте рядов флота.
+
+    alien_size - уменьшенный размер пришельца для стресс-флота из сотен пришельцев.
+    """
+    from alien_invasion.bullet import Bullet
+
+    game = _make_game(level=level)
+    if alien_size is not None:
+        game.settings.alien_display_width = game.settings.alien_display_height = alien_size
+        game.settings.bullets_allowed = bullet_count
+        game._reset_round_elements()
+    aliens = game.aliens.sprites()
+    # Пули равномерно по ширине экрана на высоте рядов флота: часть из них попадает.
+    game.bullets.empty()
+    top = min(alien.rect.top for alien in aliens)
+    bottom = max(alien.rect.bottom for alien in aliens)
+    width = game.settings.screen_width
+    for i in range(bullet_count):
+        bullet = Bullet(game)
+        bullet.rect.centerx = int((i + 0.5) * width / bullet_count)
+        bullet.rect.centery = top + (bottom - top) * i // bullet_count
+        game.bullets.add(bullet)
+    return game
+
+
+def _bench_groupcollide(level, bullet_count, alien_size=None):
+    def setup():
+        game = _collision_game(level, bullet_count, alien_size)
+        bullets, alien_group = game.bullets, game.aliens
+        # dokill=False: группы не меняются, и операцию можно повторять.
+        return lambda: pygame.sprite.groupcollide(bullets, alien_group, False, False)
+
+    return setup
+
+
+def _bench_fleet_collide(level, bullet_count, alien_size=None):
+    def setup():
+        game = _collision_game(level, bullet_count, alien_size)
+        bullets, fleet = game.bullets, game.aliens
+        # Те же столкновения через сетку флота (alien_invasion/spatial_hash.py)
+        return lambda: fleet.groupcollide(bullets, False, False)
+
+    return setup
+
+
+def _starfield(stars):
+    from alien_invasion.starfield import Starfield
+    import random
+
+    game = _make_game()
+    # В Starfield дальний слой содержит num_stars_per_layer // 2 звезд, ближний - num_stars_per_layer.
+    per_layer = round(stars * 2 / 3)
+    return Starfield(
+        game.screen,
+        game.settings.screen_width,
+        game.settings.screen_height,
+        num_stars_per_layer=per_layer,
+        rng=random.Random(_SEED),
+    )
+
+
+def _bench_starfield_update(stars):
+    def setup():
+        starfield = _starfield(stars)
+        dt = 1.0 / 120
+        return lambda: starfield.update(dt)
+
+    return setup
+
+
+def _bench_starfield_draw(stars):
+    def setup():
+        starfield = _starfield(stars)
+        return starfield.draw
+
+    return setup
+
+
+def _bench_prep_score():
+    game = _make_game()
+    game.stats.score = _BENCH_SCORE
+    return game.sb.prep_score
+
+
+def _bench_headless_frame():
+    from alien_invasion.profiling import ProfileSession
+
+    game = _make_game()
+    session = ProfileSession(game, render=True)
+    return session.run_frame
+
+
+def build_benchmarks():
+    """Возвращает список всех бенчмарков в порядке запуска."""
+    benchmarks = [Benchmark("alien_construct", _bench_alien_construct, "micro")]
+    for level in _FLEET_LEVELS:
+        benchmarks.append(
+            Benchmark(
+                f"create_fleet_level_{level}",
+                _bench_create_fleet(level),
+                "micro",
+                {"level": level},
+            )
+        )
+    for level in _FLEET_LEVELS:
+        benchmarks.append(
+            Benchmark(
+                f"fleet_step_level_{level}",
+                _bench_fleet_step(level),
+                "micro",
+                {"level": level},
+            )
+        )
+    collision_cases = (
+        ("", 5, _COLLISION_BULLETS, None),
+        ("_stress", 10, _STRESS_BULLETS, _STRESS_ALIEN_SIZE),
+    )
+    for suffix, level, bullet_count, alien_size in collision_cases:
+        params = {"bullets": bullet_count, "level": level}
+        if alien_size is not None:
+            params["alien_size"] = alien_size
+        benchmarks.append(
+            Benchmark(
+                f"groupcollide_bullets_aliens{suffix}",
+                _bench_groupcollide(level, bullet_count, alien_size),
+                "micro",
+                params,
+            )
+        )
+        benchmarks.append(
+            Benchmark(
+                f"fleet_collide_bullets_aliens{suffix}",
+                _bench_fleet_collide(level, bullet_count, alien_size),
+                "micro",
+                params,
+            )
+        )
+    for stars in _STAR_COUNTS:
+        benchmarks.append(
+            Benchmark(
+                f"starfield_update_{stars}",
+                _bench_starfield_update(stars),
+                "micro",
+                {"stars": stars},
+            )
+        )
+        benchmarks.append(
+            Benchmark(
+                f"starfield_draw_{stars}",
+                _bench_starfield_draw(stars),
+                "micro",
+                {"stars": stars},
+            )
+        )
+    benchmarks.append(Benchmark("scoreboard_prep_score", _bench_prep_score, "micro"))
+    benchmarks.append(Benchmark("headless_frame", _bench_headless_frame, "macro"))
+    return benchmarks
+
+
+def _format_ops(value):
+    return "-" if value is None else f"{value:,.0f}"
+
+
+def _print_comparison(rows, threshold):
+    print()
+    print(f"Сравнение с базовой линией (порог регрессии {threshold:.0%}):")
+    print(f"{'benchmark':<32}{'baseline':>14}{'current':>14}{'change':>9}  status")
+    for name, base_ops, current_ops, change, status in rows:
+        change_str = "-" if change is None else f"{change:+.1%}"
+        print(
+            f"{name:<32}{_format_ops(base_ops):>14}{_format_ops(current_ops):>14}"
+            f"{change_str:>9}  {status}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей Alien Invasion")
+    parser.add_argument("--filter", help="Запускать только бенчмарки, имя которых содержит подстроку")
+    parser.add_argument("--list", action="store_true", help="Показать список бенчмарков и выйти")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Минимальная длительность серии, с")
+    parser.add_argument("--repeat", type=int, default=5, help="Число серий")
+    parser.add_argument("--output", default=_DEFAULT_RESULTS_PATH, help="Файл результатов (JSON)")
+    parser.add_argument("--baseline", default=_DEFAULT_BASELINE_PATH, help="Файл базовой линии (JSON)")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результаты как базовую линию")
+    parser.add_argument("--compare", action="store_true", help="Сравнить с базовой линией")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Допустимое замедление относительно базовой линии (доля, по умолчанию 0.10)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    benchmarks = build_benchmarks()
+    if args.filter:
+        benchmarks = [b for b in benchmarks if args.filter in b.name]
+    if args.list:
+        for benchmark in benchmarks:
+            print(f"{benchmark.name:<32}{benchmark.group}")
+        return 0
+
+    print(f"{'benchmark':<32}{'ops/sec':>14}{'us/op':>11}{'peak KiB':>11}{'kept B/op':>11}")
+    results = {}
+    for benchmark in benchmarks:
+        result = run_benchmark(benchmark, min_time=args.min_time, repeat=args.repeat)
+        results[benchmark.name] = result
+        print(
+            f"{benchmark.name:<32}{result['ops_per_sec']:>14,.0f}"
+            f"{result['ns_per_op'] / 1000:>11.2f}"
+            f"{result['peak_mem_bytes'] / 1024:>11.1f}"
+            f"{result['retained_bytes_per_op']:>11.0f}"
+        )
+
+    save_results(args.output, results)
+    print(f"\nРезультаты сохранены в {args.output}")
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Базовая линия сохранена в {args.baseline}")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"Базовая линия не найдена: {args.baseline}")
+            return 2
+        baseline = load_results(args.baseline)
+        if args.filter:
+            baseline = {name: r for name, r in baseline.items() if args.filter in name}
+        rows = compare_results(results, baseline, args.threshold)
+        _print_comparison(rows, args.threshold)
+        if any(status == STATUS_REGRESSION for *_, status in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
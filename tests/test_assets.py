@@ -2,7 +2,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import pygame
+import json
 import os
+import tempfile
+import wave
 
 # Добавляем путь к корневому каталогу проекта, чтобы можно было импортировать alien_invasion
 import sys
@@ -11,8 +14,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from alien_invasion.settings import Settings
 from alien_invasion.ship import Ship
-from alien_invasion.alien import Alien
+from alien_invasion.alien import Alien, _TINT_PALETTE, _TINT_VARIANTS_PER_SPRITE
 from alien_invasion.powerup import PowerUp
+from alien_invasion import asset_manifest, audio_cache, image_cache
+from tools.build_atlas import build_atlas, pack_rects
 from alien_invasion.alien_invasion import (
     AlienInvasion,
     _EXPLOSION_SOUND_INDEX_START,
@@ -46,6 +51,11 @@ class TestAssetScaling(unittest.TestCase):
         # или мокать pygame.image.load так, чтобы оно возвращало Surface с альфа-флагом.
         # Проще использовать реальные пути, если они доступны, и обрабатывать их отсутствие.
 
+    def setUp(self):
+        # Тесты подменяют pygame.image.load, поэтому кэш изображений очищается до и после каждого
+        image_cache.clear()
+        self.addCleanup(image_cache.clear)
+
     # --- Тесты на масштабирование ---
     @patch("pygame.image.load")
     def test_ship_scaling(self, mock_load_image):
@@ -138,6 +148,9 @@ class TestAssetScaling(unittest.TestCase):
         scaled_surface_mock.get_width.return_value = scaled_width
         scaled_surface_mock.get_height.return_value = scaled_height
         scaled_surface_mock.convert_alpha.return_value = scaled_surface_mock
+        scaled_surface_mock.copy.return_value = (
+            scaled_surface_mock  # Alien берет копию общей поверхности из кэша
+        )
         scaled_surface_mock.blit.return_value = None
 
         mock_transform_scale = MagicMock(return_value=scaled_surface_mock)
@@ -285,12 +298,361 @@ class TestAssetScaling(unittest.TestCase):
             "Загруженное изображение бонуса должно иметь флаг SRCALPHA.",
         )
 
+    # --- Тесты на кэш изображений ---
+
+    def _existing_alien_path(self):
+        paths = [p for p in self.ai_game_mock.settings.alien_sprite_paths if os.path.exists(p)]
+        if not paths:
+            self.skipTest("Нет ни одного ассета пришельца на диске.")
+        return paths[0]
+
+    def test_image_cache_decodes_each_file_once(self):
+        """Тест: файл декодируется один раз, все размеры и повторы берутся из кэша."""
+        path = self._existing_alien_path()
+        with patch("pygame.image.load", wraps=pygame.image.load) as mock_load:
+            first = image_cache.load_image(path, (40, 40))
+            second = image_cache.load_image(path, (40, 40))
+            other_size = image_cache.load_image(path, (20, 20))
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertIs(first, second)  # Общая поверхность
+        self.assertEqual(first.get_size(), (40, 40))
+        self.assertEqual(other_size.get_size(), (20, 20))
+
+    def test_image_cache_copy_is_independent(self):
+        """Тест: load_image_copy отдает копию, изменения которой не портят общую поверхность."""
+        path = self._existing_alien_path()
+        shared = image_cache.load_image(path, (40, 40))
+        pixel_before = shared.get_at((20, 20))
+        copy = image_cache.load_image_copy(path, (40, 40))
+        self.assertIsNot(copy, shared)
+        copy.fill((1, 2, 3, 255))
+        self.assertEqual(shared.get_at((20, 20)), pixel_before)
+
+    def test_image_cache_remembers_failures(self):
+        """Тест: отсутствующий файл запрашивается с диска только один раз."""
+        with patch("pygame.image.load", side_effect=FileNotFoundError("missing")) as mock_load:
+            for _ in range(3):
+                with self.assertRaises(pygame.error):
+                    image_cache.load_image("no_such_image.png", (10, 10))
+        self.assertEqual(mock_load.call_count, 1)
+
+    def test_aliens_and_powerups_share_cached_images(self):
+        """Тест: новые пришельцы и бонусы не обращаются к диску после первой загрузки."""
+        path = self._existing_alien_path()
+        Alien(self.ai_game_mock, specific_image_path=path)
+        PowerUp(self.ai_game_mock, "shield", (100, 100))
+        with patch("pygame.image.load") as mock_load:
+            aliens = [Alien(self.ai_game_mock, specific_image_path=path) for _ in range(5)]
+            powerups = [PowerUp(self.ai_game_mock, "shield", (100, 100)) for _ in range(3)]
+        mock_load.assert_not_called()
+        # Пришельцы с одинаковым оттенком и бонусы одного типа делят одну поверхность
+        for alien in aliens:
+            for other in aliens:
+                if alien.tint_color == other.tint_color:
+                    self.assertIs(alien.image, other.image)
+        self.assertEqual(len({id(powerup.image) for powerup in powerups}), 1)
+
+    def test_alien_tint_variants_are_bounded(self):
+        """Тест: на один спрайт строится не больше _TINT_VARIANTS_PER_SPRITE окрашенных вариантов."""
+        path = self._existing_alien_path()
+        aliens = [Alien(self.ai_game_mock, specific_image_path=path) for _ in range(100)]
+        images = {id(alien.image) for alien in aliens}
+        self.assertLessEqual(len(images), _TINT_VARIANTS_PER_SPRITE)
+        self.assertEqual(len(_TINT_PALETTE), _TINT_VARIANTS_PER_SPRITE)
+        self.assertEqual(len(set(_TINT_PALETTE)), _TINT_VARIANTS_PER_SPRITE)
+        # Окрашенный вариант отличается от исходной общей поверхности и не портит ее
+        alien = aliens[0]
+        self.assertIsNot(alien.image, image_cache.load_image(path, alien.image.get_size()))
+
     @classmethod
     def tearDownClass(cls):
         """Завершение работы Pygame после всех тестов."""
         pygame.quit()
 
 
+class TestTextureAtlas(unittest.TestCase):
+    """Тесты сборки текстурного атласа и выдачи спрайтов из него."""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+        cls.screen = pygame.display.set_mode((200, 200))
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(image_cache.set_atlas_index, image_cache.DEFAULT_ATLAS_INDEX_PATH)
+        self.root = os.path.join(self.temp_dir.name, "assets")
+        os.makedirs(os.path.join(self.root, "gfx"))
+        # Три спрайта разных цветов и размеров
+        self.sprites = {
+            "gfx/red.png": ((10, 6), (255, 0, 0, 255)),
+            "gfx/green.png": ((4, 12), (0, 255, 0, 255)),
+            "gfx/big.png": ((64, 32), (0, 0, 255, 128)),
+        }
+        for name, (size, color) in self.sprites.items():
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            pygame.image.save(surface, os.path.join(self.root, name))
+        self.atlas_dir = os.path.join(self.temp_dir.name, "atlas")
+        self.index = build_atlas(self.root, list(self.sprites), self.atlas_dir, page_size=(128, 128))
+        # Записи атласа сверяются с хешами манифеста в корне спрайтов
+        asset_manifest.write_manifest(os.path.join(self.root, "manifest.json"), self.root)
+        image_cache.set_atlas_index(os.path.join(self.atlas_dir, "atlas.json"))
+
+    def test_pack_rects_keeps_rects_inside_page_without_overlap(self):
+        """Тест: упакованные прямоугольники не пересекаются и не выходят за страницу."""
+        sizes = [(30, 20), (30, 20), (10, 40), (50, 5), (20, 20)]
+        placements, pages = pack_rects(sizes, (64, 64), padding=1)
+        rects = {}
+        for (width, height), (page, x, y) in zip(sizes, placements):
+            rect = pygame.Rect(x, y, width, height)
+            self.assertTrue(pygame.Rect(0, 0, 64, 64).contains(rect))
+            for other in rects.get(page, []):
+                self.assertFalse(rect.colliderect(other))
+            rects.setdefault(page, []).append(rect)
+        self.assertEqual(pages, len(rects))
+
+    def test_index_lists_all_sprites(self):
+        """Тест: индекс содержит все спрайты в исходном размере и с хешами исходных файлов."""
+        self.assertEqual(set(self.index["sprites"]), set(self.sprites))
+        with open(os.path.join(self.root, "manifest.json")) as f:
+            manifest = json.load(f)["assets"]
+        for name, (size, _) in self.sprites.items():
+            entry = self.index["sprites"][name]
+            self.assertEqual(entry["rect"][2:], list(size))
+            self.assertEqual(entry["size"], list(size))
+            self.assertEqual(entry["sha256"], manifest[name]["sha256"])
+
+    def test_sprites_come_from_one_atlas_page(self):
+        """Тест: все спрайты выдаются как subsurface одной загруженной страницы."""
+        with patch("pygame.image.load", wraps=pygame.image.load) as mock_load:
+            images = {
+                name: image_cache.load_image(os.path.join(self.root, name))
+                for name in self.sprites
+            }
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(image_cache.cache_info()["atlas_pages"], 1)
+        for name, (size, color) in self.sprites.items():
+            image = images[name]
+            self.assertIsNotNone(image.get_parent())
+            self.assertEqual(tuple(image.get_at((0, 0))), color)
+        self.assertEqual(images["gfx/red.png"].get_size(), (10, 6))
+        self.assertEqual(images["gfx/big.png"].get_size(), (64, 32))
+
+    def test_changed_source_png_is_loaded_from_file(self):
+        """Тест: спрайт, чей хеш в манифесте не совпадает с атласом, грузится из файла."""
+        red_path = os.path.join(self.root, "gfx", "red.png")
+        edited = pygame.Surface((12, 8), pygame.SRCALPHA)
+        edited.fill((255, 255, 0, 255))
+        pygame.image.save(edited, red_path)
+        asset_manifest.write_manifest(os.path.join(self.root, "manifest.json"), self.root)
+        image_cache.clear()
+
+        with self.assertLogs("alien_invasion.image_cache", "WARNING") as logs:
+            image = image_cache.load_image(red_path)
+        self.assertIn("gfx/red.png", "\n".join(logs.output))
+        self.assertIsNone(image.get_parent())
+        self.assertEqual(image.get_size(), (12, 8))
+        self.assertEqual(tuple(image.get_at((0, 0))), (255, 255, 0, 255))
+        # Остальные спрайты по-прежнему берутся из атласа
+        green = image_cache.load_image(os.path.join(self.root, "gfx", "green.png"))
+        self.assertIsNotNone(green.get_parent())
+
+    def test_shrunk_atlas_sprites_are_loaded_at_full_size(self):
+        """Тест: спрайт, уменьшенный при сборке (--max-sprite-size), грузится из файла как есть."""
+        self.index = build_atlas(
+            self.root, list(self.sprites), self.atlas_dir, max_sprite_size=32, page_size=(64, 64)
+        )
+        self.assertEqual(self.index["sprites"]["gfx/big.png"]["rect"][2:], [32, 16])
+        self.assertEqual(self.index["sprites"]["gfx/big.png"]["size"], [64, 32])
+        image_cache.clear()
+
+        big = image_cache.load_image(os.path.join(self.root, "gfx", "big.png"))
+        self.assertIsNone(big.get_parent())
+        self.assertEqual(big.get_size(), (64, 32))
+        red = image_cache.load_image(os.path.join(self.root, "gfx", "red.png"))
+        self.assertIsNotNone(red.get_parent())
+
+    def test_files_outside_atlas_use_per_file_loader(self):
+        """Тест: спрайт, которого нет в атласе, загружается из собственного файла."""
+        path = os.path.join(self.root, "gfx", "extra.png")
+        pygame.image.save(pygame.Surface((3, 3)), path)
+        image = image_cache.load_image(path)
+        self.assertIsNone(image.get_parent())
+        self.assertEqual(image.get_size(), (3, 3))
+
+    def test_broken_atlas_falls_back_to_files(self):
+        """Тест: при поврежденном индексе или странице спрайты грузятся из файлов."""
+        red_path = os.path.join(self.root, "gfx", "red.png")
+        with open(os.path.join(self.atlas_dir, "atlas.json"), "w") as f:
+            f.write("{not json")
+        image_cache.clear()
+        self.assertIsNone(image_cache.load_image(red_path).get_parent())
+
+        self.index = build_atlas(self.root, list(self.sprites), self.atlas_dir, page_size=(128, 128))
+        os.remove(os.path.join(self.root, "manifest.json"))  # Без манифеста атлас не используется
+        image_cache.clear()
+        self.assertIsNone(image_cache.load_image(red_path).get_parent())
+
+        asset_manifest.write_manifest(os.path.join(self.root, "manifest.json"), self.root)
+        os.remove(os.path.join(self.atlas_dir, self.index["pages"][0]["file"]))
+        image_cache.clear()
+        image = image_cache.load_image(red_path)
+        self.assertIsNone(image.get_parent())
+        self.assertEqual(image.get_size(), (10, 6))
+
+
+class TestAssetManifest(unittest.TestCase):
+    """Тесты генерации и проверки манифеста ассетов."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = self.temp_dir.name
+        os.makedirs(os.path.join(self.root, "gfx"))
+        os.makedirs(os.path.join(self.root, "audio"))
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.image.save(pygame.Surface((7, 5)), os.path.join(self.root, "gfx", "ship.png"))
+        with open(os.path.join(self.root, "audio", "laser.ogg"), "wb") as f:
+            f.write(b"OggS" + b"\0" * 16)
+        self.manifest_path = os.path.join(self.root, asset_manifest.MANIFEST_NAME)
+        asset_manifest.write_manifest(self.manifest_path, self.root)
+
+    def test_manifest_lists_size_dimensions_and_hash(self):
+        """Тест: манифест содержит размер, хеш и разрешение изображений, но не себя."""
+        with open(self.manifest_path, encoding="utf-8") as f:
+            entries = json.load(f)["assets"]
+        self.assertEqual(set(entries), {"gfx/ship.png", "audio/laser.ogg"})
+        ship = entries["gfx/ship.png"]
+        self.assertEqual((ship["width"], ship["height"]), (7, 5))
+        self.assertEqual(ship["bytes"], os.path.getsize(os.path.join(self.root, "gfx", "ship.png")))
+        self.assertEqual(len(ship["sha256"]), 64)
+        self.assertEqual(entries["audio/laser.ogg"]["bytes"], 20)
+        self.assertNotIn("width", entries["audio/laser.ogg"])
+
+    def test_exists_answers_from_memory_after_validation(self):
+        """Тест: после validate() наличие ассетов из манифеста проверяется без обращения к диску."""
+        manifest = asset_manifest.AssetManifest.load(self.manifest_path, self.root)
+        os.remove(os.path.join(self.root, "audio", "laser.ogg"))
+        self.assertEqual(manifest.validate(), ["Ассет не найден: audio/laser.ogg"])
+        with patch("os.stat") as mock_stat, patch("os.path.exists") as mock_exists:
+            self.assertTrue(manifest.exists(os.path.join(self.root, "gfx", "ship.png")))
+            self.assertFalse(manifest.exists(os.path.join(self.root, "audio", "laser.ogg")))
+        mock_stat.assert_not_called()
+        mock_exists.assert_not_called()
+
+    def test_validate_reports_changed_files(self):
+        """Тест: файл другого размера остается доступным, но считается устаревшей записью."""
+        manifest = asset_manifest.AssetManifest.load(self.manifest_path, self.root)
+        with open(os.path.join(self.root, "audio", "laser.ogg"), "ab") as f:
+            f.write(b"more")
+        problems = manifest.validate()
+        self.assertEqual(len(problems), 1)
+        self.assertIn("audio/laser.ogg", problems[0])
+        self.assertTrue(manifest.exists(os.path.join(self.root, "audio", "laser.ogg")))
+
+    def test_unlisted_paths_checked_on_disk_once(self):
+        """Тест: путь вне манифеста проверяется на диске один раз."""
+        manifest = asset_manifest.AssetManifest.load(self.manifest_path, self.root)
+        manifest.validate()
+        missing = os.path.join(self.root, "gfx", "unknown.png")
+        with patch("os.path.exists", return_value=False) as mock_exists:
+            self.assertFalse(manifest.exists(missing))
+            self.assertFalse(manifest.exists(missing))
+        self.assertEqual(mock_exists.call_count, 1)
+
+    def test_load_rejects_corrupt_manifest(self):
+        """Тест: поврежденный манифест не загружается, а список строится по каталогу."""
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 99, "assets": {}}, f)
+        with self.assertRaises(ValueError):
+            asset_manifest.AssetManifest.load(self.manifest_path, self.root)
+        manifest = asset_manifest.AssetManifest.from_filesystem(self.root)
+        self.assertTrue(manifest.exists(os.path.join(self.root, "gfx", "ship.png")))
+        self.assertNotIn(asset_manifest.MANIFEST_NAME, manifest.entries)
+
+    def test_committed_manifest_matches_assets(self):
+        """Тест: assets/manifest.json соответствует файлам в assets/ (перегенерировать: validate_assets.py -m)."""
+        manifest = asset_manifest.AssetManifest.load()
+        self.assertEqual(manifest.validate(), [])
+        self.assertEqual(
+            set(manifest.entries),
+            set(asset_manifest.AssetManifest.from_filesystem().entries),
+        )
+
+
+class TestAudioCache(unittest.TestCase):
+    """Тесты дискового кэша декодированных звуков."""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.mixer.init(22050, -16, 2, 512)
+        cls.mixer_format = pygame.mixer.get_init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.mixer.quit()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.sound_path = os.path.join(self.temp_dir.name, "beep.wav")
+        self._write_wav(self.sound_path, 11025, bytes(range(256)) * 8)
+
+    def _write_wav(self, path, frequency, frames):
+        """Записывает моно 16-битный WAV другой частоты, чем у микшера (нужен пересэмплинг)."""
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(frequency)
+            f.writeframes(frames)
+
+    def test_second_load_comes_from_cache_buffer(self):
+        """Тест: повторная загрузка создает звук из буфера кэша, а не из исходного файла."""
+        first = audio_cache.load_sound(self.sound_path, self.cache_dir)
+        cached_files = os.listdir(self.cache_dir)
+        self.assertEqual(
+            cached_files, [audio_cache.cache_file_name(self.sound_path, self.mixer_format)]
+        )
+        with patch("pygame.mixer.Sound", wraps=pygame.mixer.Sound) as mock_sound:
+            second = audio_cache.load_sound(self.sound_path, self.cache_dir)
+        self.assertEqual(mock_sound.call_count, 1)
+        self.assertNotIn(self.sound_path, mock_sound.call_args.args)
+        self.assertIn("buffer", mock_sound.call_args.kwargs)
+        self.assertEqual(second.get_raw(), first.get_raw())
+
+    def test_changed_source_invalidates_cache(self):
+        """Тест: измененный исходный файл декодируется заново, старая запись кэша удаляется."""
+        audio_cache.load_sound(self.sound_path, self.cache_dir)
+        old_name = os.listdir(self.cache_dir)[0]
+        self._write_wav(self.sound_path, 11025, b"\x00\x10" * 500)
+        sound = audio_cache.load_sound(self.sound_path, self.cache_dir)
+        self.assertEqual(sound.get_raw(), pygame.mixer.Sound(self.sound_path).get_raw())
+        self.assertNotIn(old_name, os.listdir(self.cache_dir))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_mixer_format_is_part_of_cache_key(self):
+        """Тест: другие частота, формат или число каналов микшера дают другую запись кэша."""
+        name = audio_cache.cache_file_name(self.sound_path, (22050, -16, 2))
+        self.assertNotEqual(name, audio_cache.cache_file_name(self.sound_path, (44100, -16, 2)))
+        self.assertNotEqual(name, audio_cache.cache_file_name(self.sound_path, (22050, 8, 2)))
+        self.assertNotEqual(name, audio_cache.cache_file_name(self.sound_path, (22050, -16, 1)))
+
+    def test_cache_disabled_or_unwritable(self):
+        """Тест: без каталога кэша или при ошибке записи звук загружается как обычно."""
+        self.assertIsInstance(audio_cache.load_sound(self.sound_path, None), pygame.mixer.Sound)
+        self.assertFalse(os.path.exists(self.cache_dir))
+        with open(self.cache_dir, "w") as f:  # Файл на месте каталога: запись невозможна
+            f.write("x")
+        self.assertIsInstance(
+            audio_cache.load_sound(self.sound_path, self.cache_dir), pygame.mixer.Sound
+        )
+
+
 class TestSoundAssets(unittest.TestCase):
     """Тесты для проверки корректной загрузки звуковых ассетов."""
 
@@ -3,6 +3,9 @@ from unittest import mock
 from unittest.mock import patch # Added import for patch
 import os
 import sys
+import json
+import random
+import threading
 import pygame  # Added import for pygame
 import alien_invasion.button  # Added: For TestButtonCreation
 
@@ -18,6 +21,9 @@ from alien_invasion.settings import Settings
 from alien_invasion.ship import Ship
 from alien_invasion.scoreboard import Scoreboard
 from alien_invasion.game_stats import GameStats
+from alien_invasion import highscore_store
+from alien_invasion import image_cache
+from alien_invasion.spatial_hash import SpatialHash
 from alien_invasion.alien_invasion import (
     AlienInvasion,
 )  # Нужен для ai_game в Ship и Scoreboard
@@ -334,6 +340,15 @@ class TestSettingsInitialization(unittest.TestCase):
             "ui_heart_icon_path должен оканчиваться на '.png'.",
         )
 
+    def test_level_up_does_not_probe_filesystem(self):
+        """Проверка: смена уровня берет наличие спрайтов из манифеста, без обращений к диску."""
+        with mock.patch("os.path.exists") as mock_exists, mock.patch("os.stat") as mock_stat:
+            self.settings.load_level_settings(2)
+        mock_exists.assert_not_called()
+        mock_stat.assert_not_called()
+        self.assertEqual(len(self.settings.alien_sprite_paths), 24)
+        self.assertEqual(len(self.settings.planet_sprite_paths), 5)
+
     def test_localized_strings_exist_and_correct(self):
         """Проверка наличия и корректности локализованных строк."""
         self.assertEqual(self.settings.text_new_game_button, "Новая игра")
@@ -582,6 +597,10 @@ class TestScoreboardUpdates(unittest.TestCase):
         except pygame.error:
             pass
 
+        # Кэш изображений очищается, чтобы Scoreboard загрузил мок-поверхности (и не оставил их другим тестам)
+        image_cache.clear()
+        self.addCleanup(image_cache.clear)
+
         # Patch specific functions used by Scoreboard within setUp for better control
         self.mock_image_load = patch('pygame.image.load').start()
         self.mock_transform_scale = patch('pygame.transform.scale').start()
@@ -823,7 +842,8 @@ class TestGameStats(unittest.TestCase):
         """Тест сохранения рекорда."""
         stats = GameStats(self.mock_ai_game)
         stats.high_score = 98765
-        stats._save_high_score()  # Метод для сохранения
+        stats._save_high_score()  # Передает рекорд на запись в фоне
+        self.assertTrue(stats.flush_high_score(wait=True), "Рекорд должен быть записан после flush.")
 
         self.assertTrue(
             os.path.exists(self.test_highscore_path),
@@ -839,6 +859,94 @@ class TestGameStats(unittest.TestCase):
             saved_score, 98765, "Сохраненный рекорд не соответствует ожидаемому."
         )
 
+    def test_save_high_score_is_deferred_and_off_main_thread(self):
+        """Тест: рекорд записывается фоновым потоком один раз за отсрочку, а не при каждом вызове."""
+        self.settings.highscore_save_delay_s = 60.0
+        stats = GameStats(self.mock_ai_game)
+        writer_threads = []
+        real_write = highscore_store.write_json_atomic
+
+        def recording_write(path, value):
+            writer_threads.append(threading.current_thread())
+            real_write(path, value)
+
+        with patch.object(highscore_store, "write_json_atomic", side_effect=recording_write):
+            for score in (100, 200, 300):
+                stats.high_score = score
+                stats._save_high_score()
+            self.assertFalse(
+                os.path.exists(self.test_highscore_path),
+                "До конца отсрочки рекорд не должен записываться на диск.",
+            )
+            self.assertTrue(stats.flush_high_score(wait=True))
+            stats.flush_high_score(wait=True)  # Записывать нечего
+
+        self.assertEqual(len(writer_threads), 1, "Три рекорда за отсрочку - одна запись.")
+        self.assertIsNot(writer_threads[0], threading.main_thread())
+        with open(self.test_highscore_path) as f:
+            self.assertEqual(json.load(f), 300)
+        stats.high_score_store.close()
+
+    def test_failed_high_score_write_keeps_previous_file(self):
+        """Тест: сбой посреди записи оставляет прежний файл рекорда целым и не оставляет временных файлов."""
+        with open(self.test_highscore_path, "w") as f:
+            json.dump(500, f)
+        directory = os.path.dirname(os.path.abspath(self.test_highscore_path))
+        files_before = set(os.listdir(directory))
+
+        with patch("alien_invasion.highscore_store.json.dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                highscore_store.write_json_atomic(self.test_highscore_path, 900)
+
+        with open(self.test_highscore_path) as f:
+            self.assertEqual(json.load(f), 500)
+        self.assertEqual(set(os.listdir(directory)), files_before)
+
+
+class TestSpatialHash(unittest.TestCase):
+    """Тесты равномерной сетки для поиска пересечений прямоугольников."""
+
+    def _random_rect(self, rng):
+        # Отрицательные координаты, нулевые размеры и касание краев ячеек тоже проверяются
+        return pygame.Rect(
+            rng.randint(-40, 300), rng.randint(-40, 300), rng.randint(0, 60), rng.randint(0, 60)
+        )
+
+    def test_query_matches_brute_force(self):
+        """Тест: запрос находит ровно те объекты, что и перебор с Rect.colliderect."""
+        rng = random.Random(3)
+        grid = SpatialHash(32)
+        rects = {index: self._random_rect(rng) for index in range(200)}
+        for index, rect in rects.items():
+            grid.insert(index, rect)
+
+        for _ in range(300):
+            query = self._random_rect(rng)
+            expected = {index for index, rect in rects.items() if query.colliderect(rect)}
+            self.assertEqual(grid.query(query), expected, f"Запрос {query}")
+
+    def test_remove_and_reinsert(self):
+        """Тест: удаленный объект не находится, повторная вставка заменяет прямоугольник."""
+        grid = SpatialHash(16)
+        grid.insert("a", (0, 0, 10, 10))
+        grid.insert("b", (40, 40, 10, 10))
+        self.assertEqual(grid.query(pygame.Rect(5, 5, 2, 2)), {"a"})
+
+        grid.insert("a", (40, 0, 10, 10))  # Перемещение объекта
+        self.assertEqual(grid.query(pygame.Rect(5, 5, 2, 2)), set())
+        self.assertEqual(grid.query(pygame.Rect(45, 5, 2, 2)), {"a"})
+
+        grid.remove("a")
+        grid.remove("a")  # Повторное удаление игнорируется
+        self.assertNotIn("a", grid)
+        self.assertEqual(len(grid), 1)
+        self.assertEqual(grid.query(pygame.Rect(0, 0, 100, 100)), {"b"})
+
+    def test_rejects_non_positive_cell_size(self):
+        """Тест: размер ячейки должен быть положительным."""
+        with self.assertRaises(ValueError):
+            SpatialHash(0)
+
 
 if __name__ == "__main__":
     # Импортируем Button здесь, чтобы избежать циклического импорта на уровне модуля,
@@ -24,6 +24,9 @@ from alien_invasion.alien_invasion import AlienInvasion  # Для теста с
 # Отключаем звук
 os.environ["SDL_AUDIODRIVER"] = "dummy"
 
+# Длительность шага симуляции (в секундах), передаваемая в SpaceObject.update
+_TEST_DT = 1.0 / 120
+
 
 class TestSpaceObject(unittest.TestCase):
     """Тесты для класса SpaceObject."""
@@ -75,6 +78,21 @@ class TestSpaceObject(unittest.TestCase):
             image_path=self.test_planet_image_path,
         )
 
+    def test_same_seed_gives_same_object(self):
+        """Тест: объекты с одинаково засеянным rng получают одинаковые размер, позицию и скорость."""
+        objects = [
+            SpaceObject(
+                screen_width=self.screen_width,
+                screen_height=self.screen_height,
+                image_path=self.test_planet_image_path,
+                rng=random.Random(5),
+            )
+            for _ in range(2)
+        ]
+        first, second = objects
+        self.assertEqual(first.rect, second.rect)
+        self.assertEqual((first.dx, first.dy), (second.dx, second.dy))
+
     def test_initialization_size_and_alpha(self):
         """Тест: Корректная инициализация размера и альфа-канала."""
         self.assertIsNotNone(
@@ -141,15 +159,16 @@ class TestSpaceObject(unittest.TestCase):
     def test_movement(self):
         """Тест: Движение объекта."""
         initial_x, initial_y = self.space_object.rect.topleft
-        self.space_object.update()
+        dt = 0.1  # Длительность шага симуляции в секундах
+        self.space_object.update(dt)
         self.assertNotEqual(
             self.space_object.rect.topleft,
             (initial_x, initial_y),
             "Объект должен изменить позицию после update.",
         )
         # Более точная проверка:
-        expected_x = initial_x + self.space_object.dx
-        expected_y = initial_y + self.space_object.dy
+        expected_x = initial_x + self.space_object.dx * dt
+        expected_y = initial_y + self.space_object.dy * dt
         self.assertAlmostEqual(
             self.space_object.rect.x,
             expected_x,
@@ -169,7 +188,7 @@ class TestSpaceObject(unittest.TestCase):
         self.space_object.creation_time = (
             pygame.time.get_ticks() - self.space_object.fade_duration_ms // 2
         )  # Половина времени прошла
-        self.space_object.update()
+        self.space_object.update(_TEST_DT)
         self.assertTrue(
             0 < self.space_object.alpha < 255,
             "Альфа должна быть между 0 и 255 во время fade-in.",
@@ -178,7 +197,7 @@ class TestSpaceObject(unittest.TestCase):
         self.space_object.creation_time = (
             pygame.time.get_ticks() - self.space_object.fade_duration_ms - 1
         )  # Время вышло
-        self.space_object.update()
+        self.space_object.update(_TEST_DT)
         self.assertEqual(
             self.space_object.alpha, 255, "Альфа должна быть 255 после fade-in."
         )
@@ -192,7 +211,7 @@ class TestSpaceObject(unittest.TestCase):
         self.space_object.state = 'fade_in'
         self.space_object.creation_time = pygame.time.get_ticks() - self.space_object.fade_duration_ms -1 # Время для fade_in вышло
 
-        self.space_object.update() # Должен завершить fade_in и остаться visible, так как на экране
+        self.space_object.update(_TEST_DT) # Должен завершить fade_in и остаться visible, так как на экране
 
         self.assertEqual(self.space_object.alpha, 255, "Альфа должна быть 255 после завершения времени fade-in.")
         # На этом этапе state мог стать 'visible', а затем сразу 'fade_out', если объект за экраном.
@@ -224,7 +243,7 @@ class TestSpaceObject(unittest.TestCase):
             original_dx, original_dy = self.space_object.dx, self.space_object.dy
             self.space_object.dx, self.space_object.dy = 0, 0 # Обнуляем скорость
 
-            self.space_object.update() # Этот update не должен изменить state с 'visible'
+            self.space_object.update(_TEST_DT) # Этот update не должен изменить state с 'visible'
 
             self.assertEqual(self.space_object.state, "visible",
                              "Объект на экране, без движения и с 'замороженным' временем для fade, должен оставаться 'visible'.")
@@ -241,7 +260,7 @@ class TestSpaceObject(unittest.TestCase):
         self.space_object.creation_time = (
             pygame.time.get_ticks() - self.space_object.fade_duration_ms // 2
         )  # Половина времени прошла
-        self.space_object.update()
+        self.space_object.update(_TEST_DT)
         self.assertTrue(
             0 < self.space_object.alpha < 255,
             "Альфа должна быть между 0 и 255 во время fade-out.",
@@ -273,7 +292,7 @@ class TestSpaceObject(unittest.TestCase):
 
 
         with patch.object(self.space_object, 'kill', wraps=self.space_object.kill) as mock_kill:
-            self.space_object.update()  # Этот update должен:
+            self.space_object.update(_TEST_DT)  # Этот update должен:
                                         # 1. Установить alpha = 0 через _update_fade_state.
                                         # 2. Убедиться, что объект далеко за экраном.
                                         # 3. Вызвать self.kill().
@@ -370,7 +389,7 @@ class TestSpaceObjectSpawning(unittest.TestCase):
         for _ in range(self.ai_game.settings.max_space_objects + 2):
             # Устанавливаем время так, чтобы спавн точно произошел
             self.ai_game.last_space_object_spawn_time = (
-                pygame.time.get_ticks() - self.ai_game.current_spawn_interval - 1
+                self.ai_game.get_sim_ticks() - self.ai_game.current_spawn_interval - 1
             )
             self.ai_game._try_spawn_space_object()
 
@@ -387,10 +406,10 @@ class TestSpaceObjectSpawning(unittest.TestCase):
 
         self.ai_game.space_objects.empty()
         self.ai_game.last_space_object_spawn_time = (
-            pygame.time.get_ticks() - self.ai_game.current_spawn_interval - 1
+            self.ai_game.get_sim_ticks() - self.ai_game.current_spawn_interval - 1
         )
 
-        with patch("random.choice") as mock_random_choice:
+        with patch.object(self.ai_game.rng, "choice") as mock_random_choice:
             # Настраиваем mock_random_choice, чтобы он возвращал известный путь
             # Это нужно, если self.settings.planet_sprite_paths не пуст
             if self.ai_game.settings.planet_sprite_paths:
@@ -405,7 +424,7 @@ class TestSpaceObjectSpawning(unittest.TestCase):
 
             if (
                 self.ai_game.settings.planet_sprite_paths
-            ):  # Только если есть пути, должен быть вызван random.choice
+            ):  # Только если есть пути, должен быть вызван rng.choice
                 mock_random_choice.assert_any_call( # Changed to assert_any_call
                     self.ai_game.settings.planet_sprite_paths
                 )
@@ -14,6 +14,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from alien_invasion.settings import Settings
 from alien_invasion.game_stats import GameStats
+from alien_invasion import scoreboard as scoreboard_module
 from alien_invasion.scoreboard import (
     Scoreboard,
     _UI_ICON_SIZE,
@@ -21,6 +22,19 @@ from alien_invasion.scoreboard import (
     _LIVES_ICON_SPACING,
 )
 from alien_invasion.ship import Ship  # Нужен для fallback в Scoreboard
+from alien_invasion import image_cache
+from alien_invasion import frame_timing
+from alien_invasion.frame_timing import FrameTimer, PHASE_NAMES, percentile
+from alien_invasion import dirty_rects
+from alien_invasion.dirty_rects import DirtyRectRenderer
+from alien_invasion import starfield as starfield_module
+from alien_invasion.starfield import ParallaxStarfield, Starfield, create_starfield
+from alien_invasion.glyph_atlas import GlyphAtlas, TextBuffer
+from alien_invasion.alien_invasion import AlienInvasion
+import numpy as np
+import random
+import csv
+import tempfile
 
 # Отключаем звук для тестов, если он инициализируется где-то глобально
 os.environ["SDL_AUDIODRIVER"] = "dummy"
@@ -69,6 +83,10 @@ class TestScoreboardUI(unittest.TestCase):
         self.mock_os_path_exists = self.patch_os_path_exists.start()
         self.addCleanup(self.patch_os_path_exists.stop)
 
+        # Кэш изображений не должен отдавать поверхности, загруженные без подмены pygame.image.load
+        image_cache.clear()
+        self.addCleanup(image_cache.clear)
+
         self.mock_image_loader = test_integration_and_state.MockPygameImage()
         # Clear any shared state from other tests using the same class-level dictionary
         self.mock_image_loader.clear_expected_surfaces()
@@ -389,5 +407,497 @@ class TestScoreboardUI(unittest.TestCase):
         pygame.display.quit()
 
 
+
+class TestFrameTimer(unittest.TestCase):
+    """Тесты кольцевого буфера замеров фаз кадра и его оверлея."""
+
+    def _record_frame(self, timer, clock, events_ns, draw_ns):
+        """Записывает кадр с заданным временем фаз events и draw (через подмененные часы)."""
+        clock.append(clock[-1])
+        timer.begin_frame()
+        clock.append(clock[-1] + events_ns)
+        timer.lap(frame_timing.PHASE_EVENTS)
+        clock.append(clock[-1] + draw_ns)
+        timer.lap(frame_timing.PHASE_DRAW)
+        timer.end_frame()
+
+    def setUp(self):
+        self.clock = [0]
+        patcher = patch(
+            "alien_invasion.frame_timing.perf_counter_ns",
+            side_effect=lambda: self.clock[-1],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.timer = FrameTimer(capacity=4)
+
+    def test_disabled_timer_records_nothing(self):
+        """Тест: при выключенном замере кадры не записываются."""
+        self._record_frame(self.timer, self.clock, 1000, 2000)
+        self.assertEqual(self.timer.frames_recorded, 0)
+        self.assertEqual(self.timer.phase_stats(), [])
+
+    def test_ring_buffer_keeps_latest_frames(self):
+        """Тест: буфер хранит только последние capacity кадров."""
+        self.timer.set_enabled(True)
+        for k in range(1, 7):
+            self._record_frame(self.timer, self.clock, k * 1_000_000, 0)
+
+        stats = {name: avg for name, avg, _, _ in self.timer.phase_stats()}
+        # В буфере остались кадры 3..6 мс.
+        self.assertAlmostEqual(stats["events"], 4.5)
+        self.assertAlmostEqual(stats["frame"], 4.5)
+        self.assertEqual(stats["draw"], 0)
+
+    def test_percentile_nearest_rank(self):
+        """Тест: перцентиль считается методом ближайшего ранга."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([], 0.95), 0)
+
+    def test_dump_csv_in_chronological_order(self):
+        """Тест: CSV содержит заголовок с фазами и кадры от старых к новым."""
+        self.timer.set_enabled(True)
+        for k in range(1, 6):
+            self._record_frame(self.timer, self.clock, k, 10 * k)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "timing.csv")
+            self.timer.dump_csv(path)
+            with open(path, newline="") as f:
+                rows = list(csv.reader(f))
+
+        self.assertEqual(rows[0], ["frame"] + list(PHASE_NAMES))
+        self.assertEqual([row[0] for row in rows[1:]], ["1", "2", "3", "4"])
+        events_column = 1 + frame_timing.PHASE_EVENTS
+        draw_column = 1 + frame_timing.PHASE_DRAW
+        self.assertEqual([int(row[events_column]) for row in rows[1:]], [2, 3, 4, 5])
+        self.assertEqual([int(row[draw_column]) for row in rows[1:]], [20, 30, 40, 50])
+
+    def test_overlay_toggle_and_draw(self):
+        """Тест: оверлей включает замер и рисуется на экране."""
+        pygame.font.init()
+        self.addCleanup(pygame.font.quit)
+        screen = pygame.Surface((400, 300))
+        screen.fill((255, 255, 255))
+        self.timer.toggle_overlay()
+        self.assertTrue(self.timer.enabled)
+        self._record_frame(self.timer, self.clock, 1_000_000, 2_000_000)
+
+        self.timer.draw(screen)
+        # Полупрозрачная панель оверлея затемняет левый нижний угол.
+        self.assertNotEqual(tuple(screen.get_at((15, 285)))[:3], (255, 255, 255))
+        self.assertEqual(tuple(screen.get_at((390, 10)))[:3], (255, 255, 255))
+
+        self.timer.toggle_overlay()
+        self.assertFalse(self.timer.enabled)
+
+
+
+class TestDirtyRectRenderer(unittest.TestCase):
+    """Тесты отрисовки по грязным прямоугольникам (DirtyRectRenderer)."""
+
+    def setUp(self):
+        self.screen = pygame.Surface((200, 150))
+        self.renderer = DirtyRectRenderer(self.screen, full_redraw_threshold=0.35)
+        self.sprite = pygame.Surface((10, 10))
+        self.sprite.fill((255, 0, 0))
+        # display.update/flip требуют окна; проверяем только, что и с какими областями вызывается
+        update_patcher = patch("pygame.display.update")
+        flip_patcher = patch("pygame.display.flip")
+        self.display_update = update_patcher.start()
+        self.display_flip = flip_patcher.start()
+        self.addCleanup(update_patcher.stop)
+        self.addCleanup(flip_patcher.stop)
+
+    def _draw_frame(self, target, sprite_pos, button_color=(0, 0, 255)):
+        target.fill((0, 0, 0))
+        target.fill(button_color, (150, 100, 40, 30))
+        target.set_at((5, 5), (200, 200, 200))
+        target.blit(self.sprite, sprite_pos)
+
+    def _render(self, sprite_pos, **kwargs):
+        self._draw_frame(self.renderer, sprite_pos, **kwargs)
+        mode = self.renderer.render()
+        self.renderer.present()
+        return mode
+
+    def _assert_matches_full_redraw(self, sprite_pos, **kwargs):
+        reference = pygame.Surface(self.screen.get_size())
+        self._draw_frame(reference, sprite_pos, **kwargs)
+        self.assertEqual(
+            pygame.image.tobytes(self.screen, "RGB"), pygame.image.tobytes(reference, "RGB")
+        )
+
+    def test_first_frame_is_full_and_static_frame_is_skipped(self):
+        """Тест: первый кадр выводится целиком, неизменный кадр не рисуется и не выводится."""
+        self.assertEqual(self._render((20, 20)), dirty_rects.FRAME_FULL)
+        self.display_flip.assert_called_once()
+
+        self.screen.fill((1, 2, 3))  # Неизменный кадр не должен трогать экран
+        self.assertEqual(self._render((20, 20)), dirty_rects.FRAME_SKIPPED)
+        self.display_flip.assert_called_once()
+        self.display_update.assert_not_called()
+        self.assertEqual(tuple(self.screen.get_at((100, 10)))[:3], (1, 2, 3))
+
+    def test_moved_sprite_repaints_old_and_new_position(self):
+        """Тест: сдвиг спрайта перерисовывает только его старое и новое место, пиксели как при полной отрисовке."""
+        self._render((20, 20))
+        self.assertEqual(self._render((60, 20)), dirty_rects.FRAME_PARTIAL)
+
+        dirty = self.display_update.call_args[0][0]
+        self.assertEqual(sorted(tuple(rect) for rect in dirty), [(20, 20, 10, 10), (60, 20, 10, 10)])
+        self._assert_matches_full_redraw((60, 20))
+
+        # Сдвиг на пиксель: старое и новое место объединяются в один прямоугольник
+        self._render((61, 20))
+        self.assertEqual([tuple(rect) for rect in self.display_update.call_args[0][0]], [(60, 20, 11, 10)])
+        self._assert_matches_full_redraw((61, 20))
+
+    def test_overlapping_items_are_redrawn_in_order(self):
+        """Тест: элементы под и над грязной областью перерисовываются в исходном порядке."""
+        self._render((140, 95))
+        self._render((140, 95), button_color=(0, 255, 0))  # Кнопка под спрайтом сменила цвет
+        self.assertEqual(self.renderer.last_frame_mode, dirty_rects.FRAME_PARTIAL)
+        self._assert_matches_full_redraw((140, 95), button_color=(0, 255, 0))
+
+    def test_alpha_change_marks_surface_dirty(self):
+        """Тест: смена прозрачности той же поверхности (как у SpaceObject) делает ее область грязной."""
+        self._render((20, 20))
+        self.sprite.set_alpha(100)
+        self.assertEqual(self._render((20, 20)), dirty_rects.FRAME_PARTIAL)
+        self._assert_matches_full_redraw((20, 20))
+
+    def test_large_change_and_invalidate_fall_back_to_flip(self):
+        """Тест: грязная площадь больше порога и invalidate() дают полную перерисовку и flip()."""
+        self._render((20, 20))
+        self.sprite = pygame.Surface((180, 120))
+        self.assertEqual(self._render((0, 0)), dirty_rects.FRAME_FULL)
+        self.assertEqual(self.display_flip.call_count, 2)
+
+        self.renderer.invalidate()
+        self.assertEqual(self._render((0, 0)), dirty_rects.FRAME_FULL)
+        self.assertEqual(self.display_flip.call_count, 3)
+        self.display_update.assert_not_called()
+        self._assert_matches_full_redraw((0, 0))
+
+
+class TestStarfield(unittest.TestCase):
+    """Тесты векторизованного звездного поля."""
+
+    def _reference_draw(self, starfield):
+        """Поштучная отрисовка звезд, как до перехода на массивы (пиксель или круг)."""
+        reference = pygame.Surface((starfield.screen_width, starfield.screen_height))
+        reference.fill((0, 0, 0))
+        for index in range(len(starfield.x)):
+            color = starfield.layers_config[starfield.layer[index]]["color"]
+            position = (int(starfield.x[index]), int(starfield.y[index]))
+            size = int(starfield.size[index])
+            if size == 1:
+                reference.set_at(position, color)
+            else:
+                pygame.draw.circle(reference, color, position, size)
+        return pygame.image.tobytes(reference, "RGB")
+
+    def test_update_wraps_stars_with_same_random_sequence(self):
+        """Тест: звезды за нижним краем переносятся наверх, случайные числа берутся как при поштучном обходе."""
+        starfield = Starfield(None, 200, 150, num_stars_per_layer=60, rng=random.Random(3))
+        expected_rng = random.Random(3)
+        for config in starfield.layers_config:
+            for _ in range(config["num_stars"]):
+                expected_rng.randrange(0, 200)
+                expected_rng.randrange(0, 150)
+                expected_rng.randint(*config["size_range"])
+        expected_y = starfield.y + starfield.speed * 4.0
+        wrapped = expected_y > 150
+        self.assertTrue(wrapped.any())
+        expected_x = starfield.x.copy()
+        for index in range(len(expected_x)):
+            if wrapped[index]:
+                expected_x[index] = expected_rng.randrange(0, 200)
+
+        starfield.update(4.0)
+
+        self.assertEqual(starfield.y[wrapped].tolist(), [0.0] * int(wrapped.sum()))
+        self.assertEqual(starfield.y[~wrapped].tolist(), expected_y[~wrapped].tolist())
+        self.assertEqual(starfield.x.tolist(), expected_x.tolist())
+        self.assertEqual(starfield.rng.random(), expected_rng.random())
+
+    def test_draw_matches_per_star_drawing(self):
+        """Тест: штамповка в пиксели дает то же изображение, что и set_at/draw.circle для каждой звезды."""
+        screen = pygame.Surface((200, 150))
+        starfield = Starfield(screen, 200, 150, num_stars_per_layer=80, rng=random.Random(7))
+        self.assertIn(2, starfield.size.tolist())
+        starfield.y[0] = 150  # Звезда на нижней границе частично за экраном
+        starfield.draw()
+        self.assertEqual(pygame.image.tobytes(screen, "RGB"), self._reference_draw(starfield))
+
+    def test_draw_through_renderer_reports_moved_stars(self):
+        """Тест: через DirtyRectRenderer перерисовываются только сдвинувшиеся звезды, пиксели как при прямой отрисовке."""
+        screen = pygame.Surface((200, 150))
+        renderer = DirtyRectRenderer(screen)
+        starfield = Starfield(screen, 200, 150, num_stars_per_layer=40, rng=random.Random(7))
+        with patch("pygame.display.update"), patch("pygame.display.flip"):
+            starfield.draw(renderer)
+            self.assertEqual(renderer.render(), dirty_rects.FRAME_FULL)
+            starfield.draw(renderer)
+            self.assertEqual(renderer.render(), dirty_rects.FRAME_SKIPPED)
+            for _ in range(5):
+                starfield.update(0.1)
+                starfield.draw(renderer)
+                self.assertEqual(renderer.render(), dirty_rects.FRAME_PARTIAL)
+                self.assertEqual(pygame.image.tobytes(screen, "RGB"), self._reference_draw(starfield))
+
+
+
+class TestParallaxStarfield(unittest.TestCase):
+    """Тесты фона из заранее отрисованных слоев (settings.background_mode = "layers")."""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+        cls.screen = pygame.display.set_mode((200, 150))
+
+    def setUp(self):
+        image_cache.clear()
+        self.addCleanup(image_cache.clear)
+        self.settings = Settings()
+        self.settings.screen_width, self.settings.screen_height = 200, 150
+        self.settings.starfield_stars_per_layer = 60
+        self.settings.background_mode = starfield_module.BACKGROUND_LAYERS
+
+    def _pixels(self):
+        return pygame.surfarray.array3d(self.screen).copy()
+
+    def test_layers_match_particle_starfield_and_tile_seamlessly(self):
+        """Тест: слои повторяют звездное поле с тем же зерном, а прокрутка сдвигает кадр по кругу."""
+        particles = Starfield(self.screen, 200, 150, num_stars_per_layer=60, rng=random.Random(5))
+        particles.draw()
+        expected = self._pixels()
+        layers = ParallaxStarfield(self.screen, 200, 150, num_stars_per_layer=60, rng=random.Random(5))
+        layers.draw()
+        initial = self._pixels()
+        # У верхнего и нижнего краев слой дополнен звездами с другой стороны стыка
+        np.testing.assert_array_equal(initial[:, 2:-2], expected[:, 2:-2])
+
+        layers.offsets = [40.0] * len(layers.tiles)  # Все слои сдвинуты на 40 пикселей вниз
+        layers.draw()
+        np.testing.assert_array_equal(self._pixels(), np.roll(initial, 40, axis=1))
+
+    def test_update_scrolls_each_layer_at_its_speed(self):
+        """Тест: update() сдвигает слои с их скоростями и заворачивает смещение по высоте экрана."""
+        layers = ParallaxStarfield(self.screen, 200, 150, num_stars_per_layer=10, rng=random.Random(1))
+        self.assertEqual(layers.speeds, [15.0, 30.0])
+        layers.update(6.0)
+        self.assertEqual(layers.offsets, [90.0, 30.0])  # 180 % 150 = 30
+
+    def test_scrolling_layers_skip_dirty_rect_rendering(self):
+        """Тест: прокрутка слоев меняет весь кадр, поэтому игра с этим фоном рисует без DirtyRectRenderer."""
+        layers = ParallaxStarfield(self.screen, 200, 150, num_stars_per_layer=10, rng=random.Random(1))
+        self.assertTrue(layers.redraws_every_frame)
+        self.assertFalse(Starfield(self.screen, 200, 150, num_stars_per_layer=10).redraws_every_frame)
+        # Через renderer каждый кадр прокрутки был бы полной перерисовкой
+        renderer = DirtyRectRenderer(self.screen)
+        with patch("pygame.display.update"), patch("pygame.display.flip"):
+            for _ in range(3):
+                layers.update(0.1)
+                layers.draw(renderer)
+                self.assertEqual(renderer.render(), dirty_rects.FRAME_FULL)
+        layers.speeds = [0.0] * len(layers.speeds)
+        self.assertFalse(layers.redraws_every_frame)
+
+        # Игра в окне выбирает отрисовку по фону
+        with patch("alien_invasion.alien_invasion.Settings", return_value=self.settings):
+            game = AlienInvasion(persist_high_score=False)
+        self.assertIsInstance(game.starfield, ParallaxStarfield)
+        self.assertIsNone(game.renderer)
+        self.settings.background_mode = starfield_module.BACKGROUND_PARTICLES
+        with patch("alien_invasion.alien_invasion.Settings", return_value=self.settings):
+            game = AlienInvasion(persist_high_score=False)
+        self.assertIsInstance(game.renderer, DirtyRectRenderer)
+
+    def test_create_starfield_selects_mode_and_base_image(self):
+        """Тест: режим фона выбирается настройкой; базовым слоем становится только изображение размером с экран."""
+        with self.assertLogs("alien_invasion.starfield", level="INFO"):
+            layers = create_starfield(self.settings, self.screen, random.Random(1))
+        self.assertIsInstance(layers, ParallaxStarfield)
+        self.assertEqual(len(layers.tiles), 2, "Маленький background01.png не должен стать фоном.")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "backdrop.png")
+            backdrop = pygame.Surface((400, 300))
+            backdrop.fill((0, 0, 90))
+            pygame.image.save(backdrop, path)
+            self.settings.background_base_image_path = path
+            layers = create_starfield(self.settings, self.screen, random.Random(1))
+        self.assertEqual(len(layers.tiles), 3)
+        self.assertEqual(layers.tiles[0].get_size(), (200, 150))
+        self.assertIsNone(layers.tiles[0].get_colorkey())
+        layers.draw()
+        self.assertIn((0, 0, 90), {tuple(self.screen.get_at((x, 75)))[:3] for x in range(200)})
+
+        self.settings.background_mode = starfield_module.BACKGROUND_PARTICLES
+        self.assertIs(type(create_starfield(self.settings, self.screen, random.Random(1))), Starfield)
+        self.settings.background_mode = "sparkles"
+        with self.assertLogs("alien_invasion.starfield", level="WARNING"):
+            self.assertIs(type(create_starfield(self.settings, self.screen, random.Random(1))), Starfield)
+
+
+class TestGlyphAtlas(unittest.TestCase):
+    """Тесты атласа глифов и сборки текста Scoreboard без font.render()."""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+        cls.screen = pygame.display.set_mode((400, 300))
+        cls.font = pygame.font.SysFont(None, 48)
+
+    def setUp(self):
+        image_cache.clear()
+        self.addCleanup(image_cache.clear)
+
+    def _glyph_row(self, text, atlas):
+        """Эталон: отдельные глифы, отрендеренные шрифтом и поставленные вплотную."""
+        images = [self.font.render(char, True, (30, 30, 30), atlas.background) for char in text]
+        row = atlas.new_surface((sum(image.get_width() for image in images), atlas.height))
+        x = 0
+        for image in images:
+            row.blit(image, (x, 0), None, pygame.BLEND_RGBA_MAX if atlas.has_alpha else 0)
+            x += image.get_width()
+        return row
+
+    def test_composed_text_matches_font_glyphs(self):
+        """Тест: собранная строка совпадает с глифами шрифта (непрозрачный и прозрачный фон)."""
+        for background, mode in (((230, 230, 230), "RGB"), (None, "RGBA")):
+            atlas = GlyphAtlas(self.font, (30, 30, 30), background, labels=("Рекорд: ",))
+            image = TextBuffer(atlas, "0").render("12,340")
+            expected = self._glyph_row("12,340", atlas)
+            self.assertEqual(image.get_size(), expected.get_size())
+            self.assertEqual(
+                pygame.image.tobytes(image, mode), pygame.image.tobytes(expected, mode), mode
+            )
+        self.assertTrue(atlas.can_compose("9,000", "Рекорд: "))
+        self.assertFalse(atlas.can_compose("-5"))
+        self.assertGreater(atlas.measure("5", "Рекорд: "), atlas.measure("5"))
+
+    def test_buffer_reuses_surfaces_and_grows_when_needed(self):
+        """Тест: буфер возвращает subsurface одного буфера и пересоздается только для длинной строки."""
+        atlas = GlyphAtlas(self.font, (30, 30, 30), (230, 230, 230))
+        text_buffer = TextBuffer(atlas, "000")
+        buffer_surface = text_buffer.surface
+        first = text_buffer.render("1")
+        self.assertIs(first.get_parent(), buffer_surface)
+        self.assertIs(text_buffer.render("7"), first, "Та же ширина - тот же объект изображения.")
+        text_buffer.render("1,000,000,000")
+        self.assertIsNot(text_buffer.surface, buffer_surface)
+        self.assertEqual(text_buffer.render("42").get_width(), atlas.measure("42"))
+
+    def test_scoreboard_updates_without_font_render(self):
+        """Тест: счет, уровень и рекорд обновляются без font.render() и сообщают рендереру об изменении."""
+        ai_game = MagicMock()
+        ai_game.screen = self.screen
+        ai_game.settings = Settings()
+        ai_game.stats = GameStats(ai_game)
+        ai_game.stats.high_score = 0
+        scoreboard = Scoreboard(ai_game)
+
+        renderer = DirtyRectRenderer(self.screen)
+        scoreboard.show_score(renderer)
+        renderer.render()
+
+        ai_game.stats.score = 1230
+        ai_game.stats.level = 7
+        ai_game.stats.high_score = 1230
+        scoreboard.font = MagicMock()
+        scoreboard.font.render.side_effect = AssertionError("font.render() при обновлении счета")
+        scoreboard.prep_score()
+        scoreboard.prep_level()
+        scoreboard.prep_high_score()
+        self.assertIs(scoreboard.level_image.get_parent(), scoreboard._level_text.surface)
+        self.assertEqual(scoreboard.score_rect.width, scoreboard._score_text.atlas.measure("1,230"))
+
+        with patch.object(renderer, "mark_dirty", wraps=renderer.mark_dirty) as mark_dirty:
+            scoreboard.show_score(renderer)
+            scoreboard.show_score(renderer)
+        mark_dirty.assert_called_once()
+        self.assertIn(scoreboard.level_rect, mark_dirty.call_args[0][0])
+
+
+class TestScoreboardHud(unittest.TestCase):
+    """Тесты HUD, который перестраивается не чаще раза за кадр и выводится одним blit."""
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.init()
+        cls.screen = pygame.display.set_mode((1200, 800))
+
+    def setUp(self):
+        image_cache.clear()
+        self.addCleanup(image_cache.clear)
+        self.ai_game = MagicMock()
+        self.ai_game.screen = self.screen
+        self.ai_game.settings = Settings()
+        self.ai_game.stats = GameStats(self.ai_game)
+        self.ai_game.stats.high_score = 0
+        self.scoreboard = Scoreboard(self.ai_game)
+
+    def test_changes_in_one_frame_rebuild_hud_once(self):
+        """Тест: несколько попаданий, рекорд и потеря жизни за кадр дают одну пересборку HUD."""
+        stats = self.ai_game.stats
+        with patch.object(stats, "_save_high_score"), patch.object(
+            self.scoreboard, "prep_score", wraps=self.scoreboard.prep_score
+        ) as prep_score, patch.object(
+            self.scoreboard, "_rebuild_hud", wraps=self.scoreboard._rebuild_hud
+        ) as rebuild_hud:
+            for _ in range(3):
+                stats.score += 50
+                self.scoreboard.mark_changed(scoreboard_module.HUD_SCORE)
+                self.scoreboard.check_high_score()
+            stats.ships_left -= 1
+            self.scoreboard.mark_changed(scoreboard_module.HUD_SHIPS)
+            prep_score.assert_not_called()
+
+            self.assertTrue(self.scoreboard.update())
+            self.assertFalse(self.scoreboard.update(), "Без новых изменений HUD не перестраивается.")
+        prep_score.assert_called_once()
+        rebuild_hud.assert_called_once()
+        self.assertEqual(stats.high_score, 150)
+        self.assertEqual(len(self.scoreboard.life_icons_to_draw), stats.ships_left)
+
+    def test_hud_is_one_blit_matching_separate_elements(self):
+        """Тест: HUD выводится одним blit и выглядит как элементы, нарисованные по отдельности."""
+        renderer = DirtyRectRenderer(self.screen)
+        self.scoreboard.show_score(renderer)
+        self.assertEqual(len(renderer._items), 1)
+        self.assertIs(renderer._items[0][2], self.scoreboard.hud_image)
+        renderer.render()
+
+        self.screen.fill((0, 0, 40))
+        self.scoreboard.show_score(self.screen)
+        composited = pygame.surfarray.array3d(self.screen).astype(int)
+        hud_image = self.scoreboard.hud_image
+        self.scoreboard.hud_image = None  # Рисование по отдельности
+        self.screen.fill((0, 0, 40))
+        self.scoreboard.show_score(self.screen)
+        separate = pygame.surfarray.array3d(self.screen).astype(int)
+        self.scoreboard.hud_image = hud_image
+        # Полупрозрачные края рамки смешиваются в другом порядке - допускаем ошибку округления
+        self.assertLessEqual(np.abs(composited - separate).max(), 2)
+
+        # Тот же объект hud_image с новым счетом: рендерер узнает об изменении через mark_dirty()
+        self.ai_game.stats.score = 12340
+        self.scoreboard.mark_changed(scoreboard_module.HUD_SCORE)
+        self.scoreboard.show_score(renderer)
+        self.assertIs(renderer._items[0][2], hud_image)
+        self.assertEqual(renderer.render(), dirty_rects.FRAME_PARTIAL)
+        self.assertTrue(
+            any(rect.contains(self.scoreboard.score_rect) for rect in renderer.last_dirty_rects)
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Сборка текстурного атласа для спрайтов кораблей, бонусов и иконок UI.
+
+Упаковывает отдельные PNG в одну или несколько страниц атласа (atlas_N.png) и
+пишет индекс atlas.json с прямоугольниками спрайтов. Во время игры
+alien_invasion.image_cache загружает страницу один раз и выдает спрайты как
+subsurface; спрайты, которых нет в атласе, по-прежнему грузятся из своих файлов.
+
+Спрайты попадают в атлас в исходном размере: load_image(path) без размера
+возвращает то же изображение, что и файл. С --max-sprite-size крупные спрайты
+уменьшаются с сохранением пропорций; игра такие записи не использует и грузит
+эти спрайты из файлов.
+
+Для каждого спрайта в индекс записывается SHA-256 исходного PNG. Игра сверяет
+его с хешем в assets/manifest.json и берет спрайт из файла, если они не
+совпадают. После изменения любого из исходных PNG атлас нужно пересобрать, а
+манифест - перегенерировать:
+
+    python tools/build_atlas.py
+    python tools/validate_assets.py --write-manifest
+
+Индекс (версия 2):
+    {"version": 2, "root": "../..",
+     "pages": [{"file": "atlas_0.png", "size": [w, h]}],
+     "sprites": {"gfx/ships/aliens/alien_ship_01.png":
+                     {"page": 0, "rect": [x, y, w, h], "size": [w, h], "sha256": "..."}}}
+Ключи спрайтов - пути относительно root, а root задан относительно каталога индекса.
+size - размер исходного файла, sha256 - его хеш.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame  # noqa: E402
+
+ATLAS_INDEX_VERSION = 2
+ATLAS_INDEX_NAME = "atlas.json"
+ATLAS_PAGE_PATTERN = "atlas_{}.png"
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ASSETS_DIR = os.path.join(_PROJECT_ROOT, "assets")
+_DEFAULT_OUTPUT_DIR = os.path.join(_ASSETS_DIR, "gfx", "atlas")
+_DEFAULT_MAX_SPRITE_SIZE = None  # None - спрайты не уменьшаются
+_DEFAULT_PAGE_SIZE = 2048
+_DEFAULT_PADDING = 1  # Пустые пиксели между спрайтами, чтобы соседи не "протекали" при масштабировании
+
+# Спрайты, которые попадают в атлас (пути относительно assets/).
+DEFAULT_SPRITES = (
+    [f"gfx/ships/aliens/alien_ship_{i:02d}.png" for i in range(1, 25)]
+    + [
+        "gfx/ships/player/playerShip3_blue.png",
+        "gfx/powerups/powerup_shield.png",
+        "gfx/powerups/powerup_bolt.png",
+        "gfx/powerups/powerup_star.png",
+        "gfx/ui/icons/heart.png",
+        "gfx/ui/icons/pause.png",
+        "gfx/ui/frames/blue_panel.png",
+    ]
+)
+
+
+def _fit_size(size, max_side):
+    """Размер, уменьшенный с сохранением пропорций так, чтобы большая сторона не превышала max_side."""
+    width, height = size
+    longest = max(width, height)
+    if max_side is None or longest <= max_side:
+        return size
+    scale = max_side / longest
+    return (max(1, round(width * scale)), max(1, round(height * scale)))
+
+
+def pack_rects(sizes, page_size, padding):
+    """Упаковывает прямоугольники по полкам (shelf packing).
+
+    sizes - список (w, h). Возвращает (placements, page_count), где placements[i] -
+    (страница, x, y) для sizes[i]. Прямоугольники размещаются от самых высоких к
+    низким; не поместившийся на текущую страницу начинает новую.
+    """
+    page_w, page_h = page_size
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    placements = [None] * len(sizes)
+    page = 0
+    x = y = shelf_height = 0
+    for i in order:
+        width, height = sizes[i]
+        if width + padding > page_w or height + padding > page_h:
+            raise ValueError(f"Спрайт {width}x{height} не помещается на страницу {page_w}x{page_h}")
+        if x + width + padding > page_w:  # Новая полка
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+        if y + height + padding > page_h:  # Новая страница
+            page += 1
+            x = y = shelf_height = 0
+        placements[i] = (page, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+    return placements, (page + 1 if sizes else 0)
+
+
+def _file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _load_sprite(path, max_side):
+    """Загружает PNG в 32-битную поверхность с альфой, уменьшая до max_side при необходимости.
+
+    Возвращает (поверхность, исходный размер).
+    """
+    image = pygame.image.load(path)
+    surface = pygame.Surface(image.get_size(), pygame.SRCALPHA, 32)
+    surface.blit(image, (0, 0))
+    source_size = surface.get_size()
+    target = _fit_size(source_size, max_side)
+    if target != source_size:
+        surface = pygame.transform.smoothscale(surface, target)
+    return surface, source_size
+
+
+def build_atlas(
+    root_dir,
+    sprite_paths,
+    output_dir,
+    max_sprite_size=_DEFAULT_MAX_SPRITE_SIZE,
+    page_size=(_DEFAULT_PAGE_SIZE, _DEFAULT_PAGE_SIZE),
+    padding=_DEFAULT_PADDING,
+):
+    """Собирает атлас из sprite_paths (пути относительно root_dir) в output_dir.
+
+    Отсутствующие или нечитаемые файлы пропускаются с предупреждением - в игре
+    для них сработает обычная загрузка из файла и ее fallback. Возвращает индекс.
+    """
+    names = []
+    surfaces = []
+    sources = []  # (исходный размер, sha256 файла) для каждого спрайта
+    for relative_path in sprite_paths:
+        path = os.path.join(root_dir, relative_path)
+        try:
+            surface, source_size = _load_sprite(path, max_sprite_size)
+            digest = _file_sha256(path)
+        except (pygame.error, OSError) as e:
+            print(f"Предупреждение: спрайт пропущен {path}: {e}")
+            continue
+        surfaces.append(surface)
+        sources.append((source_size, digest))
+        names.append(relative_path.replace(os.sep, "/"))
+
+    placements, page_count = pack_rects([s.get_size() for s in surfaces], page_size, padding)
+
+    # Страницы обрезаются по фактически занятой области.
+    used = [[0, 0] for _ in range(page_count)]
+    for surface, (page, x, y) in zip(surfaces, placements):
+        used[page][0] = max(used[page][0], x + surface.get_width())
+        used[page][1] = max(used[page][1], y + surface.get_height())
+
+    os.makedirs(output_dir, exist_ok=True)
+    pages = [pygame.Surface(tuple(size), pygame.SRCALPHA, 32) for size in used]
+    for page in pages:
+        page.fill((0, 0, 0, 0))
+    sprites = {}
+    for name, surface, (page, x, y), (source_size, digest) in zip(
+        names, surfaces, placements, sources
+    ):
+        pages[page].blit(surface, (x, y))
+        sprites[name] = {
+            "page": page,
+            "rect": [x, y, surface.get_width(), surface.get_height()],
+            "size": list(source_size),
+            "sha256": digest,
+        }
+
+    page_entries = []
+    for number, page in enumerate(pages):
+        file_name = ATLAS_PAGE_PATTERN.format(number)
+        pygame.image.save(page, os.path.join(output_dir, file_name))
+        page_entries.append({"file": file_name, "size": list(page.get_size())})
+
+    index = {
+        "version": ATLAS_INDEX_VERSION,
+        "root": os.path.relpath(root_dir, output_dir).replace(os.sep, "/"),
+        "pages": page_entries,
+        "sprites": sprites,
+    }
+    with open(os.path.join(output_dir, ATLAS_INDEX_NAME), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+        f.write("\n")
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сборка текстурного атласа спрайтов Alien Invasion")
+    parser.add_argument("--output-dir", default=_DEFAULT_OUTPUT_DIR, help="Каталог для atlas.json и страниц атласа")
+    parser.add_argument(
+        "--max-sprite-size",
+        type=int,
+        default=_DEFAULT_MAX_SPRITE_SIZE,
+        help="Максимальная сторона спрайта в атласе, px (по умолчанию спрайты не уменьшаются; "
+        "уменьшенные спрайты игра грузит из файлов)",
+    )
+    parser.add_argument("--page-size", type=int, default=_DEFAULT_PAGE_SIZE, help="Максимальная сторона страницы, px")
+    parser.add_argument("--padding", type=int, default=_DEFAULT_PADDING, help="Отступ между спрайтами, px")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    index = build_atlas(
+        _ASSETS_DIR,
+        DEFAULT_SPRITES,
+        args.output_dir,
+        max_sprite_size=args.max_sprite_size,
+        page_size=(args.page_size, args.page_size),
+        padding=args.padding,
+    )
+    for page in index["pages"]:
+        print(f"{page['file']}: {page['size'][0]}x{page['size'][1]}")
+    print(f"Спрайтов в атласе: {len(index['sprites'])}. Индекс: {os.path.join(args.output_dir, ATLAS_INDEX_NAME)}")
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -191,6 +191,21 @@ def validate_wav(filepath, generate_fallbacks_flag):
         return False
 
 
+def write_asset_manifest():
+    """Перегенерирует assets/manifest.json (путь, размер, разрешение и хеш каждого ассета)."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from alien_invasion import asset_manifest
+
+    manifest = asset_manifest.write_manifest()
+    print(
+        f"Манифест ассетов записан: {asset_manifest.DEFAULT_MANIFEST_PATH} "
+        f"(файлов: {len(manifest['assets'])})"
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Скрипт валидации ассетов с возможностью генерации заглушек."
@@ -201,8 +216,18 @@ def main():
         action="store_true",
         help="Генерировать файлы-заглушки для отсутствующих или невалидных ассетов (PNG, WAV).",
     )
+    parser.add_argument(
+        "-m",
+        "--write-manifest",
+        action="store_true",
+        help="Перегенерировать манифест ассетов assets/manifest.json и выйти.",
+    )
     args = parser.parse_args()
 
+    if args.write_manifest:
+        write_asset_manifest()
+        sys.exit(0)
+
     if args.generate_fallbacks:
         print("Режим генерации заглушек ВКЛЮЧЕН.")
         if not PIL_AVAILABLE and any(